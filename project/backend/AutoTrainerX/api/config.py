@@ -1,6 +1,19 @@
 # config.py
+import os
+
 class Settings:
     HOST = "0.0.0.0"
     PORT = 8000
+    # Training jobs running at once; the rest wait in a queue of at most MAX_QUEUED_JOBS.
+    MAX_CONCURRENT_JOBS = int(os.getenv("MAX_CONCURRENT_JOBS", os.cpu_count() or 1))
+    MAX_QUEUED_JOBS = int(os.getenv("MAX_QUEUED_JOBS", 32))
+    # Trained models, keyed by dataset content + model type + hyperparameters, evicted LRU past the quota.
+    MODEL_REGISTRY_DIR = os.getenv("MODEL_REGISTRY_DIR", "model_registry")
+    MODEL_REGISTRY_QUOTA_MB = int(os.getenv("MODEL_REGISTRY_QUOTA_MB", 2048))
+    # /predict: models kept loaded, and how single-row requests are merged into batches.
+    PREDICT_CACHE_MODELS = int(os.getenv("PREDICT_CACHE_MODELS", 8))
+    PREDICT_MAX_BATCH = int(os.getenv("PREDICT_MAX_BATCH", 64))
+    PREDICT_MAX_WAIT_MS = float(os.getenv("PREDICT_MAX_WAIT_MS", 5))
+    PREDICT_CHUNK_ROWS = int(os.getenv("PREDICT_CHUNK_ROWS", 10000))
 
 settings = Settings()
@@ -0,0 +1,235 @@
+# jobs.py
+"""Background training jobs.
+
+Each job trains in its own process, so a running job can be cancelled by
+terminating it and the API process never does the number crunching. At most
+``max_concurrent`` jobs run at once; up to ``max_queued`` more wait in FIFO
+order and further submissions are refused with ``QueueFullError``. A watcher
+thread per running job relays progress and the result from the child's
+queue onto the ``Job`` record.
+"""
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+TERMINAL = ("succeeded", "failed", "cancelled")
+
+
+class QueueFullError(Exception):
+    pass
+
+
+@dataclass
+class Job:
+    id: str
+    request: Dict[str, Any]
+    status: str = "queued"
+    # Jobs submitted with the same key while one is active share it instead of training twice.
+    key: Optional[str] = None
+    created: float = field(default_factory=time.time)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    progress: Dict[str, Any] = field(default_factory=dict)
+    result: Any = None
+    error: Optional[str] = None
+    error_type: Optional[str] = None
+    # Bumped on every change; the event stream sends a snapshot whenever it moves.
+    version: int = 0
+
+    @property
+    def done(self) -> bool:
+        return self.status in TERMINAL
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "model_type": self.request.get("model_type"),
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+            "progress": self.progress,
+            "error": self.error,
+        }
+
+
+def _run_job(request: Dict[str, Any], events):
+    """Child process entry point: trains and reports back through ``events``."""
+    from api.models import TrainRequest
+    from api.services import train_model
+
+    def progress(step, total, metrics):
+        metrics = {name: float(value) for name, value in (metrics or {}).items()}
+        events.put(("progress", {"step": step, "total": total, "metrics": metrics}))
+
+    try:
+        events.put(("result", train_model(TrainRequest(**request), progress=progress)))
+    except Exception as e:
+        events.put(("error", (type(e).__name__, str(e))))
+
+
+class JobManager:
+    def __init__(self, max_concurrent: Optional[int] = None, max_queued: int = 32, keep_finished: int = 200,
+                 start_method: str = "spawn"):
+        self.max_concurrent = max_concurrent or os.cpu_count() or 1
+        self.max_queued = max_queued
+        self.keep_finished = keep_finished
+        # spawn: forking a process that is running uvicorn's threads is not safe.
+        self._context = multiprocessing.get_context(start_method)
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._pending: Deque[str] = deque()
+        self._processes: Dict[str, Any] = {}
+        self._cond = threading.Condition()
+
+    def submit(self, request: Dict[str, Any], key: Optional[str] = None) -> Job:
+        with self._cond:
+            if key is not None:
+                for job in self._jobs.values():
+                    if job.key == key and not job.done:
+                        return job
+            if len(self._pending) >= self.max_queued:
+                raise QueueFullError(f"{len(self._pending)} training jobs are already queued")
+            job = Job(id=uuid.uuid4().hex, request=request, key=key)
+            self._jobs[job.id] = job
+            self._pending.append(job.id)
+            self._start_next()
+            return job
+
+    def record(self, request: Dict[str, Any], result: Any, key: Optional[str] = None) -> Job:
+        """Adds an already finished job, e.g. for a result served from the model registry."""
+        with self._cond:
+            job = Job(id=uuid.uuid4().hex, request=request, key=key, result=result)
+            job.started = job.created
+            self._jobs[job.id] = job
+            self._finish(job, "succeeded")
+            return job
+
+    def get(self, job_id: str) -> Job:
+        with self._cond:
+            return self._jobs[job_id]
+
+    def list(self) -> List[Dict[str, Any]]:
+        with self._cond:
+            return [job.describe() for job in self._jobs.values()]
+
+    def position(self, job_id: str) -> Optional[int]:
+        with self._cond:
+            return self._pending.index(job_id) if job_id in self._pending else None
+
+    def cancel(self, job_id: str) -> Job:
+        with self._cond:
+            job = self._jobs[job_id]
+            if job.done:
+                return job
+            if job_id in self._pending:
+                self._pending.remove(job_id)
+            process = self._processes.get(job_id)
+            self._finish(job, "cancelled")
+        if process is not None:
+            process.terminate()
+        return job
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Job:
+        with self._cond:
+            job = self._jobs[job_id]
+            self._cond.wait_for(lambda: job.done, timeout=timeout)
+            return job
+
+    def events(self, job_id: str, heartbeat: float = 15.0) -> Iterator[Optional[Dict[str, Any]]]:
+        """Yields a snapshot each time the job changes, or None after ``heartbeat`` seconds without one."""
+        seen = -1
+        while True:
+            with self._cond:
+                job = self._jobs[job_id]
+                self._cond.wait_for(lambda: job.version != seen, timeout=heartbeat)
+                changed, seen = job.version != seen, job.version
+                snapshot = job.describe()
+            yield snapshot if changed else None
+            if snapshot["status"] in TERMINAL:
+                return
+
+    def shutdown(self):
+        with self._cond:
+            self._pending.clear()
+            running = list(self._processes)
+        for job_id in running:
+            self.cancel(job_id)
+
+    # -- internals; called with self._cond held --
+
+    def _touch(self, job: Job):
+        job.version += 1
+        self._cond.notify_all()
+
+    def _finish(self, job: Job, status: str):
+        job.status = status
+        job.finished = time.time()
+        self._processes.pop(job.id, None)
+        self._touch(job)
+        self._prune()
+        self._start_next()
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.done]
+        for job_id in finished[:max(0, len(finished) - self.keep_finished)]:
+            del self._jobs[job_id]
+
+    def _start_next(self):
+        while self._pending and len(self._processes) < self.max_concurrent:
+            job = self._jobs[self._pending.popleft()]
+            events = self._context.Queue()
+            process = self._context.Process(target=_run_job, args=(job.request, events), daemon=False)
+            process.start()
+            self._processes[job.id] = process
+            job.status = "running"
+            job.started = time.time()
+            self._touch(job)
+            threading.Thread(target=self._watch, args=(job, process, events), daemon=True).start()
+
+    def _watch(self, job: Job, process, events):
+        outcome = None
+        while outcome is None:
+            try:
+                kind, payload = events.get(timeout=0.5)
+            except queue.Empty:
+                if process.is_alive():
+                    continue
+                try:
+                    # The child may have exited just after its last put.
+                    kind, payload = events.get(timeout=0.1)
+                except queue.Empty:
+                    break
+            with self._cond:
+                if kind == "progress":
+                    job.progress = payload
+                    self._touch(job)
+                else:
+                    outcome = (kind, payload)
+        process.join()
+        with self._cond:
+            if job.done:  # cancelled while running
+                return
+            if outcome and outcome[0] == "result":
+                job.result = outcome[1]
+                self._finish(job, "succeeded")
+            else:
+                job.error_type, job.error = outcome[1] if outcome else (
+                    "RuntimeError", f"Training process exited with code {process.exitcode}")
+                self._finish(job, "failed")
+
+
+def get_job_manager() -> JobManager:
+    global _manager
+    if _manager is None:
+        from api.config import settings
+        _manager = JobManager(settings.MAX_CONCURRENT_JOBS, settings.MAX_QUEUED_JOBS)
+    return _manager
+
+
+_manager: Optional[JobManager] = None
@@ -1,22 +1,20 @@
-from fastapi import FastAPI, APIRouter
-from main.config import settings
-from main.models import TrainRequest
-from main.services import train_model
+from contextlib import asynccontextmanager
 
-app = FastAPI(title="AutoTrainerX API", version="1.0")
-router = APIRouter()
+from fastapi import FastAPI
+from api.config import settings
+from api.jobs import get_job_manager
+from api.predict import get_predictor
+from api.routes import router
 
-@router.get("/")
-def root():
-    return {"message": "Welcome to AutoTrainerX API"}
-
-@router.post("/train")
-def train(request: TrainRequest):
-    result = train_model(request)
-    return {"status": "success", "details": result}
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    get_job_manager().shutdown()
+    get_predictor().batcher.close()
 
+app = FastAPI(title="AutoTrainerX API", version="1.0", lifespan=lifespan)
 app.include_router(router)
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host=settings.HOST, port=settings.PORT)
\ No newline at end of file
+    uvicorn.run(app, host=settings.HOST, port=settings.PORT)
@@ -1,7 +1,17 @@
 # models.py
+from typing import List, Optional
+
 from pydantic import BaseModel
 
 class TrainRequest(BaseModel):
     model_type: str
     hyperparameters: dict
     dataset_path: str
+    # Search spec (see core/search.py); when set, hyperparameters are the fixed base for every trial.
+    search: Optional[dict] = None
+
+class PredictRequest(BaseModel):
+    model_id: str
+    # One row of feature values by column name, or several under "rows".
+    features: Optional[dict] = None
+    rows: Optional[List[dict]] = None
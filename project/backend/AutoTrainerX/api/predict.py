@@ -0,0 +1,181 @@
+# predict.py
+"""Inference for models in the registry.
+
+Loaded models stay in an LRU cache of ``capacity`` entries. Single-row
+requests go through a per-model ``MicroBatcher``: the first row waits at most
+``max_wait`` seconds for others to join, up to ``max_batch`` rows, and the
+batch is encoded and scored in one NumPy call off the event loop. Bulk files
+are scored ``chunk_rows`` at a time and streamed back as JSON lines.
+"""
+import asyncio
+import csv
+import io
+import json
+import threading
+from collections import OrderedDict
+from itertools import count, islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from core.data import encode_rows
+from core.registry import ModelRegistry, TrainedModel
+
+Row = Dict[str, Any]
+
+
+def _as_text(row: Row) -> Dict[str, str]:
+    # encode_rows takes CSV-style strings; JSON bodies may carry numbers or nulls.
+    return {k: "" if v is None else str(v) for k, v in row.items()}
+
+
+class ModelCache:
+    def __init__(self, registry: ModelRegistry, capacity: int = 8):
+        self.registry = registry
+        self.capacity = capacity
+        self._models: "OrderedDict[str, TrainedModel]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, model_id: str) -> TrainedModel:
+        """Raises KeyError for an id the registry doesn't have."""
+        with self._lock:
+            if model_id in self._models:
+                self._models.move_to_end(model_id)
+                return self._models[model_id]
+        try:
+            model = self.registry.load(model_id)
+        except FileNotFoundError:
+            raise KeyError(model_id)
+        with self._lock:
+            self._models[model_id] = model
+            self._models.move_to_end(model_id)
+            while len(self._models) > self.capacity:
+                self._models.popitem(last=False)
+        return model
+
+
+def score(model: TrainedModel, rows: List[Row]) -> List[Dict[str, Any]]:
+    """Vectorised prediction for a list of feature dicts."""
+    X, _ = encode_rows([_as_text(row) for row in rows], model.schema)
+    proba = model.predict_proba(X)
+    labels = np.asarray(model.schema.classes)[proba.argmax(axis=1)]
+    classes = model.schema.classes
+    return [{"label": str(label), "probabilities": dict(zip(classes, p))}
+            for label, p in zip(labels, np.round(proba, 6).tolist())]
+
+
+class MicroBatcher:
+    """Merges concurrent ``submit`` calls for the same key into batches for ``infer(key, rows)``."""
+
+    def __init__(self, infer: Callable[[str, List[Row]], List[Any]], max_batch: int = 64, max_wait: float = 0.005):
+        self.infer = infer
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.batches = 0
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._workers: Dict[str, asyncio.Task] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def submit(self, key: str, row: Row) -> Any:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Queues and tasks belong to one loop; start over if the app moved to another.
+            self._loop, self._queues, self._workers = loop, {}, {}
+        if key not in self._queues:
+            self._queues[key] = asyncio.Queue()
+            self._workers[key] = loop.create_task(self._worker(key, self._queues[key]))
+        future = loop.create_future()
+        self._queues[key].put_nowait((row, future))
+        return await future
+
+    async def _collect(self, queue: asyncio.Queue) -> List[Tuple[Row, asyncio.Future]]:
+        batch = [await queue.get()]
+        deadline = self._loop.time() + self.max_wait
+        while len(batch) < self.max_batch:
+            if not queue.empty():
+                batch.append(queue.get_nowait())
+                continue
+            remaining = deadline - self._loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _worker(self, key: str, queue: asyncio.Queue):
+        while True:
+            batch = await self._collect(queue)
+            self.batches += 1
+            rows = [row for row, _ in batch]
+            try:
+                outcomes = [(True, result) for result in await asyncio.to_thread(self.infer, key, rows)]
+            except Exception as e:
+                # One bad row shouldn't fail everyone batched with it: retry the rows alone.
+                outcomes = [(False, e)] if len(rows) == 1 else await asyncio.to_thread(self._one_by_one, key, rows)
+            for (_, future), (ok, value) in zip(batch, outcomes):
+                if future.done():
+                    continue
+                if ok:
+                    future.set_result(value)
+                else:
+                    future.set_exception(value)
+
+    def _one_by_one(self, key: str, rows: List[Row]) -> List[Tuple[bool, Any]]:
+        outcomes = []
+        for row in rows:
+            try:
+                outcomes.append((True, self.infer(key, [row])[0]))
+            except Exception as e:
+                outcomes.append((False, e))
+        return outcomes
+
+    def close(self):
+        for task in self._workers.values():
+            task.cancel()
+        self._queues, self._workers = {}, {}
+
+
+def read_rows(fileobj, filename: str = "") -> Iterator[Row]:
+    """Rows from an uploaded CSV (with header) or JSONL file, read incrementally."""
+    text = io.TextIOWrapper(fileobj, encoding="utf-8", newline="")
+    if filename.lower().endswith((".jsonl", ".ndjson")):
+        return (json.loads(line) for line in text if line.strip())
+    return iter(csv.DictReader(text))
+
+
+def stream_scores(model: TrainedModel, rows: Iterable[Row], chunk_rows: int = 10_000) -> Iterator[str]:
+    rows = iter(rows)
+    index = count()
+    for chunk in iter(lambda: list(islice(rows, chunk_rows)), []):
+        for result in score(model, chunk):
+            yield json.dumps({"row": next(index), **result}) + "\n"
+
+
+class Predictor:
+    def __init__(self, registry: ModelRegistry, capacity: int = 8, max_batch: int = 64, max_wait: float = 0.005):
+        self.models = ModelCache(registry, capacity)
+        self.batcher = MicroBatcher(self._infer, max_batch, max_wait)
+
+    def _infer(self, model_id: str, rows: List[Row]) -> List[Dict[str, Any]]:
+        return score(self.models.get(model_id), rows)
+
+    async def predict_one(self, model_id: str, row: Row) -> Dict[str, Any]:
+        return await self.batcher.submit(model_id, row)
+
+    def predict_many(self, model_id: str, rows: List[Row]) -> List[Dict[str, Any]]:
+        return self._infer(model_id, rows)
+
+
+_predictor: Optional[Predictor] = None
+
+
+def get_predictor() -> Predictor:
+    global _predictor
+    if _predictor is None:
+        from api.config import settings
+        from api.services import get_registry
+        _predictor = Predictor(get_registry(), settings.PREDICT_CACHE_MODELS, settings.PREDICT_MAX_BATCH,
+                               settings.PREDICT_MAX_WAIT_MS / 1000)
+    return _predictor
@@ -1,15 +1,121 @@
 # routes.py
-from fastapi import APIRouter
-from main.models import TrainRequest
-from main.services import train_model
+import asyncio
+import json
+
+from fastapi import APIRouter, File, HTTPException, UploadFile
+from fastapi.responses import StreamingResponse
+from api.config import settings
+from api.jobs import QueueFullError, get_job_manager
+from api.models import PredictRequest, TrainRequest
+from api.predict import get_predictor, read_rows, stream_scores
+from api.services import cached_result, get_registry, model_key
 
 router = APIRouter()
 
+# Job failures that come from the request rather than the server.
+CLIENT_ERRORS = ("ValueError", "FileNotFoundError")
+
+
+def _job(job_id: str):
+    try:
+        return get_job_manager().get(job_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+
+
+def _model(model_id: str):
+    try:
+        return get_predictor().models.get(model_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown model {model_id}")
+
+
+def _submit(request: TrainRequest):
+    """Queues a job, or records a finished one straight away when the registry already has the model."""
+    try:
+        cached = cached_result(request)
+        if cached is not None:
+            return get_job_manager().record(request.model_dump(), cached, key=cached["model_id"])
+        return get_job_manager().submit(request.model_dump(), key=model_key(request))
+    except (ValueError, FileNotFoundError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+
 @router.get("/")
 def root():
     return {"message": "Welcome to AutoTrainerX API"}
 
 @router.post("/train")
 def train(request: TrainRequest):
-    result = train_model(request)
-    return {"status": "success", "details": result}
+    """Runs a training job and waits for it; use /train/jobs to submit without waiting."""
+    job = get_job_manager().wait(_submit(request).id)
+    if job.status != "succeeded":
+        raise HTTPException(status_code=400 if job.error_type in CLIENT_ERRORS else 500,
+                            detail=job.error or f"Training job {job.status}")
+    return {"status": "success", "details": job.result}
+
+@router.post("/train/jobs", status_code=202)
+def submit_job(request: TrainRequest):
+    job = _submit(request)
+    return {**job.describe(), "queue_position": get_job_manager().position(job.id)}
+
+@router.get("/train/jobs")
+def list_jobs():
+    return {"jobs": get_job_manager().list()}
+
+@router.get("/models/usage")
+def registry_usage():
+    return get_registry().usage()
+
+@router.get("/train/jobs/{job_id}")
+def job_status(job_id: str):
+    job = _job(job_id)
+    return {**job.describe(), "queue_position": get_job_manager().position(job.id)}
+
+@router.get("/train/jobs/{job_id}/events")
+def job_events(job_id: str):
+    """Server-sent events: one ``data:`` line per status or progress change, until the job ends."""
+    _job(job_id)
+
+    def stream():
+        for snapshot in get_job_manager().events(job_id):
+            yield f"data: {json.dumps(snapshot)}\n\n" if snapshot else ": keep-alive\n\n"
+
+    return StreamingResponse(stream(), media_type="text/event-stream")
+
+@router.post("/train/jobs/{job_id}/cancel")
+def cancel_job(job_id: str):
+    _job(job_id)
+    return get_job_manager().cancel(job_id).describe()
+
+@router.get("/train/jobs/{job_id}/result")
+def job_result(job_id: str):
+    job = _job(job_id)
+    if not job.done:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is {job.status}")
+    return {**job.describe(), "result": job.result}
+
+@router.post("/predict")
+async def predict(request: PredictRequest):
+    """One row (``features``) is micro-batched with concurrent requests; ``rows`` is scored as given."""
+    if (request.features is None) == (request.rows is None):
+        raise HTTPException(status_code=400, detail="Send either features or rows")
+    # Loading a model reads from disk and touches the registry index; keep both off the event loop.
+    await asyncio.to_thread(_model, request.model_id)
+    predictor = get_predictor()
+    try:
+        if request.features is not None:
+            return {"model_id": request.model_id, **await predictor.predict_one(request.model_id, request.features)}
+        predictions = await asyncio.to_thread(predictor.predict_many, request.model_id, request.rows)
+        return {"model_id": request.model_id, "predictions": predictions}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/predict/{model_id}/batch")
+def predict_batch(model_id: str, file: UploadFile = File(...)):
+    """Scores a CSV or JSONL upload, streaming one JSON line per input row."""
+    model = _model(model_id)
+    rows = read_rows(file.file, file.filename or "")
+    return StreamingResponse(stream_scores(model, rows, settings.PREDICT_CHUNK_ROWS), media_type="application/x-ndjson")
@@ -1,3 +1,35 @@
 # services.py
-def train_model(request):
-    return f"Training {request.model_type} with hyperparameters {request.hyperparameters} using dataset {request.dataset_path}"
+from typing import Optional
+
+from api.config import settings
+from core.registry import ModelRegistry, train_cached
+from core.search import run_search
+
+_registry: Optional[ModelRegistry] = None
+
+
+def get_registry() -> ModelRegistry:
+    global _registry
+    if _registry is None:
+        _registry = ModelRegistry(settings.MODEL_REGISTRY_DIR, settings.MODEL_REGISTRY_QUOTA_MB * 1024 * 1024)
+    return _registry
+
+
+def model_key(request) -> Optional[str]:
+    """Registry key for a plain training request; searches aren't memoised as one model."""
+    if request.search:
+        return None
+    return get_registry().key_for(request.model_type, request.dataset_path, request.hyperparameters)
+
+
+def cached_result(request) -> Optional[dict]:
+    key = model_key(request)
+    summary = get_registry().summary(key) if key else None
+    return {**summary, "model_id": key, "cached": True} if summary is not None else None
+
+
+def train_model(request, progress=None):
+    if request.search:
+        return run_search(request.model_type, request.dataset_path, request.search, request.hyperparameters)
+    return train_cached(get_registry(), request.model_type, request.dataset_path, request.hyperparameters,
+                        progress=progress)
@@ -0,0 +1,64 @@
+# benchmarks/bench_training.py
+"""Training and prediction throughput (rows per second) for the core model families.
+
+Data is synthetic (Gaussian features, labels from a random linear map), so the
+numbers only depend on the engine:
+
+    python -m benchmarks.bench_training --rows 100000 --features 32 --classes 4
+"""
+import argparse
+import time
+
+import numpy as np
+
+from core.models import DecisionTree, LinearSVM, MLPClassifier
+
+
+def make_data(rows: int, features: int, classes: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    X = rng.standard_normal((rows, features)).astype(np.float32)
+    y = (X @ rng.standard_normal((features, classes))).argmax(axis=1)
+    return X, y
+
+
+def bench(name, model, X, y, passes):
+    start = time.perf_counter()
+    model.fit(X, y)
+    fit_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    accuracy = float(np.mean(model.predict(X) == y))
+    predict_seconds = time.perf_counter() - start
+    return {
+        "model": name,
+        "fit_s": round(fit_seconds, 3),
+        "train_rows_per_s": round(len(y) * passes / fit_seconds),
+        "predict_rows_per_s": round(len(y) / predict_seconds),
+        "accuracy": round(accuracy, 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rows/s for MLP, decision tree and linear SVM training.")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--features", type=int, default=32)
+    parser.add_argument("--classes", type=int, default=4)
+    parser.add_argument("--epochs", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=256)
+    args = parser.parse_args()
+
+    X, y = make_data(args.rows, args.features, args.classes)
+    results = [
+        bench("Neural Network", MLPClassifier(hidden_layers=(64,), epochs=args.epochs, batch_size=args.batch_size),
+              X, y, args.epochs),
+        bench("SVM", LinearSVM(epochs=args.epochs, batch_size=args.batch_size), X, y, args.epochs),
+        bench("Decision Tree", DecisionTree(max_depth=8), X, y, 1),
+    ]
+    columns = list(results[0])
+    widths = [max(len(c), *(len(str(r[c])) for r in results)) for c in columns]
+    print("  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+    for r in results:
+        print("  ".join(str(r[c]).ljust(w) for c, w in zip(columns, widths)))
+
+
+if __name__ == "__main__":
+    main()
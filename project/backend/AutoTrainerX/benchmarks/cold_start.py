@@ -0,0 +1,117 @@
+# benchmarks/cold_start.py
+"""Cold-start benchmark and import-time profile for ``main.py``.
+
+Each run starts a fresh interpreter, imports ``main`` and serves its first
+request in-process, which is what a new uvicorn worker does before it can take
+traffic. The median of several runs is checked against the budgets in
+``benchmarks/budgets.json``.
+
+    python -m benchmarks.cold_start                 # measure and enforce the budget
+    python -m benchmarks.cold_start --profile       # top imports by cumulative time
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+BUDGET_FILE = Path(__file__).resolve().parent / "budgets.json"
+
+PROBE = """
+import asyncio, json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+import main
+imported = time.perf_counter()
+import httpx
+
+async def first_request():
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://cold-start") as client:
+        return (await client.get("/")).status_code
+
+status = asyncio.run(first_request())
+served = time.perf_counter()
+print(json.dumps({{"import_ms": (imported - start) * 1000, "first_request_ms": (served - start) * 1000,
+                   "status": status, "heavy_modules": [m for m in ("streamlit", "pandas", "PyPDF2") if m in sys.modules]}}))
+"""
+
+
+def _env() -> Dict[str, str]:
+    env = dict(os.environ)
+    env.setdefault("DEEPSEEK_API_KEY", "cold-start-key")
+    return env
+
+
+def measure(runs: int) -> List[Dict[str, float]]:
+    samples = []
+    with tempfile.TemporaryDirectory(prefix="autotrainerx-cold-") as workdir:
+        for _ in range(runs):
+            start = time.perf_counter()
+            out = subprocess.run([sys.executable, "-c", PROBE.format(root=str(ROOT))], cwd=workdir, env=_env(),
+                                 capture_output=True, text=True, check=True)
+            sample = json.loads(out.stdout.strip().splitlines()[-1])
+            sample["process_ms"] = (time.perf_counter() - start) * 1000
+            samples.append(sample)
+    return samples
+
+
+def import_profile(top: int) -> List[Dict[str, float]]:
+    """Top-level packages imported by ``main`` ordered by cumulative import time."""
+    with tempfile.TemporaryDirectory(prefix="autotrainerx-imports-") as workdir:
+        code = f"import sys; sys.path.insert(0, {str(ROOT)!r}); import main"
+        out = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=workdir, env=_env(),
+                             capture_output=True, text=True, check=True)
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        # -X importtime indents nested imports by two spaces per level; keep the top two levels.
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth <= 1:
+            rows.append({"module": name.strip(), "self_ms": int(self_us) / 1000,
+                         "cumulative_ms": int(cumulative_us) / 1000})
+    rows.sort(key=lambda row: row["cumulative_ms"], reverse=True)
+    return rows[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure main.py cold start against its budget.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--profile", action="store_true", help="print the import-time profile instead")
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.profile:
+        print(f"{'module':40} {'self_ms':>10} {'cumulative_ms':>14}")
+        for row in import_profile(args.top):
+            print(f"{row['module']:40} {row['self_ms']:>10.1f} {row['cumulative_ms']:>14.1f}")
+        return
+
+    samples = measure(args.runs)
+    budget = json.loads(BUDGET_FILE.read_text(encoding="utf-8"))
+    failures = []
+    for key in ("import_ms", "first_request_ms", "process_ms"):
+        median = statistics.median(s[key] for s in samples)
+        limit = budget.get(key)
+        verdict = "ok" if limit is None or median <= limit else "OVER BUDGET"
+        print(f"{key:18} median {median:8.1f} ms  budget {limit if limit is not None else '-':>6} ms  {verdict}")
+        if verdict != "ok":
+            failures.append(key)
+    heavy = sorted({m for s in samples for m in s["heavy_modules"]})
+    if heavy:
+        print(f"heavy modules imported at startup: {', '.join(heavy)}")
+        failures.append("heavy_modules")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
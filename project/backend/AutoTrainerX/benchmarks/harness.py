@@ -0,0 +1,149 @@
+# benchmarks/harness.py
+"""Load driver, latency statistics and baseline comparison shared by the benchmarks."""
+import asyncio
+import json
+import math
+import platform
+import socket
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list (q in 0..100)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(name: str, latencies: List[float], errors: int, elapsed: float, concurrency: int) -> Dict[str, Any]:
+    ordered = sorted(latencies)
+    total = len(latencies) + errors
+    return {
+        "name": name,
+        "requests": total,
+        "errors": errors,
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 4),
+        "throughput_rps": round(total / elapsed, 2) if elapsed > 0 else 0.0,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3) if ordered else 0.0,
+    }
+
+
+async def run_load(name: str, call: Callable[[int], Awaitable[bool]], total: int, concurrency: int) -> Dict[str, Any]:
+    """Runs ``call(i)`` ``total`` times with at most ``concurrency`` in flight.
+
+    ``call`` returns True on success; False or an exception counts as an error.
+    Only successful calls contribute to the latency percentiles.
+    """
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            start = time.perf_counter()
+            try:
+                ok = await call(i)
+            except Exception:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, min(concurrency, total)))))
+    return summarize(name, latencies, errors, time.perf_counter() - start, concurrency)
+
+
+def format_table(results: List[Dict[str, Any]]) -> str:
+    columns = ["name", "requests", "errors", "concurrency", "throughput_rps", "p50_ms", "p95_ms", "p99_ms"]
+    rows = [columns] + [[str(r.get(c, "")) for c in columns] for r in results]
+    widths = [max(len(row[i]) for row in rows) for i in range(len(columns))]
+    return "\n".join("  ".join(cell.ljust(w) for cell, w in zip(row, widths)) for row in rows)
+
+
+def baseline_path(suite: str, directory: Path = BASELINE_DIR) -> Path:
+    return directory / f"{suite}.json"
+
+
+def save_baseline(suite: str, results: List[Dict[str, Any]], directory: Path = BASELINE_DIR) -> Path:
+    directory.mkdir(parents=True, exist_ok=True)
+    path = baseline_path(suite, directory)
+    payload = {
+        "suite": suite,
+        "recorded_at": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": {r["name"]: r for r in results},
+    }
+    path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    return path
+
+
+def load_baseline(suite: str, directory: Path = BASELINE_DIR) -> Optional[Dict[str, Any]]:
+    path = baseline_path(suite, directory)
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any], tolerance: float = 0.2) -> List[str]:
+    """Returns a line per metric that regressed by more than ``tolerance`` (0.2 = 20%)."""
+    regressions = []
+    previous = baseline.get("results", {})
+    for result in results:
+        old = previous.get(result["name"])
+        if not old:
+            continue
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            if old.get(key) and result[key] > old[key] * (1 + tolerance):
+                regressions.append(f"{result['name']}: {key} {old[key]} -> {result[key]}")
+        if old.get("throughput_rps") and result["throughput_rps"] < old["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{result['name']}: throughput_rps {old['throughput_rps']} -> {result['throughput_rps']}")
+    return regressions
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class BackgroundServer:
+    """Runs an ASGI app under uvicorn on a daemon thread for the duration of a ``with`` block."""
+
+    def __init__(self, app, host: str = "127.0.0.1", port: Optional[int] = None):
+        import uvicorn
+        self.host = host
+        self.port = port or free_port()
+        self.server = uvicorn.Server(uvicorn.Config(app, host=host, port=self.port, log_level="warning"))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def __enter__(self):
+        self.thread.start()
+        deadline = time.monotonic() + 10
+        while not self.server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError("mock server did not start")
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join(timeout=5)
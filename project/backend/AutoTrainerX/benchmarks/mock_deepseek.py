@@ -0,0 +1,143 @@
+# benchmarks/mock_deepseek.py
+"""Local OpenAI-compatible stand-in for the DeepSeek chat completions API.
+
+Answers ``POST /chat/completions`` (and ``/v1/chat/completions``) with
+well-formed question/step arrays after a configurable delay. It can also
+stream SSE chunks, reply 429 for a share of requests, or return a body that
+is not valid JSON, so benchmarks can exercise the error paths too.
+
+    python -m benchmarks.mock_deepseek --port 8100 --latency 0.2 --rate-limit 0.05
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+
+@dataclass
+class MockConfig:
+    latency: float = 0.05          # seconds before the first byte
+    jitter: float = 0.0            # uniform +/- jitter added to latency
+    rate_limit_ratio: float = 0.0  # share of requests answered with 429
+    malformed_ratio: float = 0.0   # share of requests answered with a broken JSON body
+    stream_chunk_delay: float = 0.005
+    seed: Optional[int] = None
+
+
+def _requested_count(prompt: str, default: int = 3) -> int:
+    match = re.search(r"\b(?:generate|create|with)\s+(\d{1,3})\b", prompt, re.IGNORECASE)
+    return max(1, min(int(match.group(1)), 50)) if match else default
+
+
+def _fake_item(i: int) -> dict:
+    answer = f"Option A{i}"
+    return {
+        "id": f"mock-{i}-{uuid.uuid4().hex[:8]}",
+        "title": f"Mock step {i + 1}",
+        "description": f"Mock description {i + 1}",
+        "instructions": ["Read the prompt", "Write the code"],
+        "challenge": {"question": f"Mock challenge {i + 1}", "expected_output": "42"},
+        "hint": "Think about edge cases",
+        "question": f"Mock question {i + 1} ({uuid.uuid4().hex[:6]})?",
+        "options": [answer, f"Option B{i}", f"Option C{i}", f"Option D{i}"],
+        "correctAnswer": answer,
+        "correct_answer": answer,
+        "explanation": "Because the mock says so.",
+        "difficulty": "intermediate",
+    }
+
+
+def fake_completion_content(prompt: str) -> str:
+    """Content shaped like what the prompt asks for: a JSON object or a JSON array."""
+    if "Respond with ONLY the filename" in prompt:
+        return "mock.txt"
+    items = [_fake_item(i) for i in range(_requested_count(prompt))]
+    wants_array = "JSON array" in prompt or re.search(r"JSON format:\s*\[", prompt)
+    if not wants_array and "JSON" in prompt:
+        return json.dumps(items[0])
+    return "```json\n" + json.dumps(items) + "\n```"
+
+
+def create_app(config: Optional[MockConfig] = None) -> FastAPI:
+    config = config or MockConfig()
+    rng = random.Random(config.seed)
+    app = FastAPI(title="Mock DeepSeek")
+    app.state.config = config
+    app.state.calls = 0
+
+    async def chat_completions(request: Request):
+        app.state.calls += 1
+        body = await request.json()
+        delay = config.latency + (rng.uniform(-config.jitter, config.jitter) if config.jitter else 0.0)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if rng.random() < config.rate_limit_ratio:
+            return JSONResponse(status_code=429, content={"error": {"message": "Rate limit reached", "type": "rate_limit"}},
+                                headers={"Retry-After": "1"})
+        if rng.random() < config.malformed_ratio:
+            return Response(content='{"choices": [{"message": {"content": "[{\\"question\\": ', media_type="application/json")
+
+        prompt = "\n".join(str(m.get("content", "")) for m in body.get("messages", []))
+        content = fake_completion_content(prompt)
+        prompt_tokens = max(1, len(prompt) // 4)
+        completion_tokens = max(1, len(content) // 4)
+        created = int(time.time())
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        model = body.get("model", "deepseek-chat")
+
+        if body.get("stream"):
+            async def events():
+                for start in range(0, len(content), 64):
+                    chunk = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                             "choices": [{"index": 0, "delta": {"content": content[start:start + 64]}, "finish_reason": None}]}
+                    yield f"data: {json.dumps(chunk)}\n\n"
+                    if config.stream_chunk_delay:
+                        await asyncio.sleep(config.stream_chunk_delay)
+                done = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                        "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+                yield f"data: {json.dumps(done)}\n\n"
+                yield "data: [DONE]\n\n"
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        }
+
+    app.add_api_route("/chat/completions", chat_completions, methods=["POST"])
+    app.add_api_route("/v1/chat/completions", chat_completions, methods=["POST"])
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local DeepSeek-compatible mock server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="share of requests answered with 429")
+    parser.add_argument("--malformed", type=float, default=0.0, help="share of requests answered with broken JSON")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    import uvicorn
+    config = MockConfig(latency=args.latency, jitter=args.jitter, rate_limit_ratio=args.rate_limit,
+                        malformed_ratio=args.malformed, seed=args.seed)
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+# benchmarks/run.py
+"""End-to-end benchmarks for the API in ``main.py`` against the mock DeepSeek server.
+
+The app is imported inside a scratch working directory, so uploads, queues and
+LMS stores written during the run never touch the real data, and it is driven
+in-process through ``httpx.ASGITransport``. DeepSeek traffic goes over real
+HTTP to ``benchmarks.mock_deepseek``.
+
+    python -m benchmarks.run --requests 200 --concurrency 16 --latency 0.05
+    python -m benchmarks.run --save-baseline          # record benchmarks/baselines/e2e.json
+    python -m benchmarks.run --compare --tolerance 0.25
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import httpx
+
+from benchmarks.harness import BackgroundServer, compare, format_table, load_baseline, run_load, save_baseline
+from benchmarks.mock_deepseek import MockConfig, create_app
+
+ROOT = Path(__file__).resolve().parent.parent
+SAMPLE_PDF = ROOT / "dsa_uploads" / "data-structure-questions.pdf"
+SAMPLE_TEXT = (b"Binary search halves the search interval on every step. "
+               b"A stack is a LIFO structure, a queue is FIFO. " * 40)
+
+
+def load_app(workdir: Path, deepseek_url: str):
+    """Imports main.py with its relative data directories rooted at ``workdir``."""
+    os.environ.setdefault("DEEPSEEK_API_KEY", "benchmark-key")
+    os.chdir(workdir)
+    for sub in ("lms_uploads/notes", "lms_uploads/submissions"):
+        (workdir / sub).mkdir(parents=True, exist_ok=True)
+    if str(ROOT) not in sys.path:
+        sys.path.insert(0, str(ROOT))
+    import main
+    main.settings.deepseek_url = f"{deepseek_url}/chat/completions"
+    main.STATE_FILE = str(workdir / "daily_challenge_state.json")
+    logging.getLogger("main").setLevel(logging.WARNING)
+    return main
+
+
+async def bench_generate_questions(client, main, args):
+    await client.post("/upload/", files=[("files", ("bench_notes.txt", SAMPLE_TEXT))],
+                      data={"stream": "bench", "exam": "bench-topic", "subject": "bench-subject"})
+
+    async def call(i):
+        response = await client.post("/generate-questions/", json={
+            "subject": "bench-subject", "topic": "bench-topic", "prompt": "benchmark", "question_count": 5})
+        return response.status_code == 200
+    return await run_load("generate_questions", call, args.requests, args.concurrency)
+
+
+async def bench_queue_pop(client, main, args):
+    await client.post("/fill-queue/", params={"language": "python"})
+
+    async def call(i):
+        response = await client.post("/pop-next-question/", params={"language": "python"})
+        return response.status_code == 200
+    return await run_load("queue_pop", call, args.requests, args.concurrency)
+
+
+async def bench_queue_peek(client, main, args):
+    await client.post("/fill-queue/", params={"language": "java"})
+
+    async def call(i):
+        response = await client.post("/peek-next-question/", params={"language": "java"})
+        return response.status_code == 200
+    return await run_load("queue_peek", call, args.requests, args.concurrency)
+
+
+async def bench_lms_upload(client, main, args):
+    async def call(i):
+        response = await client.post("/lms/upload/", files=[("files", (f"notes_{i}.txt", SAMPLE_TEXT))],
+                                     data={"teacher": "bench", "course": "bench", "description": ""})
+        return response.status_code == 200
+    return await run_load("lms_upload", call, args.requests, args.concurrency)
+
+
+async def bench_lms_quiz_result(client, main, args):
+    async def call(i):
+        response = await client.post("/lms/quiz/result/", json={
+            "quizId": f"quiz-{i % 10}", "studentId": f"student-{i}", "classId": "bench-class",
+            "answers": ["A", "B"], "score": i % 100, "timeTaken": 30})
+        return response.status_code == 200
+    return await run_load("lms_quiz_result", call, args.requests, args.concurrency)
+
+
+async def bench_pdf_extract(client, main, args):
+    async def call(i):
+        return bool(await main.extract_text_from_pdf(str(SAMPLE_PDF)))
+    return await run_load("pdf_extract", call, max(1, args.requests // 10), args.concurrency)
+
+
+SCENARIOS = {
+    "generate_questions": bench_generate_questions,
+    "queue_pop": bench_queue_pop,
+    "queue_peek": bench_queue_peek,
+    "lms_upload": bench_lms_upload,
+    "lms_quiz_result": bench_lms_quiz_result,
+    "pdf_extract": bench_pdf_extract,
+}
+
+
+async def run_scenarios(main, names, args):
+    transport = httpx.ASGITransport(app=main.app)
+    results = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300.0) as client:
+        for name in names:
+            results.append(await SCENARIOS[name](client, main, args))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end API benchmarks against a mock DeepSeek.")
+    parser.add_argument("--scenarios", default="all", help=f"comma-separated subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.05, help="mock DeepSeek latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="share of mock responses that are 429")
+    parser.add_argument("--malformed", type=float, default=0.0, help="share of mock responses with broken JSON")
+    parser.add_argument("--suite", default="e2e", help="baseline file name under benchmarks/baselines/")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true", help="fail if results regress against the saved baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    names = list(SCENARIOS) if args.scenarios == "all" else [n.strip() for n in args.scenarios.split(",")]
+    unknown = [n for n in names if n not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    config = MockConfig(latency=args.latency, jitter=args.jitter, rate_limit_ratio=args.rate_limit,
+                        malformed_ratio=args.malformed, seed=0)
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="autotrainerx-bench-") as workdir, \
+            BackgroundServer(create_app(config)) as mock:
+        try:
+            app_module = load_app(Path(workdir), mock.url)
+            results = asyncio.run(run_scenarios(app_module, names, args))
+        finally:
+            os.chdir(cwd)
+
+    print(format_table(results))
+    if args.compare:
+        baseline = load_baseline(args.suite)
+        if baseline is None:
+            print(f"No baseline recorded for suite '{args.suite}'.")
+        else:
+            regressions = compare(results, baseline, args.tolerance)
+            for line in regressions:
+                print(f"REGRESSION {line}")
+            if regressions:
+                sys.exit(1)
+    if args.save_baseline:
+        print(f"Baseline written to {save_baseline(args.suite, results)}")
+
+
+if __name__ == "__main__":
+    main()
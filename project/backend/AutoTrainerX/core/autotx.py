@@ -1,9 +1,101 @@
 # core/autotx.py
+import inspect
+import time
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from .data import Dataset, Standardizer, train_test_split
+from .dataset_cache import load_dataset
+from .models import DecisionTree, LinearSVM, MLPClassifier, Progress
+
+MODEL_FAMILIES = {
+    "Neural Network": MLPClassifier,
+    "Decision Tree": DecisionTree,
+    "SVM": LinearSVM,
+}
+
+# Hyperparameter aliases accepted from the UI/API, mapped to constructor arguments.
+_ALIASES = {"lr": "learning_rate", "depth": "max_depth", "hidden": "hidden_layers"}
+_PIPELINE_KEYS = {"target", "validation_split", "standardize", "seed"}
+
+
+def build_model(model_type: str, hyperparameters: Dict[str, Any]):
+    try:
+        family = MODEL_FAMILIES[model_type]
+    except KeyError:
+        raise ValueError(f"Unknown model type {model_type!r}; expected one of {sorted(MODEL_FAMILIES)}")
+    params = {}
+    accepted = {name for name, param in inspect.signature(family).parameters.items()
+                if param.kind in (param.POSITIONAL_OR_KEYWORD, param.KEYWORD_ONLY)}
+    for key, value in hyperparameters.items():
+        name = _ALIASES.get(key, key)
+        if name in accepted:
+            params[name] = value
+        elif key not in _PIPELINE_KEYS:
+            raise ValueError(f"Unknown hyperparameter {key!r} for {model_type}")
+    return family(**params)
+
+
+def wants_scaling(model_type: str, hyperparameters: Dict[str, Any]) -> bool:
+    # Gradient-based models need scaled inputs; trees split on raw values.
+    return hyperparameters.get("standardize", MODEL_FAMILIES.get(model_type) is not DecisionTree)
+
+
 class AutoTrainer:
-    def __init__(self, model_type: str, dataset_path: str, hyperparameters: dict):
+    def __init__(self, model_type: str, dataset_path: str, hyperparameters: dict,
+                 cache_dir: Optional[str] = None, use_cache: bool = True):
         self.model_type = model_type
         self.dataset_path = dataset_path
-        self.hyperparameters = hyperparameters
+        self.cache_dir = cache_dir
+        self.use_cache = use_cache
+        self.hyperparameters = hyperparameters or {}
+        self.model = None
+        self.scaler: Optional[Standardizer] = None
+        self.dataset: Optional[Dataset] = None
+
+    def load(self) -> Dataset:
+        if self.dataset is None:
+            self.dataset = load_dataset(self.dataset_path, self.hyperparameters.get("target"), self.cache_dir,
+                                        use_cache=self.use_cache)
+        return self.dataset
+
+    def split(self):
+        """The unscaled ``(X_train, X_val, y_train, y_val)`` split ``train`` uses."""
+        data = self.load()
+        return train_test_split(data.X, data.y, self.hyperparameters.get("validation_split", 0.2),
+                                self.hyperparameters.get("seed", 0))
+
+    def train(self, progress: Progress = None) -> Dict[str, Any]:
+        """Fits the model on a train split and reports accuracy on both splits plus throughput."""
+        data = self.load()
+        X_train, X_val, y_train, y_val = self.split()
+        self.model = build_model(self.model_type, self.hyperparameters)
+        if wants_scaling(self.model_type, self.hyperparameters):
+            self.scaler = Standardizer().fit(X_train)
+            X_train, X_val = self.scaler.transform(X_train), self.scaler.transform(X_val)
+
+        start = time.perf_counter()
+        self.model.fit(X_train, y_train, progress=progress, n_classes=data.n_classes)
+        seconds = time.perf_counter() - start
+        passes = getattr(self.model, "epochs", 1)
+        return {
+            "model_type": self.model_type,
+            "rows": int(len(data.y)),
+            "features": len(data.feature_names),
+            "classes": data.classes,
+            "train_accuracy": float(np.mean(self.model.predict(X_train) == y_train)),
+            "validation_accuracy": float(np.mean(self.model.predict(X_val) == y_val)) if len(y_val) else None,
+            "train_seconds": round(seconds, 4),
+            "rows_per_second": round(len(y_train) * passes / seconds, 1) if seconds > 0 else None,
+        }
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        if self.scaler is not None:
+            X = self.scaler.transform(X)
+        return self.model.predict(X)
 
-    def train(self):
-        return f"Training {self.model_type} using {self.dataset_path} with {self.hyperparameters}"
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        if self.scaler is not None:
+            X = self.scaler.transform(X)
+        return self.model.predict_proba(X)
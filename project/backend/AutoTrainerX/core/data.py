@@ -0,0 +1,208 @@
+# core/data.py
+import csv
+import hashlib
+import os
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from utils.csv_reader import iter_csv_chunks
+from utils.storage import file_signature
+
+
+@dataclass
+class Dataset:
+    X: np.ndarray                      # (rows, features) float32
+    y: np.ndarray                      # (rows,) int64 class indices
+    feature_names: List[str]
+    classes: List[str]
+    # Category lists for string feature columns, by feature index.
+    categories: dict = field(default_factory=dict)
+    target: Optional[str] = None
+    # Values used for empty numeric cells, by feature index.
+    fill: dict = field(default_factory=dict)
+
+    @property
+    def n_classes(self) -> int:
+        return len(self.classes)
+
+    def schema(self) -> dict:
+        """Everything but the arrays, as JSON-safe data; see ``from_schema``."""
+        return {"feature_names": self.feature_names, "classes": self.classes, "target": self.target,
+                "categories": self.categories, "fill": self.fill}
+
+    @classmethod
+    def from_schema(cls, schema: dict, X: Optional[np.ndarray] = None, y: Optional[np.ndarray] = None) -> "Dataset":
+        if X is None:
+            X = np.empty((0, len(schema["feature_names"])), dtype=np.float32)
+        return cls(X=X, y=np.empty(0, dtype=np.int64) if y is None else y, feature_names=schema["feature_names"],
+                   classes=schema["classes"], target=schema["target"],
+                   # JSON turns the int keys into strings.
+                   categories={int(k): v for k, v in schema["categories"].items()},
+                   fill={int(k): v for k, v in schema["fill"].items()})
+
+
+_digests: Dict[str, Tuple[Tuple[int, int, int], str]] = {}
+
+
+def dataset_digest(path: str) -> str:
+    """sha256 of the file's bytes, memoised on its (inode, mtime, size) signature."""
+    path = os.path.abspath(path)
+    signature = file_signature(path)
+    if signature is None:
+        raise FileNotFoundError(f"Dataset not found: {path}")
+    cached = _digests.get(path)
+    if cached and cached[0] == signature:
+        return cached[1]
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    _digests[path] = (signature, digest.hexdigest())
+    return _digests[path][1]
+
+
+def _to_float(column: List[str]) -> Optional[np.ndarray]:
+    try:
+        return np.array([float(v) if v.strip() else np.nan for v in column], dtype=np.float32)
+    except ValueError:
+        return None
+
+
+def load_csv(path: str, target: Optional[str] = None) -> Dataset:
+    """Reads a CSV into a numeric feature matrix and encoded labels.
+
+    ``target`` names the label column (default: the last one). Numeric columns
+    are parsed as float32 with empty cells set to the column mean; any other
+    column is encoded as category codes.
+    """
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        columns: List[List[str]] = [[] for _ in header]
+        for row in reader:
+            if not row:
+                continue
+            for i, value in enumerate(row[:len(header)]):
+                columns[i].append(value)
+    if not columns or not columns[0]:
+        raise ValueError(f"{path} has no data rows")
+
+    target_index = header.index(target) if target else len(header) - 1
+    classes, y = np.unique(np.array(columns[target_index]), return_inverse=True)
+
+    features, names, categories, fill = [], [], {}, {}
+    for i, name in enumerate(header):
+        if i == target_index:
+            continue
+        values = _to_float(columns[i])
+        if values is None:
+            cats, codes = np.unique(np.array(columns[i]), return_inverse=True)
+            categories[len(names)] = cats.tolist()
+            values = codes.astype(np.float32)
+        else:
+            fill[len(names)] = float(np.nanmean(values)) if not np.isnan(values).all() else 0.0
+            values[np.isnan(values)] = fill[len(names)]
+        features.append(values)
+        names.append(name)
+
+    X = np.column_stack(features) if features else np.empty((len(y), 0), dtype=np.float32)
+    return Dataset(X=X.astype(np.float32, copy=False), y=y.astype(np.int64), feature_names=names,
+                   classes=[str(c) for c in classes], categories=categories, target=header[target_index],
+                   fill=fill)
+
+
+def encode_rows(rows: List[Dict[str, str]], schema: Dataset) -> Tuple[np.ndarray, np.ndarray]:
+    """Encodes CSV rows with the columns, categories and classes of an already loaded ``schema``.
+
+    Labels and categories the schema has not seen are encoded as -1.
+    """
+    X = np.empty((len(rows), len(schema.feature_names)), dtype=np.float32)
+    for j, name in enumerate(schema.feature_names):
+        column = [row.get(name) or "" for row in rows]
+        if j in schema.categories:
+            codes = {c: i for i, c in enumerate(schema.categories[j])}
+            X[:, j] = [codes.get(v, -1) for v in column]
+            continue
+        values = _to_float(column)
+        if values is None:
+            raise ValueError(f"Column {name!r} is numeric in the training data but not in this file")
+        values[np.isnan(values)] = schema.fill.get(j, 0.0)
+        X[:, j] = values
+    labels = {c: i for i, c in enumerate(schema.classes)}
+    y = np.array([labels.get(row.get(schema.target, ""), -1) for row in rows], dtype=np.int64)
+    return X, y
+
+
+def iter_csv_batches(path: str, schema: Dataset, chunk_rows: int = 50_000) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """Streams a CSV as encoded ``(X, y)`` batches; only one chunk is in memory at a time."""
+    for rows in iter_csv_chunks(path, chunk_rows):
+        yield encode_rows(rows, schema)
+
+
+def train_test_split(X: np.ndarray, y: np.ndarray, test_size: float = 0.2,
+                     seed: int = 0) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    order = np.random.default_rng(seed).permutation(len(y))
+    cut = len(y) - int(round(len(y) * test_size))
+    train, test = order[:cut], order[cut:]
+    return X[train], X[test], y[train], y[test]
+
+
+class Standardizer:
+    """Per-feature zero mean / unit variance, kept with the model so predictions use the same scaling."""
+
+    def __init__(self, mean: Optional[np.ndarray] = None, scale: Optional[np.ndarray] = None):
+        self.mean = mean
+        self.scale = scale
+
+    def fit(self, X: np.ndarray) -> "Standardizer":
+        self.mean = X.mean(axis=0)
+        std = X.std(axis=0)
+        self.scale = np.where(std > 0, std, 1.0).astype(np.float32)
+        return self
+
+    def transform(self, X: np.ndarray) -> np.ndarray:
+        return ((X - self.mean) / self.scale).astype(np.float32, copy=False)
+
+
+# Arrays placed in shared memory by a parent process, as attached in a pool worker.
+shared_arrays: Dict[str, np.ndarray] = {}
+_segments: List[shared_memory.SharedMemory] = []
+
+
+def share_arrays(arrays: Dict[str, np.ndarray]):
+    """Copies ``arrays`` into new shared memory segments.
+
+    Returns the segments, which the caller closes and unlinks when its pool is
+    done, and the specs to pass to :func:`attach_arrays` as a pool initializer.
+    """
+    segments, specs = [], {}
+    for key, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        segment = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=segment.buf)[...] = array
+        segments.append(segment)
+        specs[key] = (segment.name, array.shape, array.dtype.str)
+    return segments, specs
+
+
+def attach_arrays(specs: Dict[str, Tuple[str, Tuple[int, ...], str]]):
+    """Pool initializer: maps the parent's shared arrays into ``shared_arrays``.
+
+    Pool workers share the parent's resource tracker whatever the start
+    method, so attaching only re-registers a name the tracker already holds.
+    Unregistering here would drop the parent's registration and make its
+    ``unlink`` fail in the tracker.
+    """
+    for key, (name, shape, dtype) in specs.items():
+        segment = shared_memory.SharedMemory(name=name)
+        _segments.append(segment)
+        shared_arrays[key] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=segment.buf)
+
+
+def release_arrays(segments: List[shared_memory.SharedMemory]):
+    for segment in segments:
+        segment.close()
+        segment.unlink()
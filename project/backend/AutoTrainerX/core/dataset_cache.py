@@ -0,0 +1,228 @@
+# core/dataset_cache.py
+"""Columnar binary cache of parsed training CSVs.
+
+A CSV is converted once, in two streaming passes (profile the columns, then
+encode), into ``<cache_dir>/<sha256>-<target>/``:
+
+* ``X.npy`` - float32 features in column-major order, so every column is one
+  contiguous block and ``X[:, j]`` is a view of it;
+* ``y.npy`` - int64 class indices;
+* ``manifest.json`` - the ``Dataset`` schema (names, classes, categories,
+  fill values) plus row count and source.
+
+Later loads memory-map both arrays read-only, so nothing is parsed and
+processes loading the same file share its pages through the OS cache.
+Encoding matches ``load_csv``: numeric columns become float32 with blanks set
+to the column mean, any other column becomes sorted category codes.
+
+Like the model registry, ``index.json`` records each entry's size and last
+use, and once the cache grows past its quota the least recently used entries
+are deleted, so edited CSVs don't leave full copies behind forever.
+"""
+import csv
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+import numpy as np
+
+from utils.csv_reader import iter_csv_chunks
+from utils.storage import JsonStore
+
+from .data import Dataset, _to_float, dataset_digest, encode_rows, load_csv
+
+CHUNK_ROWS = 50_000
+DEFAULT_QUOTA_BYTES = 4 * 1024 ** 3
+# Hits closer together than this don't rewrite the index just to move last_used.
+TOUCH_INTERVAL = 60.0
+
+
+def default_cache_dir() -> str:
+    # Read on every call, so job processes and tests can point the cache elsewhere.
+    return os.getenv("DATASET_CACHE_DIR", "dataset_cache")
+
+
+def default_quota_bytes() -> int:
+    return int(os.getenv("DATASET_CACHE_QUOTA_BYTES", DEFAULT_QUOTA_BYTES))
+
+
+class _ColumnProfile:
+    __slots__ = ("numeric", "total", "count", "values", "late")
+
+    def __init__(self):
+        self.numeric = True
+        self.total = 0.0
+        self.count = 0
+        # Distinct strings, collected once a column turns out not to be numeric.
+        self.values: Optional[Set[str]] = None
+        # Turned non-numeric after the first chunk, so earlier values were never collected.
+        self.late = False
+
+
+def _read_header(path: str) -> List[str]:
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return next(csv.reader(f), [])
+
+
+def _profile(path: str, header: List[str], target: str, chunk_rows: int):
+    profiles = {name: _ColumnProfile() for name in header if name != target}
+    labels: Set[str] = set()
+    rows = 0
+    for chunk in iter_csv_chunks(path, chunk_rows):
+        first = rows == 0
+        rows += len(chunk)
+        labels.update(row.get(target) or "" for row in chunk)
+        for name, profile in profiles.items():
+            column = [row.get(name) or "" for row in chunk]
+            if profile.numeric:
+                values = _to_float(column)
+                if values is not None:
+                    present = values[~np.isnan(values)]
+                    profile.total += float(present.sum(dtype=np.float64))
+                    profile.count += len(present)
+                    continue
+                profile.numeric = False
+                profile.late = not first
+                profile.values = set()
+            profile.values.update(column)
+    late = [name for name, p in profiles.items() if p.late]
+    if late:
+        for chunk in iter_csv_chunks(path, chunk_rows):
+            for name in late:
+                profiles[name].values.update(row.get(name) or "" for row in chunk)
+    return profiles, labels, rows
+
+
+def build_cache(path: str, directory: Path, target: Optional[str] = None, chunk_rows: int = CHUNK_ROWS) -> Path:
+    header = _read_header(path)
+    if not header:
+        raise ValueError(f"{path} has no header row")
+    target = target or header[-1]
+    if target not in header:
+        raise ValueError(f"Target column {target!r} is not in {path}")
+    profiles, labels, rows = _profile(path, header, target, chunk_rows)
+    if rows == 0:
+        raise ValueError(f"{path} has no data rows")
+
+    names = [name for name in header if name != target]
+    categories: Dict[int, List[str]] = {}
+    fill: Dict[int, float] = {}
+    for j, name in enumerate(names):
+        profile = profiles[name]
+        if profile.numeric:
+            fill[j] = profile.total / profile.count if profile.count else 0.0
+        else:
+            categories[j] = sorted(profile.values)
+    schema = Dataset(X=np.empty((0, len(names)), dtype=np.float32), y=np.empty(0, dtype=np.int64),
+                     feature_names=names, classes=sorted(labels), categories=categories, target=target, fill=fill)
+
+    directory.parent.mkdir(parents=True, exist_ok=True)
+    staging = directory.with_name(f".tmp-{directory.name}-{os.getpid()}")
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir()
+    X = np.lib.format.open_memmap(staging / "X.npy", mode="w+", dtype=np.float32, shape=(rows, len(names)),
+                                  fortran_order=True)
+    y = np.lib.format.open_memmap(staging / "y.npy", mode="w+", dtype=np.int64, shape=(rows,))
+    start = 0
+    for chunk in iter_csv_chunks(path, chunk_rows):
+        X[start:start + len(chunk)], y[start:start + len(chunk)] = encode_rows(chunk, schema)
+        start += len(chunk)
+    X.flush()
+    y.flush()
+    del X, y
+    manifest = {**schema.schema(), "rows": rows, "source": os.path.abspath(path), "layout": "column-major"}
+    with open(staging / "manifest.json", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    try:
+        os.rename(staging, directory)
+    except OSError:
+        # Another process finished the same cache first.
+        shutil.rmtree(staging, ignore_errors=True)
+    return directory
+
+
+def cache_path(path: str, target: Optional[str] = None, cache_dir: Optional[str] = None) -> Path:
+    """Where the cache of ``path`` lives; ``cache_dir`` defaults to ``default_cache_dir()``."""
+    return Path(cache_dir or default_cache_dir()) / f"{dataset_digest(path)}-{target or '_'}"
+
+
+def _index(cache_dir: Path) -> JsonStore:
+    return JsonStore(cache_dir / "index.json", default=dict)
+
+
+def _size(directory: Path) -> int:
+    return sum(p.stat().st_size for p in directory.iterdir())
+
+
+def _record(directory: Path, quota_bytes: int):
+    """Adds a freshly built entry to the index and evicts least recently used ones past the quota."""
+    def add(index):
+        entries = index.setdefault("entries", {})
+        # Entries built before the index existed are adopted, oldest first by mtime.
+        for child in directory.parent.iterdir():
+            if child.is_dir() and not child.name.startswith(".") and child.name not in entries:
+                entries[child.name] = {"size": _size(child), "last_used": child.stat().st_mtime}
+        entries[directory.name]["last_used"] = time.time()
+        total = sum(e["size"] for e in entries.values())
+        for name in sorted(entries, key=lambda k: entries[k]["last_used"]):
+            if total <= quota_bytes:
+                break
+            if name == directory.name:
+                continue
+            # Processes that still map the evicted files keep their pages until they unmap them.
+            shutil.rmtree(directory.parent / name, ignore_errors=True)
+            total -= entries.pop(name)["size"]
+    _index(directory.parent).update(add)
+
+
+def _touch(directory: Path):
+    index = _index(directory.parent)
+    entry = index.load().get("entries", {}).get(directory.name)
+    if entry is not None and time.time() - entry["last_used"] < TOUCH_INTERVAL:
+        return
+
+    def touch(data):
+        entries = data.setdefault("entries", {})
+        if directory.name in entries:
+            entries[directory.name]["last_used"] = time.time()
+    index.update(touch)
+
+
+def usage(cache_dir: Optional[str] = None) -> Dict[str, int]:
+    entries = _index(Path(cache_dir or default_cache_dir())).load().get("entries", {})
+    return {"datasets": len(entries), "bytes": sum(e["size"] for e in entries.values())}
+
+
+def load_cached(directory) -> Dataset:
+    directory = Path(directory)
+    with open(directory / "manifest.json", "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    return Dataset.from_schema(manifest, X=np.load(directory / "X.npy", mmap_mode="r"),
+                               y=np.load(directory / "y.npy", mmap_mode="r"))
+
+
+def load_dataset(path: str, target: Optional[str] = None, cache_dir: Optional[str] = None,
+                 chunk_rows: int = CHUNK_ROWS, quota_bytes: Optional[int] = None, use_cache: bool = True) -> Dataset:
+    """Memory-maps the cached columns for ``path``, converting the CSV first on a miss.
+
+    ``cache_dir`` defaults to ``$DATASET_CACHE_DIR`` (``dataset_cache``);
+    ``use_cache=False`` skips the cache and parses the CSV in memory.
+    """
+    if not use_cache:
+        return load_csv(path, target=target)
+    directory = cache_path(path, target, cache_dir)
+    for attempt in range(2):
+        if (directory / "manifest.json").exists():
+            _touch(directory)
+        else:
+            build_cache(path, directory, target, chunk_rows)
+            _record(directory, default_quota_bytes() if quota_bytes is None else quota_bytes)
+        try:
+            return load_cached(directory)
+        except FileNotFoundError:
+            # Evicted by another process between the check and the load; build it again.
+            if attempt:
+                raise
@@ -1,4 +1,229 @@
-
 # core/evaluator.py
-def evaluate_model(model_type: str, dataset_path: str):
-    return f"Evaluating {model_type} using {dataset_path}"
+"""Classification metrics for the core model families.
+
+Metrics are accumulated batch by batch: the confusion matrix is exact, and
+ROC-AUC is computed from fixed-size per-class score histograms, so a held-out
+CSV of any size is evaluated in ``chunk_rows``-sized pieces. ``roc_auc`` is
+the exact rank-based version for arrays already in memory.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .autotx import AutoTrainer, build_model, wants_scaling
+from .data import Standardizer, iter_csv_batches
+from .dataset_cache import cache_path, load_cached, load_dataset
+
+SUMMARY_METRICS = ("accuracy", "precision_macro", "recall_macro", "f1_macro", "roc_auc")
+
+
+def confusion_matrix(y_true: np.ndarray, y_pred: np.ndarray, n_classes: int) -> np.ndarray:
+    """Rows are true classes, columns predicted classes."""
+    index = np.asarray(y_true, dtype=np.int64) * n_classes + np.asarray(y_pred, dtype=np.int64)
+    return np.bincount(index, minlength=n_classes * n_classes).reshape(n_classes, n_classes)
+
+
+def _ratio(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    return np.divide(num, den, out=np.zeros(num.shape, dtype=np.float64), where=den > 0)
+
+
+def metrics_from_confusion(cm: np.ndarray, classes: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    cm = np.asarray(cm, dtype=np.int64)
+    tp = np.diag(cm).astype(np.float64)
+    support = cm.sum(axis=1)
+    precision = _ratio(tp, cm.sum(axis=0).astype(np.float64))
+    recall = _ratio(tp, support.astype(np.float64))
+    f1 = _ratio(2 * precision * recall, precision + recall)
+    # Macro averages skip classes with no true rows, which would otherwise count as 0 recall.
+    present = support > 0
+    names = list(classes) if classes is not None else [str(i) for i in range(len(cm))]
+    return {
+        "rows": int(cm.sum()),
+        "accuracy": float(tp.sum() / cm.sum()) if cm.sum() else None,
+        "precision_macro": float(precision[present].mean()) if present.any() else None,
+        "recall_macro": float(recall[present].mean()) if present.any() else None,
+        "f1_macro": float(f1[present].mean()) if present.any() else None,
+        "per_class": {
+            name: {"precision": float(p), "recall": float(r), "f1": float(f), "support": int(n)}
+            for name, p, r, f, n in zip(names, precision, recall, f1, support)
+        },
+        "confusion_matrix": cm.tolist(),
+    }
+
+
+def _average_ranks(values: np.ndarray) -> np.ndarray:
+    _, inverse, counts = np.unique(values, return_inverse=True, return_counts=True)
+    # Tied values share the mean of the ranks they span.
+    return (np.cumsum(counts) - (counts - 1) / 2.0)[inverse]
+
+
+def roc_auc(y_true: np.ndarray, scores: np.ndarray) -> Optional[float]:
+    """Exact ROC-AUC; macro one-vs-rest when ``scores`` has a column per class.
+
+    Classes with no positive or no negative rows are left out of the average;
+    returns None when none are left.
+    """
+    y_true = np.asarray(y_true)
+    scores = np.asarray(scores, dtype=np.float64)
+    if scores.ndim == 1:
+        scores = np.column_stack([-scores, scores])
+    aucs = []
+    for c in range(scores.shape[1]):
+        positive = y_true == c
+        n_pos = int(positive.sum())
+        n_neg = len(y_true) - n_pos
+        if n_pos == 0 or n_neg == 0:
+            continue
+        ranks = _average_ranks(scores[:, c])
+        aucs.append((ranks[positive].sum() - n_pos * (n_pos + 1) / 2.0) / (n_pos * n_neg))
+    return float(np.mean(aucs)) if aucs else None
+
+
+class StreamingEvaluator:
+    """Accumulates metrics over batches of ``(y_true, y_pred, proba)``.
+
+    ``proba`` scores must be in [0, 1]; each class keeps ``bins`` counts for
+    its positive rows and its negative rows, and ROC-AUC is read off those
+    histograms, so memory does not grow with the number of rows.
+    """
+
+    def __init__(self, n_classes: int, classes: Optional[Sequence[str]] = None, bins: int = 2048):
+        self.n_classes = n_classes
+        self.classes = classes
+        self.bins = bins
+        self.cm = np.zeros((n_classes, n_classes), dtype=np.int64)
+        self.positive = np.zeros((n_classes, bins), dtype=np.int64)
+        self.negative = np.zeros((n_classes, bins), dtype=np.int64)
+        self.unknown_labels = 0
+
+    def update(self, y_true: np.ndarray, y_pred: np.ndarray, proba: Optional[np.ndarray] = None):
+        y_true = np.asarray(y_true)
+        known = y_true >= 0
+        if not known.all():
+            # Labels the model was not trained on can't be placed in the matrix.
+            self.unknown_labels += int((~known).sum())
+            y_true, y_pred = y_true[known], np.asarray(y_pred)[known]
+            proba = proba[known] if proba is not None else None
+        self.cm += confusion_matrix(y_true, y_pred, self.n_classes)
+        if proba is None:
+            return
+        k, bins = self.n_classes, self.bins
+        bucket = np.minimum((np.clip(proba, 0.0, 1.0) * bins).astype(np.int64), bins - 1)
+        index = (bucket + np.arange(k) * bins).ravel()
+        is_positive = (y_true[:, None] == np.arange(k)).ravel()
+        self.positive += np.bincount(index[is_positive], minlength=k * bins).reshape(k, bins)
+        self.negative += np.bincount(index[~is_positive], minlength=k * bins).reshape(k, bins)
+
+    def roc_auc(self) -> Optional[float]:
+        aucs = []
+        for pos, neg in zip(self.positive, self.negative):
+            n_pos, n_neg = pos.sum(), neg.sum()
+            if n_pos == 0 or n_neg == 0:
+                continue
+            below = np.cumsum(neg) - neg
+            # Positives beat every negative in a lower bin and tie with those in their own bin.
+            aucs.append(float((pos * (below + 0.5 * neg)).sum() / (n_pos * n_neg)))
+        return float(np.mean(aucs)) if aucs else None
+
+    def result(self) -> Dict[str, Any]:
+        metrics = metrics_from_confusion(self.cm, self.classes)
+        metrics["roc_auc"] = self.roc_auc()
+        metrics["unknown_labels"] = self.unknown_labels
+        return metrics
+
+
+def evaluate_batches(model, batches, n_classes: int, classes: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """Runs ``model`` (anything with ``predict_proba``) over an iterable of ``(X, y)`` batches."""
+    evaluator = StreamingEvaluator(n_classes, classes)
+    for X, y in batches:
+        proba = model.predict_proba(X)
+        evaluator.update(y, proba.argmax(axis=1), proba)
+    return evaluator.result()
+
+
+def _chunks(X: np.ndarray, y: np.ndarray, chunk_rows: int):
+    for start in range(0, len(y), chunk_rows):
+        yield X[start:start + chunk_rows], y[start:start + chunk_rows]
+
+
+def _fold_indices(n: int, folds: int, seed: int) -> List[np.ndarray]:
+    return np.array_split(np.random.default_rng(seed).permutation(n), folds)
+
+
+def _run_fold(model_type: str, hyperparameters: Dict[str, Any], cache: str, fold: int, folds: int,
+              chunk_rows: int) -> Dict[str, Any]:
+    data = load_cached(cache)
+    X, y, n_classes = data.X, data.y, data.n_classes
+    test = _fold_indices(len(y), folds, hyperparameters.get("seed", 0))[fold]
+    train = np.setdiff1d(np.arange(len(y)), test, assume_unique=True)
+    X_train, X_test = X[train], X[test]
+    if wants_scaling(model_type, hyperparameters):
+        scaler = Standardizer().fit(X_train)
+        X_train, X_test = scaler.transform(X_train), scaler.transform(X_test)
+    start = time.perf_counter()
+    model = build_model(model_type, hyperparameters).fit(X_train, y[train], n_classes=n_classes)
+    metrics = evaluate_batches(model, _chunks(X_test, y[test], chunk_rows), n_classes)
+    metrics["fold"] = fold
+    metrics["train_seconds"] = round(time.perf_counter() - start, 4)
+    return metrics
+
+
+def cross_validate(model_type: str, dataset_path: str, hyperparameters: Optional[Dict[str, Any]] = None,
+                   folds: int = 5, max_workers: Optional[int] = None, chunk_rows: int = 50_000,
+                   cache_dir: Optional[str] = None) -> Dict[str, Any]:
+    """k-fold cross-validation with the folds trained in a process pool.
+
+    Every worker memory-maps the same columnar cache of the dataset rather than receiving a copy.
+    """
+    hyperparameters = dict(hyperparameters or {})
+    if folds < 2:
+        raise ValueError("Cross-validation needs at least 2 folds")
+    build_model(model_type, hyperparameters)  # fail on a bad model or parameter before starting workers
+    target = hyperparameters.get("target")
+    data = load_dataset(dataset_path, target=target, cache_dir=cache_dir)
+    if folds > len(data.y):
+        raise ValueError(f"{folds} folds requested but {dataset_path} has only {len(data.y)} rows")
+    cache = str(cache_path(dataset_path, target, cache_dir))
+    workers = min(max_workers or os.cpu_count() or 1, folds)
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_run_fold, model_type, hyperparameters, cache, fold, folds, chunk_rows)
+                   for fold in range(folds)]
+        results = [future.result() for future in futures]
+
+    summary: Dict[str, Any] = {"model_type": model_type, "folds": folds, "classes": data.classes}
+    for name in SUMMARY_METRICS:
+        values = [r[name] for r in results if r[name] is not None]
+        summary[name] = {"mean": float(np.mean(values)), "std": float(np.std(values))} if values else None
+    summary["fold_metrics"] = [{k: r[k] for k in ("fold", "rows", "train_seconds", *SUMMARY_METRICS)}
+                               for r in results]
+    summary["seconds"] = round(time.perf_counter() - start, 3)
+    summary["workers"] = workers
+    return summary
+
+
+def evaluate_model(model_type: str, dataset_path: str, hyperparameters: Optional[Dict[str, Any]] = None,
+                   test_path: Optional[str] = None, folds: Optional[int] = None, chunk_rows: int = 50_000,
+                   max_workers: Optional[int] = None) -> Dict[str, Any]:
+    """Trains on ``dataset_path`` and evaluates on ``test_path`` (streamed in chunks) or the validation split.
+
+    With ``folds`` set, runs k-fold cross-validation on ``dataset_path`` instead.
+    """
+    if folds:
+        return cross_validate(model_type, dataset_path, hyperparameters, folds, max_workers, chunk_rows)
+    trainer = AutoTrainer(model_type, dataset_path, hyperparameters or {})
+    training = trainer.train()
+    data = trainer.dataset
+    if test_path:
+        batches = iter_csv_batches(test_path, data, chunk_rows)
+    else:
+        _, X_val, _, y_val = trainer.split()
+        batches = _chunks(X_val, y_val, chunk_rows)
+    metrics = evaluate_batches(trainer, batches, data.n_classes, data.classes)
+    metrics["model_type"] = model_type
+    metrics["evaluated_on"] = test_path or "validation_split"
+    metrics["training"] = training
+    return metrics
@@ -0,0 +1,287 @@
+# core/models.py
+"""NumPy implementations of the model families offered in the UI.
+
+Every model has ``fit(X, y, progress=None)``, ``predict_proba``/``predict``
+and ``state_dict()``/``from_state()`` so it can be persisted as plain arrays.
+``progress(step, total, metrics)`` is called once per epoch (MLP, SVM) or per
+tree level (decision tree).
+"""
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+Progress = Optional[Callable[[int, int, Dict[str, float]], None]]
+
+
+def _softmax(z: np.ndarray) -> np.ndarray:
+    z = z - z.max(axis=1, keepdims=True)
+    e = np.exp(z)
+    return e / e.sum(axis=1, keepdims=True)
+
+
+def _batches(n: int, batch_size: int, rng: np.random.Generator):
+    order = rng.permutation(n)
+    for start in range(0, n, batch_size):
+        yield order[start:start + batch_size]
+
+
+class MLPClassifier:
+    """ReLU multi-layer perceptron with a softmax output, trained by mini-batch SGD with momentum."""
+
+    kind = "mlp"
+
+    def __init__(self, hidden_layers: Sequence[int] = (64,), learning_rate: float = 0.01, epochs: int = 20,
+                 batch_size: int = 64, momentum: float = 0.9, l2: float = 0.0, seed: int = 0):
+        self.hidden_layers = [int(h) for h in hidden_layers]
+        self.learning_rate = learning_rate
+        self.epochs = epochs
+        self.batch_size = batch_size
+        self.momentum = momentum
+        self.l2 = l2
+        self.seed = seed
+        self.weights: List[np.ndarray] = []
+        self.biases: List[np.ndarray] = []
+        self.n_classes = 0
+
+    def _init(self, n_features: int, n_classes: int, rng: np.random.Generator):
+        sizes = [n_features] + self.hidden_layers + [n_classes]
+        self.weights = [(rng.standard_normal((a, b)) * np.sqrt(2.0 / a)).astype(np.float32)
+                        for a, b in zip(sizes[:-1], sizes[1:])]
+        self.biases = [np.zeros(b, dtype=np.float32) for b in sizes[1:]]
+        self.n_classes = n_classes
+
+    def _forward(self, X: np.ndarray) -> List[np.ndarray]:
+        activations = [X]
+        for i, (W, b) in enumerate(zip(self.weights, self.biases)):
+            z = activations[-1] @ W + b
+            activations.append(np.maximum(z, 0) if i < len(self.weights) - 1 else _softmax(z))
+        return activations
+
+    def fit(self, X: np.ndarray, y: np.ndarray, progress: Progress = None, n_classes: Optional[int] = None):
+        rng = np.random.default_rng(self.seed)
+        self._init(X.shape[1], n_classes or int(y.max()) + 1, rng)
+        velocity_w = [np.zeros_like(W) for W in self.weights]
+        velocity_b = [np.zeros_like(b) for b in self.biases]
+        onehot = np.eye(self.n_classes, dtype=np.float32)
+        for epoch in range(self.epochs):
+            loss = 0.0
+            for idx in _batches(len(y), self.batch_size, rng):
+                activations = self._forward(X[idx])
+                probs = activations[-1]
+                loss += -np.log(probs[np.arange(len(idx)), y[idx]] + 1e-12).sum()
+                delta = (probs - onehot[y[idx]]) / len(idx)
+                for layer in range(len(self.weights) - 1, -1, -1):
+                    grad_w = activations[layer].T @ delta + self.l2 * self.weights[layer]
+                    grad_b = delta.sum(axis=0)
+                    if layer:
+                        delta = (delta @ self.weights[layer].T) * (activations[layer] > 0)
+                    velocity_w[layer] = self.momentum * velocity_w[layer] - self.learning_rate * grad_w
+                    velocity_b[layer] = self.momentum * velocity_b[layer] - self.learning_rate * grad_b
+                    self.weights[layer] += velocity_w[layer]
+                    self.biases[layer] += velocity_b[layer]
+            if progress:
+                progress(epoch + 1, self.epochs, {"loss": loss / len(y)})
+        return self
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        return self._forward(X)[-1]
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.predict_proba(X).argmax(axis=1)
+
+    def state_dict(self) -> Dict[str, np.ndarray]:
+        state = {f"W{i}": W for i, W in enumerate(self.weights)}
+        state.update({f"b{i}": b for i, b in enumerate(self.biases)})
+        return state
+
+    @classmethod
+    def from_state(cls, state: Dict[str, np.ndarray], **params) -> "MLPClassifier":
+        model = cls(**params)
+        layers = len([k for k in state if k.startswith("W")])
+        model.weights = [np.asarray(state[f"W{i}"]) for i in range(layers)]
+        model.biases = [np.asarray(state[f"b{i}"]) for i in range(layers)]
+        model.n_classes = model.weights[-1].shape[1]
+        return model
+
+
+class LinearSVM:
+    """One-vs-rest linear SVM: L2-regularised hinge loss minimised by mini-batch subgradient descent.
+
+    All classes are updated together from one (features x classes) weight matrix.
+    """
+
+    kind = "svm"
+
+    def __init__(self, C: float = 1.0, learning_rate: float = 0.01, epochs: int = 20, batch_size: int = 64,
+                 seed: int = 0):
+        self.C = C
+        self.learning_rate = learning_rate
+        self.epochs = epochs
+        self.batch_size = batch_size
+        self.seed = seed
+        self.W: Optional[np.ndarray] = None
+        self.b: Optional[np.ndarray] = None
+
+    def fit(self, X: np.ndarray, y: np.ndarray, progress: Progress = None, n_classes: Optional[int] = None):
+        rng = np.random.default_rng(self.seed)
+        k = n_classes or int(y.max()) + 1
+        self.W = np.zeros((X.shape[1], k), dtype=np.float32)
+        self.b = np.zeros(k, dtype=np.float32)
+        targets = np.where(np.eye(k, dtype=bool)[y], 1.0, -1.0).astype(np.float32)
+        lam = 1.0 / (self.C * len(y))
+        for epoch in range(self.epochs):
+            hinge = 0.0
+            for idx in _batches(len(y), self.batch_size, rng):
+                t = targets[idx]
+                margins = t * (X[idx] @ self.W + self.b)
+                active = (margins < 1).astype(np.float32) * t
+                hinge += np.maximum(0, 1 - margins).sum()
+                grad_w = lam * self.W - X[idx].T @ active / len(idx)
+                grad_b = -active.sum(axis=0) / len(idx)
+                self.W -= self.learning_rate * grad_w
+                self.b -= self.learning_rate * grad_b
+            if progress:
+                progress(epoch + 1, self.epochs, {"hinge_loss": hinge / len(y)})
+        return self
+
+    def decision_function(self, X: np.ndarray) -> np.ndarray:
+        return X @ self.W + self.b
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        # Softmax over margins: a ranking score, not a calibrated probability.
+        return _softmax(self.decision_function(X))
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.decision_function(X).argmax(axis=1)
+
+    def state_dict(self) -> Dict[str, np.ndarray]:
+        return {"W": self.W, "b": self.b}
+
+    @classmethod
+    def from_state(cls, state: Dict[str, np.ndarray], **params) -> "LinearSVM":
+        model = cls(**params)
+        model.W, model.b = np.asarray(state["W"]), np.asarray(state["b"])
+        return model
+
+
+class DecisionTree:
+    """CART classifier with histogram-based split finding.
+
+    Features are bucketed once into at most ``max_bins`` quantile bins. For
+    each node, class counts for every (feature, bin) pair come from a single
+    ``np.bincount``; cumulative sums give the left/right counts of every
+    candidate split, so Gini impurity is scored for all of them at once.
+    The tree is grown level by level and stored as flat node arrays.
+    """
+
+    kind = "tree"
+
+    def __init__(self, max_depth: int = 8, min_samples_leaf: int = 5, max_bins: int = 32):
+        self.max_depth = max_depth
+        self.min_samples_leaf = min_samples_leaf
+        self.max_bins = max_bins
+        self.bin_edges: List[np.ndarray] = []
+        self.feature = np.empty(0, dtype=np.int32)
+        self.threshold = np.empty(0, dtype=np.float32)
+        self.left = np.empty(0, dtype=np.int32)
+        self.right = np.empty(0, dtype=np.int32)
+        self.value = np.empty((0, 0), dtype=np.float32)
+
+    def _bin(self, X: np.ndarray) -> np.ndarray:
+        binned = np.empty(X.shape, dtype=np.int32)
+        for j, edges in enumerate(self.bin_edges):
+            binned[:, j] = np.searchsorted(edges, X[:, j], side="right")
+        return binned
+
+    def _best_split(self, binned: np.ndarray, y: np.ndarray, k: int):
+        n, d = binned.shape
+        bins = self.max_bins
+        flat = (binned * k + y[:, None]) + np.arange(d) * (bins * k)
+        hist = np.bincount(flat.ravel(), minlength=d * bins * k).reshape(d, bins, k)
+        left = hist.cumsum(axis=1)[:, :-1, :]          # split after bin b: bins <= b go left
+        total = hist.sum(axis=1)[:, None, :]
+        right = total - left
+        n_left = left.sum(axis=2)
+        n_right = n - n_left
+        with np.errstate(divide="ignore", invalid="ignore"):
+            gini_left = 1.0 - ((left / n_left[..., None]) ** 2).sum(axis=2)
+            gini_right = 1.0 - ((right / n_right[..., None]) ** 2).sum(axis=2)
+        score = (n_left * gini_left + n_right * gini_right) / n
+        score[(n_left < self.min_samples_leaf) | (n_right < self.min_samples_leaf)] = np.inf
+        best = np.nanargmin(np.where(np.isnan(score), np.inf, score))
+        feature, split_bin = divmod(int(best), bins - 1)
+        return feature, split_bin, float(score[feature, split_bin])
+
+    def fit(self, X: np.ndarray, y: np.ndarray, progress: Progress = None, n_classes: Optional[int] = None):
+        k = n_classes or int(y.max()) + 1
+        quantiles = np.linspace(0, 1, self.max_bins + 1)[1:-1]
+        self.bin_edges = [np.unique(np.quantile(X[:, j], quantiles)).astype(np.float32) for j in range(X.shape[1])]
+        binned = self._bin(X)
+
+        feature, threshold, left, right, value = [], [], [], [], []
+
+        def new_node(idx):
+            feature.append(-1)
+            threshold.append(0.0)
+            left.append(-1)
+            right.append(-1)
+            value.append(np.bincount(y[idx], minlength=k) / len(idx))
+            return len(feature) - 1
+
+        frontier = [(new_node(np.arange(len(y))), np.arange(len(y)))]
+        for depth in range(self.max_depth):
+            next_frontier = []
+            for node, idx in frontier:
+                if len(idx) < 2 * self.min_samples_leaf or value[node].max() == 1.0:
+                    continue
+                parent_gini = 1.0 - (value[node] ** 2).sum()
+                f, b, score = self._best_split(binned[idx], y[idx], k)
+                if not np.isfinite(score) or score >= parent_gini - 1e-12:
+                    continue
+                goes_left = binned[idx, f] <= b
+                feature[node] = f
+                # Bin b holds values below edges[b]; everything strictly under that edge goes left.
+                threshold[node] = float(self.bin_edges[f][b]) if b < len(self.bin_edges[f]) else np.inf
+                left[node] = new_node(idx[goes_left])
+                right[node] = new_node(idx[~goes_left])
+                next_frontier += [(left[node], idx[goes_left]), (right[node], idx[~goes_left])]
+            if progress:
+                progress(depth + 1, self.max_depth, {"nodes": float(len(feature))})
+            if not next_frontier:
+                break
+            frontier = next_frontier
+
+        self.feature = np.array(feature, dtype=np.int32)
+        self.threshold = np.array(threshold, dtype=np.float32)
+        self.left = np.array(left, dtype=np.int32)
+        self.right = np.array(right, dtype=np.int32)
+        self.value = np.array(value, dtype=np.float32)
+        return self
+
+    def _leaves(self, X: np.ndarray) -> np.ndarray:
+        node = np.zeros(len(X), dtype=np.int32)
+        active = self.feature[node] >= 0
+        while active.any():
+            rows = np.nonzero(active)[0]
+            n = node[rows]
+            go_left = X[rows, self.feature[n]] < self.threshold[n]
+            node[rows] = np.where(go_left, self.left[n], self.right[n])
+            active = self.feature[node] >= 0
+        return node
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        return self.value[self._leaves(X)]
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.predict_proba(X).argmax(axis=1)
+
+    def state_dict(self) -> Dict[str, np.ndarray]:
+        return {"feature": self.feature, "threshold": self.threshold, "left": self.left,
+                "right": self.right, "value": self.value}
+
+    @classmethod
+    def from_state(cls, state: Dict[str, np.ndarray], **params) -> "DecisionTree":
+        model = cls(**params)
+        for key in ("feature", "threshold", "left", "right", "value"):
+            setattr(model, key, np.asarray(state[key]))
+        return model
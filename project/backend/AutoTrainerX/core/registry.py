@@ -0,0 +1,166 @@
+# core/registry.py
+"""Trained model artifacts, keyed by what produced them.
+
+The key is a hash of the dataset's bytes, the model type and the
+hyperparameters, so the same request never trains twice. Each artifact is a
+directory of ``.npy`` arrays (model state and scaler), loaded with
+``mmap_mode="r"``, plus ``meta.json`` holding the training summary and the
+dataset schema needed to encode new rows. ``index.json`` records sizes and
+last use; when the registry grows past its quota, least recently used
+artifacts are deleted first.
+"""
+import hashlib
+import json
+import os
+import shutil
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from utils.storage import JsonStore
+
+from .autotx import AutoTrainer, build_model
+from .data import Dataset, Standardizer, dataset_digest
+
+DEFAULT_REGISTRY_DIR = "model_registry"
+DEFAULT_QUOTA_BYTES = 2 * 1024 ** 3
+# Hits closer together than this don't rewrite the index just to move last_used.
+TOUCH_INTERVAL = 60.0
+
+
+def artifact_key(model_type: str, hyperparameters: Dict[str, Any], digest: str) -> str:
+    key = json.dumps([model_type, hyperparameters, digest], sort_keys=True, default=str)
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+
+
+@dataclass
+class TrainedModel:
+    """A registry artifact ready to predict: model, optional scaler and the training schema."""
+    key: str
+    model: Any
+    scaler: Optional[Standardizer]
+    schema: Dataset
+    meta: Dict[str, Any]
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        if self.scaler is not None:
+            X = self.scaler.transform(X)
+        return self.model.predict_proba(X)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.predict_proba(X).argmax(axis=1)
+
+
+class ModelRegistry:
+    def __init__(self, root: str = DEFAULT_REGISTRY_DIR, quota_bytes: int = DEFAULT_QUOTA_BYTES):
+        self.root = Path(root)
+        self.quota_bytes = quota_bytes
+        self.index = JsonStore(self.root / "index.json", default=dict)
+
+    def key_for(self, model_type: str, dataset_path: str, hyperparameters: Dict[str, Any]) -> str:
+        return artifact_key(model_type, hyperparameters or {}, dataset_digest(dataset_path))
+
+    def _dir(self, key: str) -> Path:
+        return self.root / key
+
+    def summary(self, key: str) -> Optional[Dict[str, Any]]:
+        """The stored training summary for ``key``, or None on a miss."""
+        try:
+            with open(self._dir(key) / "meta.json", "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            return None
+        self._touch(key)
+        return meta["summary"]
+
+    def load(self, key: str) -> TrainedModel:
+        directory = self._dir(key)
+        with open(directory / "meta.json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        arrays = {name: np.load(directory / f"{name}.npy", mmap_mode="r") for name in meta["arrays"]}
+        model = type(build_model(meta["model_type"], meta["hyperparameters"])).from_state(
+            {name[len("model."):]: a for name, a in arrays.items() if name.startswith("model.")})
+        scaler = None
+        if "scaler.mean" in arrays:
+            scaler = Standardizer(np.asarray(arrays["scaler.mean"]), np.asarray(arrays["scaler.scale"]))
+        self._touch(key)
+        return TrainedModel(key, model, scaler, Dataset.from_schema(meta["schema"]), meta)
+
+    def put(self, key: str, trainer: AutoTrainer, summary: Dict[str, Any]) -> Path:
+        """Stores a trained model; a concurrent put of the same key keeps whichever landed first."""
+        arrays = {f"model.{name}": value for name, value in trainer.model.state_dict().items()}
+        if trainer.scaler is not None:
+            arrays["scaler.mean"], arrays["scaler.scale"] = trainer.scaler.mean, trainer.scaler.scale
+        meta = {
+            "key": key,
+            "model_type": trainer.model_type,
+            "hyperparameters": trainer.hyperparameters,
+            "dataset_path": os.path.abspath(trainer.dataset_path),
+            "created": time.time(),
+            "summary": summary,
+            "arrays": sorted(arrays),
+            "schema": trainer.dataset.schema(),
+        }
+        self.root.mkdir(parents=True, exist_ok=True)
+        staging = self.root / f".tmp-{key}-{os.getpid()}"
+        shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir()
+        for name, value in arrays.items():
+            np.save(staging / f"{name}.npy", np.ascontiguousarray(value))
+        with open(staging / "meta.json", "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2, default=str)
+        size = sum(p.stat().st_size for p in staging.iterdir())
+        try:
+            os.rename(staging, self._dir(key))
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+            return self._dir(key)
+
+        def add(index):
+            entries = index.setdefault("entries", {})
+            entries[key] = {"size": size, "last_used": time.time()}
+            self._evict(entries, keep=key)
+        self.index.update(add)
+        return self._dir(key)
+
+    def _evict(self, entries: Dict[str, Dict[str, Any]], keep: str):
+        total = sum(e["size"] for e in entries.values())
+        for key in sorted(entries, key=lambda k: entries[k]["last_used"]):
+            if total <= self.quota_bytes:
+                break
+            if key == keep:
+                continue
+            shutil.rmtree(self._dir(key), ignore_errors=True)
+            total -= entries.pop(key)["size"]
+
+    def _touch(self, key: str):
+        entry = self.index.load().get("entries", {}).get(key)
+        if entry is not None and time.time() - entry["last_used"] < TOUCH_INTERVAL:
+            return
+
+        def touch(index):
+            entries = index.setdefault("entries", {})
+            if key in entries:
+                entries[key]["last_used"] = time.time()
+        self.index.update(touch)
+
+    def usage(self) -> Dict[str, Any]:
+        entries = self.index.load().get("entries", {})
+        return {"models": len(entries), "bytes": sum(e["size"] for e in entries.values()),
+                "quota_bytes": self.quota_bytes}
+
+
+def train_cached(registry: ModelRegistry, model_type: str, dataset_path: str, hyperparameters: Dict[str, Any],
+                 progress=None) -> Dict[str, Any]:
+    """Returns the stored summary for this exact request, training and storing the model on a miss."""
+    key = registry.key_for(model_type, dataset_path, hyperparameters)
+    cached = registry.summary(key)
+    if cached is not None:
+        return {**cached, "model_id": key, "cached": True}
+    trainer = AutoTrainer(model_type, dataset_path, hyperparameters)
+    summary = trainer.train(progress=progress)
+    registry.put(key, trainer, summary)
+    return {**summary, "model_id": key, "cached": False}
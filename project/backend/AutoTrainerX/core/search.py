@@ -0,0 +1,210 @@
+# core/search.py
+"""Parallel hyperparameter search over the core model families.
+
+A search spec looks like::
+
+    {"strategy": "grid" | "random" | "successive_halving",
+     "space": {"lr": [0.01, 0.1], "hidden_layers": [[32], [64]],
+               "l2": {"low": 1e-5, "high": 1e-2, "log": true},
+               "max_depth": {"low": 2, "high": 12, "type": "int"}},
+     "n_trials": 20,            # random / successive_halving
+     "eta": 3, "min_budget": 2, "max_budget": 18,   # successive_halving
+     "seed": 0}
+
+The dataset is loaded and split once in the parent and placed in shared
+memory; pool workers map it read-only instead of each loading a copy.
+Successive halving trains every config on a small budget (epochs, or tree
+depth) and only promotes the best ``1/eta`` to the next rung, so weak trials
+stop early. Every finished trial is written to a JSON trial table keyed by a
+hash of the search, and a rerun of the same search reuses those results.
+"""
+import hashlib
+import itertools
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from utils.storage import JsonStore
+
+from .autotx import build_model, wants_scaling
+from .data import (Standardizer, attach_arrays, dataset_digest, release_arrays, share_arrays, shared_arrays,
+                   train_test_split)
+from .dataset_cache import load_dataset
+
+STRATEGIES = ("grid", "random", "successive_halving")
+# The hyperparameter successive halving grows from rung to rung.
+BUDGET_PARAMS = {"Neural Network": "epochs", "SVM": "epochs", "Decision Tree": "max_depth"}
+DEFAULT_SEARCH_DIR = "searches"
+
+def _run_trial(model_type: str, params: Dict[str, Any], n_classes: int) -> Dict[str, Any]:
+    start = time.perf_counter()
+    data = shared_arrays
+    model = build_model(model_type, params)
+    model.fit(data["X_train"], data["y_train"], n_classes=n_classes)
+    return {
+        "score": float(np.mean(model.predict(data["X_val"]) == data["y_val"])),
+        "train_score": float(np.mean(model.predict(data["X_train"]) == data["y_train"])),
+        "seconds": round(time.perf_counter() - start, 4),
+    }
+
+
+def _sample(space: Dict[str, Any], rng: np.random.Generator) -> Dict[str, Any]:
+    params = {}
+    for name, dim in space.items():
+        if isinstance(dim, list):
+            params[name] = dim[int(rng.integers(len(dim)))]
+            continue
+        low, high = dim["low"], dim["high"]
+        value = math.exp(rng.uniform(math.log(low), math.log(high))) if dim.get("log") else rng.uniform(low, high)
+        params[name] = int(round(value)) if dim.get("type") == "int" else float(value)
+    return params
+
+
+def expand_trials(spec: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """The configurations a spec asks for, in a deterministic order."""
+    strategy = spec.get("strategy", "grid")
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown search strategy {strategy!r}; expected one of {STRATEGIES}")
+    space = spec.get("space") or {}
+    if strategy == "grid":
+        if any(not isinstance(v, list) for v in space.values()):
+            raise ValueError("Grid search needs a list of values for every hyperparameter")
+        names = list(space)
+        return [dict(zip(names, values)) for values in itertools.product(*(space[n] for n in names))]
+    rng = np.random.default_rng(spec.get("seed", 0))
+    return [_sample(space, rng) for _ in range(int(spec.get("n_trials", 10)))]
+
+
+def search_id(model_type: str, dataset_path: str, base: Dict[str, Any], spec: Dict[str, Any]) -> str:
+    """Keyed on the dataset's content, so editing the file starts a fresh trial table."""
+    key = json.dumps([model_type, dataset_digest(dataset_path), base, spec], sort_keys=True, default=str)
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+def _trial_key(params: Dict[str, Any]) -> str:
+    return json.dumps(params, sort_keys=True, default=str)
+
+
+class HyperparameterSearch:
+    """Runs a search spec for one model type and dataset; see the module docstring."""
+
+    def __init__(self, model_type: str, dataset_path: str, spec: Dict[str, Any],
+                 base_hyperparameters: Optional[Dict[str, Any]] = None, max_workers: Optional[int] = None,
+                 search_dir: str = DEFAULT_SEARCH_DIR):
+        self.model_type = model_type
+        self.dataset_path = dataset_path
+        self.spec = spec
+        self.base = dict(base_hyperparameters or {})
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.id = search_id(model_type, dataset_path, self.base, spec)
+        self.store = JsonStore(Path(search_dir) / f"{self.id}.json", default=dict)
+
+    def _share_dataset(self):
+        data = load_dataset(self.dataset_path, target=self.base.get("target"))
+        X_train, X_val, y_train, y_val = train_test_split(
+            data.X, data.y, self.base.get("validation_split", 0.2), self.base.get("seed", 0))
+        if wants_scaling(self.model_type, self.base):
+            scaler = Standardizer().fit(X_train)
+            X_train, X_val = scaler.transform(X_train), scaler.transform(X_val)
+        segments, specs = share_arrays({"X_train": X_train, "X_val": X_val, "y_train": y_train, "y_val": y_val})
+        return data.n_classes, segments, specs
+
+    def _record(self, trial: Dict[str, Any]):
+        def add(table):
+            table.setdefault("trials", []).append(trial)
+        self.store.update(add)
+
+    def _run_rung(self, pool, configs: List[Dict[str, Any]], rung: int, n_classes: int,
+                  done: Dict[Tuple[str, int], Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Trial results in the same order as ``configs``; finished trials from a previous run are reused."""
+        results: List[Any] = []
+        for config in configs:
+            params = {**self.base, **config}
+            previous = done.get((_trial_key(params), rung))
+            results.append(previous or (params, pool.submit(_run_trial, self.model_type, params, n_classes)))
+        for i, pending in enumerate(results):
+            if isinstance(pending, dict):
+                continue
+            params, future = pending
+            try:
+                trial = {"params": params, "rung": rung, "status": "done", **future.result()}
+            except Exception as e:
+                trial = {"params": params, "rung": rung, "status": "failed", "error": str(e), "score": None}
+            self._record(trial)
+            results[i] = trial
+        return results
+
+    def run(self) -> Dict[str, Any]:
+        configs = expand_trials(self.spec)
+        strategy = self.spec.get("strategy", "grid")
+        if self.spec.get("metric", "validation_accuracy") != "validation_accuracy":
+            raise ValueError(f"Unsupported search metric {self.spec['metric']!r}; only 'validation_accuracy' is scored")
+        # Fail on a bad model or parameter before starting workers.
+        build_model(self.model_type, self.base)
+        budget = {self._budget_param(): 1} if strategy == "successive_halving" else {}
+        for config in configs:
+            build_model(self.model_type, {**self.base, **config, **budget})
+        table = self.store.load()
+        if not table:
+            self.store.save({"id": self.id, "model_type": self.model_type, "dataset_path": self.dataset_path,
+                             "spec": self.spec, "base": self.base, "trials": []})
+        done = {(_trial_key(t["params"]), t["rung"]): t for t in table.get("trials", []) if t["status"] == "done"}
+        start = time.perf_counter()
+
+        n_classes, segments, specs = self._share_dataset()
+        try:
+            with ProcessPoolExecutor(max_workers=self.max_workers, initializer=attach_arrays, initargs=(specs,)) as pool:
+                if strategy != "successive_halving":
+                    results = self._run_rung(pool, configs, 0, n_classes, done)
+                else:
+                    results = self._successive_halving(pool, configs, n_classes, done)
+        finally:
+            release_arrays(segments)
+
+        finished = [t for t in results if t["status"] == "done"]
+        best = max(finished, key=lambda t: t["score"]) if finished else None
+        summary = {
+            "search_id": self.id,
+            "strategy": strategy,
+            "trials": len(self.store.load().get("trials", [])),
+            "best_params": best["params"] if best else None,
+            "validation_accuracy": best["score"] if best else None,
+            "seconds": round(time.perf_counter() - start, 3),
+            "workers": self.max_workers,
+        }
+        self.store.update(lambda t: t.update(best=summary))
+        return summary
+
+    def _budget_param(self) -> str:
+        budget_param = self.spec.get("budget_param") or BUDGET_PARAMS.get(self.model_type)
+        if budget_param is None:
+            raise ValueError(f"No budget parameter for {self.model_type!r}; set 'budget_param' in the search spec")
+        return budget_param
+
+    def _successive_halving(self, pool, configs, n_classes, done):
+        budget_param = self._budget_param()
+        eta = int(self.spec.get("eta", 3))
+        budget = int(self.spec.get("min_budget", 1))
+        max_budget = int(self.spec.get("max_budget", budget * eta ** 2))
+        rung, results = 0, []
+        while configs:
+            results = self._run_rung(pool, [{**c, budget_param: budget} for c in configs], rung, n_classes, done)
+            if budget >= max_budget or len(configs) == 1:
+                break
+            ranked = sorted((i for i, t in enumerate(results) if t["status"] == "done"),
+                            key=lambda i: results[i]["score"], reverse=True)
+            configs = [configs[i] for i in ranked[:max(1, len(configs) // eta)]]
+            budget = min(max_budget, budget * eta)
+            rung += 1
+        return results
+
+
+def run_search(model_type: str, dataset_path: str, spec: Dict[str, Any],
+               base_hyperparameters: Optional[Dict[str, Any]] = None, **kwargs) -> Dict[str, Any]:
+    return HyperparameterSearch(model_type, dataset_path, spec, base_hyperparameters, **kwargs).run()
@@ -1,4 +1,7 @@
 # core/trainer.py
-def train_model(model_type: str, dataset_path: str, hyperparameters: dict):
+from .autotx import AutoTrainer
+
+
+def train_model(model_type: str, dataset_path: str, hyperparameters: dict, progress=None):
     trainer = AutoTrainer(model_type, dataset_path, hyperparameters)
-    return trainer.train()
+    return trainer.train(progress=progress)
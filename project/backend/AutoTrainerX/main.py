@@ -4,21 +4,17 @@ import json
 import time
 import logging
 import asyncio
+from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import List, Dict, Any, Tuple, Optional
 from enum import Enum
-from io import StringIO
 from datetime import date, datetime, timedelta
 
 # Third-party imports
 import aiofiles
 import httpx
-import PyPDF2
-import pandas as pd
 from fastapi import FastAPI, File, UploadFile, HTTPException, APIRouter, Body, Query, Form, Request
 from fastapi.middleware.cors import CORSMiddleware
-import uvicorn
-import streamlit as st
 from pydantic_settings import BaseSettings
 import io
 from pydantic import BaseModel
@@ -27,31 +23,181 @@ from datetime import date
 import sqlite3
 import uuid
 import random
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse
+
+from utils.answer_check import check_answer as grade_answer, check_answers as grade_answers
+from utils.csv_reader import summarize_csv
+from utils.dedup import SimilarityIndex
+from utils.health import HealthProber
+from utils.learning_paths import LearningPathCache
+from utils.leaderboard import Leaderboard
+from utils.lms_index import QuizAssignmentIndex
+from utils.logger import setup_logging
+from utils.progress import ChallengeProgress
+from utils.prompt_builder import PromptBuilder
+from utils.question_bank import QuestionBank, content_hash
+from utils.quiz_analytics import QuizAnalytics, as_number
+from utils.storage import ConflictError, JsonStore
+from utils.metrics import (
+    CONTENT_TYPE as METRICS_CONTENT_TYPE, DEEPSEEK_EVENT_HOOKS, JSON_STORE_SECONDS, PDF_EXTRACT_SECONDS,
+    PDF_PAGES, QUEUE_DEPTH, REGISTRY as METRICS_REGISTRY, MetricsMiddleware, observe_time,
+)
+from utils.upload_catalogue import UploadCatalogue
 
 # FIFO queue system for learning pathway questions
 QUEUE_DIR = Path("question_queues")
 QUEUE_DIR.mkdir(exist_ok=True)
 QUEUE_SIZE = 20
 
+_queue_stores: Dict[str, JsonStore] = {}
+
 def get_queue_path(language: str) -> Path:
     return QUEUE_DIR / f"{language.lower()}_queue.json"
 
+def queue_store(language: str) -> JsonStore:
+    key = language.lower()
+    if key not in _queue_stores:
+        _queue_stores[key] = JsonStore(get_queue_path(language))
+    return _queue_stores[key]
+
+@observe_time(JSON_STORE_SECONDS, store="queue", op="read")
 def load_queue(language: str) -> list:
-    path = get_queue_path(language)
-    if path.exists():
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return []
+    queue = queue_store(language).load()
+    QUEUE_DEPTH.labels(language=language.lower()).set(len(queue))
+    return queue
 
+@observe_time(JSON_STORE_SECONDS, store="queue", op="write")
 def save_queue(language: str, queue: list):
-    path = get_queue_path(language)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(queue, f, indent=2)
+    queue_store(language).save(queue)
+    QUEUE_DEPTH.labels(language=language.lower()).set(len(queue))
+
+@observe_time(JSON_STORE_SECONDS, store="queue", op="update")
+def pop_queue(language: str) -> Tuple[Optional[dict], int]:
+    """Atomically pops the head of a queue; returns (question or None, remaining)."""
+    def pop(queue):
+        return (queue.pop(0) if queue else None), len(queue)
+    question, remaining = queue_store(language).update(pop)
+    QUEUE_DEPTH.labels(language=language.lower()).set(remaining)
+    return question, remaining
+
+@observe_time(JSON_STORE_SECONDS, store="queue", op="update")
+def extend_queue(language: str, questions: list) -> int:
+    """Atomically tops a queue up to QUEUE_SIZE with generated questions; returns its new length.
+
+    Concurrent refills each generate for the shortfall they saw, so whatever no
+    longer fits is dropped here (it is still in the question bank).
+    """
+    def extend(queue):
+        queue.extend(questions[:max(0, QUEUE_SIZE - len(queue))])
+        return len(queue)
+    size = queue_store(language).update(extend)
+    QUEUE_DEPTH.labels(language=language.lower()).set(size)
+    return size
+
+async def refill_queue(language: str, remaining: int) -> int:
+    """Tops a queue back up to QUEUE_SIZE once it drops below half full.
+
+    Generation runs outside the store lock, so other workers keep popping while
+    DeepSeek answers; the new questions are appended to whatever is left then.
+    """
+    if remaining >= QUEUE_SIZE // 2:
+        return remaining
+    new_questions = await generate_questions_for_language(language, QUEUE_SIZE - remaining)
+    return await asyncio.to_thread(extend_queue, language, new_questions)
+
+# Near-duplicate index over every generated question: queues, daily challenges, arena and LMS quizzes.
+# Generators ask for a few more questions than they need and drop the near-duplicates.
+question_index = SimilarityIndex()
+
+def overgenerate(n: int) -> int:
+    return n + max(1, n // 2)
+
+def question_text(question) -> str:
+    if isinstance(question, str):
+        return question
+    if not isinstance(question, dict):
+        return ""
+    challenge = question.get("challenge")
+    text = question.get("question") or (challenge.get("question") if isinstance(challenge, dict) else None)
+    return str(text or question.get("title") or "")
+
+def indexed_questions():
+    """Every question already generated and stored, read once to build the index."""
+    for path in QUEUE_DIR.glob("*_queue.json"):
+        for question in queue_store(path.name[:-len("_queue.json")]).load():
+            yield question_text(question)
+    state = load_daily_state()
+    yield from state.get("used_questions", [])
+    yield question_text(state.get("last_challenge"))
+    for quiz in lms_load_quizzes():
+        for question in quiz.get("questions") or []:
+            yield question_text(question)
+
+# The first call builds the index from every stored question, so both run in the threadpool.
+async def fresh_questions(questions: list, limit: Optional[int] = None) -> list:
+    """Drops questions that near-duplicate earlier ones (or each other) and indexes the rest."""
+    def run():
+        question_index.ensure_built(indexed_questions)
+        return question_index.filter_new(questions, key=question_text, limit=limit)
+    return await asyncio.to_thread(run)
+
+async def index_questions(questions: list):
+    def run():
+        question_index.ensure_built(indexed_questions)
+        for question in questions:
+            question_index.add(question_text(question))
+    await asyncio.to_thread(run)
+
+# Every generated question is kept, tagged, in a question bank; endpoints serve
+# questions the caller hasn't seen from it and call DeepSeek only for the shortfall.
+question_bank = QuestionBank(Path(os.getenv("QUESTION_BANK_DB", "question_bank.db")))
+
+# Bank calls run sqlite transactions, so they go to the threadpool rather than the event loop.
+async def bank_take(n: int, origin: str, user_id: Optional[str] = None, **tags) -> list:
+    return await asyncio.to_thread(question_bank.take, n, origin, user_id, **tags)
+
+async def bank_generated(origin: str, generated: list, needed: int, user_id: Optional[str] = None, **tags) -> list:
+    """Stores freshly generated questions and hands out the first ``needed``; the surplus stays unseen in the bank."""
+    served = generated[:needed]
+
+    def store():
+        question_bank.add(generated, origin, text=question_text, **tags)
+        question_bank.mark_served(served, origin, user_id, text=question_text)
+    await asyncio.to_thread(store)
+    question_bank.record_generated(origin, len(served))
+    return served
+
+def upload_hashes(filenames) -> Dict[str, str]:
+    """A fingerprint per uploaded file still on disk (name, size, mtime), to tag and look up banked questions.
+
+    Questions are only served from the bank while the files they came from are
+    unchanged; editing or deleting a file retires them. The files are stat'ed
+    directly, so an edit counts as soon as it lands.
+    """
+    hashes = {}
+    for name in filenames:
+        try:
+            st = os.stat(Path(settings.upload_dir) / name)
+        except FileNotFoundError:
+            continue
+        hashes[name] = content_hash(name, str(st.st_size), str(st.st_mtime_ns))
+    return hashes
+
+async def serve_questions(origin: str, n: int, generate, user_id: Optional[str] = None, **tags) -> list:
+    """Up to ``n`` questions: unseen ones from the bank, then ``await generate(shortfall)`` for the rest."""
+    questions = await bank_take(n, origin, user_id, **tags)
+    if len(questions) < n:
+        questions += await bank_generated(origin, await generate(n - len(questions)), n - len(questions), user_id,
+                                          **tags)
+    return questions
 
 async def generate_questions_for_language(language: str, n: int) -> list:
+    return await serve_questions("learning_queue", n, lambda k: deepseek_language_questions(language, k),
+                                 language=language)
+
+async def deepseek_language_questions(language: str, n: int) -> list:
     prompt = (
-        f"Generate {n} step-by-step learning pathway questions for {language} programming. "
+        f"Generate {overgenerate(n)} step-by-step learning pathway questions for {language} programming. "
         "For each step, provide:\n"
         "- A unique id (string)\n"
         "- A title (string)\n"
@@ -71,7 +217,7 @@ async def generate_questions_for_language(language: str, n: int) -> list:
             {"role": "user", "content": prompt}
         ]
     }
-    async with httpx.AsyncClient(timeout=120.0) as client:
+    async with deepseek_client(timeout=120.0) as client:
         response = await client.post(
             settings.deepseek_url,
             headers=headers,
@@ -93,17 +239,11 @@ async def generate_questions_for_language(language: str, n: int) -> list:
         else:
             logger.warning("Returning raw DeepSeek response as fallback.")
             raise HTTPException(status_code=500, detail="Could not parse structured steps from DeepSeek.")
-    return questions
+    return await fresh_questions(questions)
 
-# Configure structured logging
-log_dir = Path("logs")
-log_dir.mkdir(exist_ok=True)
-
-logging.basicConfig(
-    level=logging.DEBUG,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[logging.FileHandler(log_dir / "app.log"), logging.StreamHandler()],
-)
+# Configure logging: levels, handlers and rotation come from configs/logging.conf,
+# and records are written by a background queue listener.
+setup_logging()
 
 logger = logging.getLogger(__name__)
 
@@ -135,6 +275,14 @@ class Settings(BaseSettings):
     deepseek_model: str = "deepseek-chat"  # Using DeepSeek as default model
     deepseek_url: str = "https://api.deepseek.com/v1/chat/completions"
     deepseek_api_key: str  # No default value, must come from .env or environment
+    csv_sample_rows: int = 20  # rows of a CSV shown to the model
+    csv_max_rows: Optional[int] = None  # stop profiling a CSV after this many rows
+    # Prompt-token budgets per model (prompt only; the rest of the context is left for the answer)
+    prompt_token_budgets: Dict[str, int] = {"deepseek-chat": 12000, "deepseek-reasoner": 12000}
+    default_prompt_token_budget: int = 4000
+    classification_token_budget: int = 1024
+    health_probe_interval: float = 30.0  # seconds between background dependency checks
+    health_probe_timeout: float = 3.0
 
     class Config:
         env_file = ".env"
@@ -142,10 +290,71 @@ class Settings(BaseSettings):
 
 
 settings = Settings()
-print("Loaded DeepSeek API key:", settings.deepseek_api_key)
+logger.info("DeepSeek API key %s", "loaded" if settings.deepseek_api_key else "missing")
+
+
+def prompt_budget(model: Optional[str] = None) -> int:
+    """Prompt-token budget for a model, falling back to the default budget."""
+    return settings.prompt_token_budgets.get(model or settings.deepseek_model, settings.default_prompt_token_budget)
+
+
+def deepseek_client(**kwargs) -> httpx.AsyncClient:
+    """httpx client whose requests feed the DeepSeek latency, status and token metrics."""
+    return httpx.AsyncClient(event_hooks=DEEPSEEK_EVENT_HOOKS, **kwargs)
+
+
+def deepseek_models_url() -> str:
+    """DeepSeek's model list: a cheap authenticated GET on the same API as the chat endpoint."""
+    return settings.deepseek_url.rsplit("/chat/completions", 1)[0] + "/models"
+
+
+async def check_sqlite(path: Path) -> Dict[str, Any]:
+    def query():
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=1.0)
+        try:
+            conn.execute("SELECT 1").fetchone()
+        finally:
+            conn.close()
+    await asyncio.to_thread(query)
+    return {"status": "ok"}
+
+
+async def check_deepseek() -> Dict[str, Any]:
+    # A plain client, so probe traffic stays out of the DeepSeek request metrics.
+    async with httpx.AsyncClient(timeout=settings.health_probe_timeout) as client:
+        response = await client.get(deepseek_models_url(),
+                                    headers={"Authorization": f"Bearer {settings.deepseek_api_key}"})
+    if response.status_code == 200:
+        return {"status": "ok"}
+    return {"status": "error", "http_status": response.status_code}
+
+
+async def check_queues() -> Dict[str, Any]:
+    def depths():
+        return {path.name[:-len("_queue.json")]: len(load_queue(path.name[:-len("_queue.json")]))
+                for path in QUEUE_DIR.glob("*_queue.json")}
+    return {"status": "ok", "depths": await asyncio.to_thread(depths)}
+
+
+# Dependencies are checked in the background; the health endpoints only read the last results.
+health_prober = HealthProber(
+    {"database": lambda: check_sqlite(RANKINGS_DB),
+     "question_bank": lambda: check_sqlite(question_bank.path),
+     "deepseek": check_deepseek,
+     "queues": check_queues},
+    interval=settings.health_probe_interval, timeout=settings.health_probe_timeout,
+    critical=("database", "question_bank"))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    health_prober.start()
+    yield
+    await health_prober.stop()
+
 
 # Initialize FastAPI app
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -155,20 +364,25 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
 
 METADATA_FILE = Path(settings.upload_dir) / "file_metadata.json"
+metadata_store = JsonStore(METADATA_FILE)
 
 
+@observe_time(JSON_STORE_SECONDS, store="upload_metadata", op="read")
 def load_metadata() -> List[Dict[str, Any]]:
-    if METADATA_FILE.exists():
-        with open(METADATA_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return []
+    return metadata_store.load()
 
 
+@observe_time(JSON_STORE_SECONDS, store="upload_metadata", op="write")
 def save_metadata(metadata: List[Dict[str, Any]]):
-    with open(METADATA_FILE, "w", encoding="utf-8") as f:
-        json.dump(metadata, f, indent=2)
+    metadata_store.save(metadata)
+
+
+@observe_time(JSON_STORE_SECONDS, store="upload_metadata", op="update")
+def append_metadata(*entries: Dict[str, Any]):
+    metadata_store.append(*entries)
 
 
 @app.get("/")
@@ -176,50 +390,59 @@ async def root():
     return {"message": "AutoTrainerX API is running"}
 
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus scrape endpoint."""
+    return PlainTextResponse(METRICS_REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
+
+
 @app.get("/health")
 async def health_check():
-    """Health check endpoint for monitoring server status"""
-    try:
-        # Test database connection
-        conn = sqlite3.connect('rankings.db')
-        conn.close()
+    """Last background health check, in the original response shape."""
+    def describe(name):
+        result = health_prober.results.get(name)
+        if result is None:
+            return "unknown"
+        if result["status"] == "ok":
+            return "connected"
+        # Answered with an error status, or not reachable at all.
+        return "error" if "http_status" in result else "disconnected"
+    return {
+        "status": "healthy" if health_prober.ready else "unhealthy",
+        "database": describe("database"),
+        "deepseek": describe("deepseek"),
+        "timestamp": datetime.now().isoformat()
+    }
 
-        # Test DeepSeek connection (with short timeout)
-        try:
-            async with httpx.AsyncClient(timeout=3.0) as client:
-                response = await client.get(f"{settings.deepseek_url}/v1/chat/completions")
-                if response.status_code == 200:
-                    deepseek_status = "connected"
-                else:
-                    deepseek_status = "error"
-        except Exception:
-            deepseek_status = "disconnected"
 
-        return {
-            "status": "healthy",
-            "database": "connected",
-            "deepseek": deepseek_status,
-            "timestamp": datetime.now().isoformat()
-        }
-    except Exception as e:
-        return {
-            "status": "unhealthy",
-            "error": str(e),
-            "timestamp": datetime.now().isoformat()
-        }
+@app.get("/health/live")
+async def health_live():
+    """Liveness: the process is up and serving requests."""
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+async def health_ready():
+    """Readiness from the cached dependency checks, with queue depths and event-loop lag; 503 until ready."""
+    snapshot = health_prober.snapshot()
+    snapshot["queue_depths"] = health_prober.results.get("queues", {}).get("depths", {})
+    return JSONResponse(snapshot, status_code=200 if health_prober.ready else 503)
 
 
 # Ensure upload directory exists
 Path(settings.upload_dir).mkdir(exist_ok=True)
+upload_catalogue = UploadCatalogue(settings.upload_dir, settings.allowed_extensions)
 
 
 async def extract_text_from_pdf(pdf_path: str) -> str:
     """ Extracts text from a PDF asynchronously using streaming."""
     text = ""
+    start = time.perf_counter()
     try:
         async with aiofiles.open(pdf_path, "rb") as file:
             pdf_content = await file.read()
             pdf_file = io.BytesIO(pdf_content)
+            import PyPDF2  # deferred: only PDF routes pay for the import
             reader = PyPDF2.PdfReader(pdf_file)
 
             # Check if PDF is encrypted
@@ -245,6 +468,8 @@ async def extract_text_from_pdf(pdf_path: str) -> str:
             logger.warning(f"No text could be extracted from PDF: {pdf_path}")
             return ""
 
+        PDF_EXTRACT_SECONDS.observe(time.perf_counter() - start)
+        PDF_PAGES.observe(len(reader.pages))
         logger.info(f"Successfully extracted text from PDF: {pdf_path}")
         return text
     except Exception as e:
@@ -264,15 +489,13 @@ async def load_text_file(text_path: str) -> str:
         raise HTTPException(status_code=500, detail="Error loading text file")
 
 
-async def load_csv_data(csv_path: str) -> List[Dict[str, Any]]:
-    """ Loads CSV data asynchronously without blocking. """
+async def load_csv_summary(csv_path: str) -> str:
+    """ Streams a CSV once and returns its schema plus a row sample as prompt text. """
     try:
-        async with aiofiles.open(csv_path, "r", encoding="utf-8") as file:
-            content = await file.read()
-        df = pd.read_csv(StringIO(content))
-        data = df.to_dict(orient="records")
-        logger.info(f"Loaded CSV data from file: {csv_path}")
-        return data
+        summary = await asyncio.to_thread(
+            summarize_csv, csv_path, settings.csv_sample_rows, settings.csv_max_rows)
+        logger.info(f"Summarised {summary.row_count} CSV rows from file: {csv_path}")
+        return summary.render()
     except Exception as e:
         logger.error(f"Error loading CSV data: {str(e)}")
         raise HTTPException(status_code=500, detail="Error loading CSV data")
@@ -292,14 +515,18 @@ async def fetch_with_retries(api_call, retries=3, delay=2):
 
 async def analyze_content(text: str) -> Tuple[str, float, Optional[str]]:
     """ Uses DeepSeek to analyze content type asynchronously. """
-    async with httpx.AsyncClient(timeout=90.0) as client:
+    prompt = (PromptBuilder(min(prompt_budget(), settings.classification_token_budget))
+              .instructions("Classify the following text into valid_conversation, technical_documentation, nonsense, or irrelevant. Respond in JSON format with category, confidence (0-1), and explanation.\n\nText:")
+              .passages([text])
+              .build(endpoint="analyze_content"))
+    async with deepseek_client(timeout=90.0) as client:
         try:
             response = await client.post(
                 f"{settings.deepseek_url}/v1/chat/completions",
                 json={
                     "model": settings.deepseek_model,
                     "messages": [
-                        {"role": "user", "content": f"Classify the following text into valid_conversation, technical_documentation, nonsense, or irrelevant. Respond in JSON format with category, confidence (0-1), and explanation.\n\nText: {text[:1000]}"}
+                        {"role": "user", "content": prompt.text}
                     ]
                 }
             )
@@ -367,15 +594,16 @@ async def process_file(file: UploadFile) -> List[Dict[str, Any]]:
     await validate_file(file)
     file_path = Path(settings.upload_dir) / file.filename
 
-    async with aiofiles.open(file_path, "wb") as f:
-        await f.write(await file.read())
+    with upload_catalogue.adding(file_path):
+        async with aiofiles.open(file_path, "wb") as f:
+            await f.write(await file.read())
 
     if file_path.suffix == ".pdf":
         extracted_text = await extract_text_from_pdf(str(file_path))
     elif file_path.suffix == ".txt":
         extracted_text = await load_text_file(str(file_path))
     elif file_path.suffix == ".csv":
-        extracted_text = json.dumps(await load_csv_data(str(file_path)))
+        extracted_text = await load_csv_summary(str(file_path))
 
     category, confidence, explanation = await analyze_content(extracted_text)
     if category in ["nonsense", "irrelevant"]:
@@ -396,19 +624,17 @@ async def upload_files(
     upload_dir.mkdir(parents=True, exist_ok=True)
     for file in files:
         file_path = upload_dir / file.filename
-        async with aiofiles.open(file_path, "wb") as out_file:
-            content = await file.read()
-            await out_file.write(content)
+        with upload_catalogue.adding(file_path):
+            async with aiofiles.open(file_path, "wb") as out_file:
+                content = await file.read()
+                await out_file.write(content)
     # Save metadata
-    metadata = load_metadata()
-    for file in files:
-        metadata.append({
-            "filename": file.filename,
-            "stream": stream,
-            "exam": exam,
-            "subject": subject
-        })
-    save_metadata(metadata)
+    await asyncio.to_thread(append_metadata, *({
+        "filename": file.filename,
+        "stream": stream,
+        "exam": exam,
+        "subject": subject
+    } for file in files))
     return {"message": "Files uploaded successfully", "data_count": len(files)}
 
 
@@ -416,17 +642,7 @@ async def upload_files(
 async def list_files():
     """ Lists all processed files in the upload directory. """
     try:
-        files = []
-        upload_dir = Path(settings.upload_dir)
-        if upload_dir.exists():
-            for file_path in upload_dir.glob("*.*"):
-                if file_path.suffix.lower() in settings.allowed_extensions:
-                    files.append({
-                        "filename": file_path.name,
-                        "size": file_path.stat().st_size,
-                        "last_modified": file_path.stat().st_mtime
-                    })
-        return files
+        return upload_catalogue.list()
     except Exception as e:
         logger.error(f"Error listing files: {str(e)}")
         raise HTTPException(status_code=500, detail="Error listing files")
@@ -449,7 +665,7 @@ async def query_model(prompt: Dict[str, str]):
             full_prompt += " of India"
             logger.info(f"Modified prompt to: {full_prompt}")
 
-        async with httpx.AsyncClient(timeout=300.0) as client:
+        async with deepseek_client(timeout=300.0) as client:
             headers = {
                 "Authorization": f"Bearer {settings.deepseek_api_key}",
                 "Content-Type": "application/json"
@@ -494,6 +710,7 @@ class QuestionRequest(BaseModel):
     prompt: str
     question_count: int = 5  # Default to 5 questions
     fileName: Optional[str] = None  # Add fileName parameter
+    user_id: Optional[str] = None  # Serve this user questions they haven't seen yet
 
 
 class Question(BaseModel):
@@ -503,26 +720,45 @@ class Question(BaseModel):
     explanation: str
 
 
+# Required by the response parser, so it goes in as instructions and is never dropped for budget.
+MCQ_EXAMPLE_FORMAT = """Example format:
+[
+    {
+        "question": "What is...?",
+        "options": ["Option A", "Option B", "Option C", "Option D"],
+        "correctAnswer": "Option A",
+        "explanation": "Explanation why Option A is correct"
+    }
+]"""
+
+
 @app.post("/generate-questions/")
 async def generate_questions(request: QuestionRequest):
     """Generates questions based on uploaded files and subject/topic."""
+    metadata = await asyncio.to_thread(load_metadata)
+    filtered_files = [m["filename"] for m in metadata if
+                      m["subject"] == request.subject and m["exam"] == request.topic]
+    # Banked questions only count while the matching files are the ones they were generated from.
+    tags = {"subject": request.subject, "exam": request.topic,
+            "source_hash": content_hash(*sorted((await asyncio.to_thread(upload_hashes, filtered_files)).values()))}
+    banked = await bank_take(request.question_count, "generate_questions", request.user_id, **tags)
+    if len(banked) >= request.question_count:
+        return {"questions": banked}
+    needed = request.question_count - len(banked)
     try:
-        async with httpx.AsyncClient(timeout=300.0) as client:
+        async with deepseek_client(timeout=300.0) as client:
             files = []
             upload_dir = Path(settings.upload_dir)
-            metadata = load_metadata()
-            filtered_files = [m["filename"] for m in metadata if
-                              m["subject"] == request.subject and m["exam"] == request.topic]
             for filename in filtered_files:
                 file_path = upload_dir / filename
-                if file_path.exists() and file_path.suffix.lower() in settings.allowed_extensions:
+                if filename in upload_catalogue:
                     try:
                         if file_path.suffix == ".pdf":
                             content = await extract_text_from_pdf(str(file_path))
                         elif file_path.suffix == ".txt":
                             content = await load_text_file(str(file_path))
                         elif file_path.suffix == ".csv":
-                            content = json.dumps(await load_csv_data(str(file_path)))
+                            content = await load_csv_summary(str(file_path))
                         if content:
                             files.append(content)
                     except Exception as e:
@@ -533,7 +769,6 @@ async def generate_questions(request: QuestionRequest):
                     status_code=400,
                     detail="No valid content could be extracted from the uploaded files for the selected filters"
                 )
-            combined_content = "\n".join(files)
             logger.info(f"Generating questions from {len(files)} file(s) matching filters")
 
             # Generate questions using DeepSeek
@@ -541,11 +776,15 @@ async def generate_questions(request: QuestionRequest):
                 "Authorization": f"Bearer {settings.deepseek_api_key}",
                 "Content-Type": "application/json"
             }
-            prompt = f"""Based on the following content, generate {request.question_count} multiple choice questions about {request.topic} for {request.subject} exam preparation.\nFor each question, provide 4 options and mark the correct answer.\nAlso provide a brief explanation for each answer.\nFormat the response as a JSON array of questions.\n\nContent:\n{combined_content[:2000]}  # Limit content to avoid token limits\n\nExample format:\n[\n    {{\n        \"question\": \"What is...?\",\n        \"options\": [\"Option A\", \"Option B\", \"Option C\", \"Option D\"],\n        \"correctAnswer\": \"Option A\",\n        \"explanation\": \"Explanation why Option A is correct\"\n    }}\n]"""
+            prompt = (PromptBuilder(prompt_budget())
+                      .instructions(f"Based on the following content, generate {overgenerate(needed)} multiple choice questions about {request.topic} for {request.subject} exam preparation.\nFor each question, provide 4 options and mark the correct answer.\nAlso provide a brief explanation for each answer.\nFormat the response as a JSON array of questions.\n\nContent:")
+                      .passages(files)
+                      .instructions(MCQ_EXAMPLE_FORMAT)
+                      .build(endpoint="generate_questions"))
             payload = {
                 "model": settings.deepseek_model,
                 "messages": [
-                    {"role": "user", "content": prompt}
+                    {"role": "user", "content": prompt.text}
                 ]
             }
             response = await client.post(
@@ -578,7 +817,10 @@ async def generate_questions(request: QuestionRequest):
                             valid_questions.append(q)
 
                     if valid_questions:
-                        return {"questions": valid_questions}
+                        new = await bank_generated("generate_questions", await fresh_questions(valid_questions),
+                                                   needed, request.user_id, **tags)
+                        # If every one is a repeat, repeats still beat an error.
+                        return {"questions": banked + (new or valid_questions[:needed])}
                     else:
                         raise HTTPException(status_code=500, detail="Generated questions have invalid format")
                 else:
@@ -595,6 +837,7 @@ async def generate_questions(request: QuestionRequest):
 class ArenaQuestionRequest(BaseModel):
     question_count: int = 2  # Default to 2 questions for arena
     prompt: str = "Generate challenging questions from all available study materials"
+    user_id: Optional[str] = None  # Serve this user questions they haven't seen yet
 
 
 def generate_fallback_arena_questions(question_count: int, filename: str) -> List[Dict[str, Any]]:
@@ -626,14 +869,22 @@ def generate_fallback_arena_questions(question_count: int, filename: str) -> Lis
 @app.post("/generate-arena-questions/")
 async def generate_arena_questions(request: ArenaQuestionRequest):
     """Generates questions for Countdown Arena using all uploaded files."""
+    metadata = await asyncio.to_thread(load_metadata)
+    # Use all uploaded files for arena questions
+    all_files = [m["filename"] for m in metadata]
+    file_hashes = await asyncio.to_thread(upload_hashes, all_files)
+    prompt_tag = content_hash(request.prompt)
+    # Banked arena questions for this prompt, from files still uploaded unchanged, skip both the
+    # file selection and the generation call.
+    banked = await bank_take(request.question_count, "arena_questions", request.user_id, prompt=prompt_tag,
+                             source_hash=list(file_hashes.values()))
+    if len(banked) >= request.question_count:
+        return {"questions": banked, "selected_file": banked[0].get("source_file") or "question_bank"}
+    needed = request.question_count - len(banked)
     try:
-        async with httpx.AsyncClient(timeout=300.0) as client:
+        async with deepseek_client(timeout=300.0) as client:
             files = []
             upload_dir = Path(settings.upload_dir)
-            metadata = load_metadata()
-
-            # Use all uploaded files for arena questions
-            all_files = [m["filename"] for m in metadata]
             logger.info(f"Arena mode: Using all {len(all_files)} uploaded files")
 
             if not all_files:
@@ -643,7 +894,7 @@ async def generate_arena_questions(request: ArenaQuestionRequest):
                 )
 
             # First, let the model select which file to use for questions
-            file_selection_prompt = f"""You have access to the following uploaded study files:\n{', '.join(all_files)}\n\nSelect ONE file that would be best for generating {request.question_count} challenging questions. \nRespond with ONLY the filename, nothing else.\n\nExample response: \"LEGAL_APTITUDE_AND_LOGICAL_REASONING_printable.pdf\"\n"""
+            file_selection_prompt = f"""You have access to the following uploaded study files:\n{', '.join(all_files)}\n\nSelect ONE file that would be best for generating {needed} challenging questions. \nRespond with ONLY the filename, nothing else.\n\nExample response: \"LEGAL_APTITUDE_AND_LOGICAL_REASONING_printable.pdf\"\n"""
 
             # Get file selection from DeepSeek
             headers = {
@@ -681,14 +932,14 @@ async def generate_arena_questions(request: ArenaQuestionRequest):
 
             # Now process only the selected file
             file_path = upload_dir / selected_filename
-            if file_path.exists() and file_path.suffix.lower() in settings.allowed_extensions:
+            if selected_filename in upload_catalogue:
                 try:
                     if file_path.suffix == ".pdf":
                         content = await extract_text_from_pdf(str(file_path))
                     elif file_path.suffix == ".txt":
                         content = await load_text_file(str(file_path))
                     elif file_path.suffix == ".csv":
-                        content = json.dumps(await load_csv_data(str(file_path)))
+                        content = await load_csv_summary(str(file_path))
                     if content:
                         files.append(content)
                         logger.info(f"Successfully processed selected file for arena: {selected_filename}")
@@ -709,15 +960,19 @@ async def generate_arena_questions(request: ArenaQuestionRequest):
                     detail=f"Selected file not found or unsupported format: {selected_filename}"
                 )
 
-            combined_content = files[0]  # Only one file content
             logger.info(f"Generating arena questions from selected file: {selected_filename}")
 
             # Generate questions using DeepSeek from the selected file only
-            arena_prompt = f"""{request.prompt}\nGenerate {request.question_count} challenging questions from the selected study material: {selected_filename}\n\nFor each question, provide 4 options and mark the correct answer.\nAlso provide a brief explanation for each answer.\nFormat the response as a JSON array of questions.\n\nContent from selected file:\n{combined_content[:2000]}  # Limit content to avoid token limits\n\nIMPORTANT: Respond with ONLY valid JSON array format, no additional text.\nExample format:\n[\n    {{\n        \"question\": \"What is...?\",\n        \"options\": [\"Option A\", \"Option B\", \"Option C\", \"Option D\"],\n        \"correctAnswer\": \"Option A\",\n        \"explanation\": \"Explanation why Option A is correct\"\n    }}\n]"""
+            # Only one file content
+            arena_prompt = (PromptBuilder(prompt_budget())
+                            .instructions(f"{request.prompt}\nGenerate {overgenerate(needed)} challenging questions from the selected study material: {selected_filename}\n\nFor each question, provide 4 options and mark the correct answer.\nAlso provide a brief explanation for each answer.\nFormat the response as a JSON array of questions.\n\nContent from selected file:")
+                            .passages(files[:1])
+                            .instructions("IMPORTANT: Respond with ONLY valid JSON array format, no additional text.\n" + MCQ_EXAMPLE_FORMAT)
+                            .build(endpoint="arena_questions"))
             payload = {
                 "model": settings.deepseek_model,
                 "messages": [
-                    {"role": "user", "content": arena_prompt}
+                    {"role": "user", "content": arena_prompt.text}
                 ]
             }
             response = await client.post(
@@ -791,8 +1046,14 @@ async def generate_arena_questions(request: ArenaQuestionRequest):
 
                     if valid_questions:
                         logger.info(f"Successfully generated {len(valid_questions)} valid arena questions")
+                        for q in valid_questions:
+                            q["source_file"] = selected_filename
+                        new = await bank_generated("arena_questions", await fresh_questions(valid_questions), needed,
+                                                   request.user_id, source_file=selected_filename,
+                                                   source_hash=file_hashes.get(selected_filename, ""),
+                                                   prompt=prompt_tag)
                         return {
-                            "questions": valid_questions,
+                            "questions": banked + (new or valid_questions[:needed]),
                             "selected_file": selected_filename
                         }
                     else:
@@ -858,31 +1119,52 @@ async def generate_arena_questions(request: ArenaQuestionRequest):
 
 class CheckAnswerRequest(BaseModel):
     question: str
-    options: list
+    options: list = []
     userAnswer: str
     correctAnswer: str
+    # Programming language of a code answer (enables comment stripping) and "text" or "tokens" comparison.
+    language: Optional[str] = None
+    compare: Optional[str] = None
+
+
+class CheckAnswersRequest(BaseModel):
+    items: List[CheckAnswerRequest]
+    # Defaults for items that don't set their own.
+    language: Optional[str] = None
+    compare: str = "text"
 
 
 @app.post("/check-answer/")
 async def check_answer(req: CheckAnswerRequest):
-    def normalize(s, lang=None):
-        s = s.strip().lower()
-        # Remove comments and semicolons for code
-        if lang in ["python", "java", "javascript", "c", "c++"]:
-            s = re.sub(r"#.*|//.*|/\*.*?\*/", "", s)  # Remove comments
-            s = s.replace(";", "")
-        return s.strip()
-    user_ans = normalize(req.userAnswer, req.options)
-    correct_ans = normalize(req.correctAnswer, req.options)
-    # AI-based check (as before, omitted for brevity)
-    # Fallback: robust text comparison
-    is_correct = user_ans == correct_ans
-    if not is_correct and req.options:
-        for opt in req.options:
-            if normalize(opt) == user_ans and normalize(opt) == correct_ans:
-                is_correct = True
-                break
-    return {"isCorrect": is_correct}
+    try:
+        return {"isCorrect": grade_answer(req.userAnswer, req.correctAnswer, req.language, req.compare or "text")}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.post("/check-answers/")
+async def check_answers(req: CheckAnswersRequest):
+    """Grades a whole submission (e.g. an arena round) in one request."""
+    try:
+        return grade_answers((item.model_dump() for item in req.items), req.language, req.compare)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/question-bank/")
+def search_question_bank(origin: Optional[str] = None, language: Optional[str] = None,
+                         difficulty: Optional[str] = None, subject: Optional[str] = None,
+                         exam: Optional[str] = None, source_hash: Optional[str] = None,
+                         limit: int = Query(50, ge=1, le=500)):
+    """Stored questions matching every given tag, newest first."""
+    return {"questions": question_bank.search(origin, limit, language=language, difficulty=difficulty,
+                                              subject=subject, exam=exam, source_hash=source_hash)}
+
+
+@app.get("/question-bank/stats")
+def question_bank_stats():
+    """Stored and unserved questions per origin, and the share served from the bank."""
+    return question_bank.stats()
 
 
 class LearningPathRequest(BaseModel):
@@ -892,11 +1174,15 @@ class LearningPathRequest(BaseModel):
     language: Optional[str] = "English"  # Optionally allow specifying output language
 
 
-@app.post("/generate-learning-path/")
-async def generate_learning_path(
-    language: str = Body(...),
-    completed_ids: list = Body(default=[])
-):
+class LearningPathUnparsed(Exception):
+    """DeepSeek answered, but not with a JSON array of steps."""
+    def __init__(self, content: str):
+        super().__init__("Could not parse structured steps from DeepSeek.")
+        self.content = content
+
+
+async def deepseek_learning_path(language: str) -> list:
+    """The canonical (student-independent) learning path for a language."""
     if language.lower() == "react":
         prompt = (
             f"Create a learning pathway for {language} programming with 3 steps, "
@@ -906,7 +1192,6 @@ async def generate_learning_path(
             "- A practical coding challenge (not just Hello World).\n"
             "- Detailed, step-by-step instructions for the challenge, as if teaching a new student.\n"
             "- Each step should have a unique ID, a title, a description, instructions (array), and a challenge (with question and expected output).\n"
-            f"Do NOT include steps already completed by the student (IDs: {completed_ids}).\n"
             "Respond ONLY as a JSON array of 3 objects, each with: id, title, description, instructions (array), challenge (object with question and expected output).\n"
         )
     else:
@@ -918,10 +1203,9 @@ async def generate_learning_path(
             "- A practical coding challenge (not just Hello World).\n"
             "- Detailed, step-by-step instructions for the challenge, as if teaching a new student.\n"
             "- Each step should have a unique ID, a title, a description, instructions (array), and a challenge (with question and expected output).\n"
-            f"Do NOT include steps already completed by the student (IDs: {completed_ids}).\n"
             "Respond ONLY as a JSON array of objects, each with: id, title, description, instructions (array), challenge (object with question and expected output).\n"
         )
-    async with httpx.AsyncClient(timeout=120.0) as client:
+    async with deepseek_client(timeout=120.0) as client:
         headers = {
             "Authorization": f"Bearer {settings.deepseek_api_key}",
             "Content-Type": "application/json"
@@ -942,38 +1226,60 @@ async def generate_learning_path(
             raise HTTPException(status_code=500, detail="Failed to generate learning path from DeepSeek.")
         response_data = response.json()
         content = response_data["choices"][0]["message"]["content"]
-        import json, re
         content = content.replace('```', '')
         json_match = re.search(r'\[.*\]', content, re.DOTALL)
         if json_match:
             try:
-                learning_path = json.loads(json_match.group())
-                return {"learning_path": learning_path}
+                return [step for step in json.loads(json_match.group()) if isinstance(step, dict)]
             except Exception as e:
                 logger.error(f"JSON parsing error: {str(e)}")
-        # Fallback: return a hardcoded React Hello World challenge with detailed hint if language is react
-        if language.lower() == "react":
-            return {"learning_path": [
-                {
-                    "id": "react-hello-world",
-                    "title": "Hello World in React",
-                    "description": "Learn how to set up your first React app and display 'Hello World' on the screen.",
-                    "instructions": [],  # Remove redundant instructions
-                    "challenge": {
-                        "question": "Create a React app that displays 'Hello World' on the page.",
-                        "expected_output": "Hello World"
-                    },
-                    "hint": "Install Node.js and npm (if not already installed). Create a new React app using the command: `npx create-react-app hello-world`. Navigate to the project folder: `cd hello-world`. Open the `src/App.js` file and replace its content with a simple `Hello World` component. Run the app using `npm start` and open it in your browser."
-                }
-            ]}
-        logger.warning("Returning raw DeepSeek response as fallback.")
-        return {"learning_path": content, "warning": "Could not parse structured steps. See 'learning_path' for raw output."}
+        raise LearningPathUnparsed(content)
+
+
+# One canonical path per language, regenerated in the background once it is older than this.
+LEARNING_PATH_DIR = Path("learning_paths")
+learning_paths = LearningPathCache(LEARNING_PATH_DIR, deepseek_learning_path,
+                                   max_age=float(os.getenv("LEARNING_PATH_MAX_AGE_HOURS", "168")) * 3600)
+
+
+@app.post("/generate-learning-path/")
+async def generate_learning_path(
+    language: str = Body(...),
+    completed_ids: list = Body(default=[]),
+    user_id: Optional[str] = Body(default=None)
+):
+    if user_id:
+        # Stored progress, merged with whatever the client sent.
+        stored = await asyncio.to_thread(challenge_progress.completed_ids, user_id, language)
+        completed_ids = list(dict.fromkeys([*completed_ids, *stored]))
+    try:
+        return {"learning_path": await learning_paths.path_for(language, completed_ids)}
+    except LearningPathUnparsed as e:
+        content = e.content
+    # Fallback: return a hardcoded React Hello World challenge with detailed hint if language is react
+    if language.lower() == "react":
+        return {"learning_path": [
+            {
+                "id": "react-hello-world",
+                "title": "Hello World in React",
+                "description": "Learn how to set up your first React app and display 'Hello World' on the screen.",
+                "instructions": [],  # Remove redundant instructions
+                "challenge": {
+                    "question": "Create a React app that displays 'Hello World' on the page.",
+                    "expected_output": "Hello World"
+                },
+                "hint": "Install Node.js and npm (if not already installed). Create a new React app using the command: `npx create-react-app hello-world`. Navigate to the project folder: `cd hello-world`. Open the `src/App.js` file and replace its content with a simple `Hello World` component. Run the app using `npm start` and open it in your browser."
+            }
+        ]}
+    logger.warning("Returning raw DeepSeek response as fallback.")
+    return {"learning_path": content, "warning": "Could not parse structured steps. See 'learning_path' for raw output."}
 
 
 class ChallengeRequest(BaseModel):
     language: str
     difficulty: str
     type: str = "general"  # e.g., 'daily', 'learning', 'pvp', etc.
+    user_id: Optional[str] = None  # Serve this user challenges they haven't seen yet
 
 
 class Challenge(BaseModel):
@@ -1003,30 +1309,31 @@ async def generate_challenges(request: ChallengeRequest = Body(...), type: str =
         }
     if type == "learning_pathway":
         language = request.language if hasattr(request, 'language') and request.language else 'Python'
-        queue = load_queue(language)
-        logger.info(f"[QUEUE] Before pop: {len(queue)} questions in {language}_queue.json")
-        logger.info(f"[QUEUE] First 3 questions before pop: {[q.get('id') for q in queue[:3]]}")
-        if not queue:
-            queue = await generate_questions_for_language(language, QUEUE_SIZE)
+        popped, remaining = await asyncio.to_thread(pop_queue, language)
+        if popped is None:
+            generated = await generate_questions_for_language(language, QUEUE_SIZE)
+            if generated:
+                popped = generated.pop(0)
+                remaining = await asyncio.to_thread(extend_queue, language, generated)
         challenges_to_serve = []
-        if queue:
-            popped = queue.pop(0)
+        if popped is not None:
             logger.info(f"[QUEUE] Popped question: {popped.get('id')}")
             challenges_to_serve.append(popped)
-        logger.info(f"[QUEUE] After pop: {len(queue)} questions left in {language}_queue.json")
-        if len(queue) < QUEUE_SIZE // 2:
-            to_generate = QUEUE_SIZE - len(queue)
-            new_questions = await generate_questions_for_language(language, to_generate)
-            queue.extend(new_questions)
-            logger.info(f"[QUEUE] Added {to_generate} new questions. Queue size now: {len(queue)}")
-        save_queue(language, queue)
+        logger.info(f"[QUEUE] After pop: {remaining} questions left in {language}_queue.json")
+        size = await refill_queue(language, remaining)
+        if size != remaining:
+            logger.info(f"[QUEUE] Added {size - remaining} new questions. Queue size now: {size}")
         # Map to full challenge structure if needed
         challenges_to_serve = [map_to_full_challenge(ch, idx, language) for idx, ch in enumerate(challenges_to_serve)]
         return {"challenges": challenges_to_serve}
     # Default behavior for other types
+    tags = {"language": request.language, "difficulty": request.difficulty}
+    banked = await bank_take(1, "challenges", request.user_id, **tags)
+    if banked:
+        return {"challenges": [map_to_full_challenge(banked[0], 0, request.language)]}
     try:
         prompt = f"Generate a {request.difficulty.lower()} level {request.language} coding challenge. Provide a question and a hint. Respond as JSON with 'question' and 'hint' fields."
-        async with httpx.AsyncClient(
+        async with deepseek_client(
                 timeout=60.0,
                 limits=httpx.Limits(max_connections=5, max_keepalive_connections=2),
                 http2=False
@@ -1054,6 +1361,7 @@ async def generate_challenges(request: ChallengeRequest = Body(...), type: str =
             if json_match:
                 try:
                     challenge = json.loads(json_match.group())
+                    await bank_generated("challenges", [challenge], 1, request.user_id, **tags)
                     challenge = map_to_full_challenge(challenge, 0, request.language)
                     return {"challenges": [challenge]}
                 except Exception:
@@ -1091,7 +1399,7 @@ async def generate_learning_content(request: LearningContentRequest = Body(...))
         f"Respond ONLY as a JSON object with keys: 'theory', 'example', 'challenges' (where 'challenges' is an array of objects with 'question' and 'hint'). "
         f"Example: {{\"theory\": \"...\", \"example\": \"...\", \"challenges\": [{{\"question\": \"...\", \"hint\": \"...\"}}, ...]}}"
     )
-    async with httpx.AsyncClient(timeout=60.0) as client:
+    async with deepseek_client(timeout=60.0) as client:
         headers = {
             "Authorization": f"Bearer {settings.deepseek_api_key}",
             "Content-Type": "application/json"
@@ -1124,61 +1432,50 @@ async def generate_learning_content(request: LearningContentRequest = Body(...))
 @app.post("/fill-queue/")
 async def fill_queue(language: str = Query(...)):
     """Fill the queue for a language up to QUEUE_SIZE questions."""
-    queue = load_queue(language)
-    to_generate = QUEUE_SIZE - len(queue)
+    size = len(await asyncio.to_thread(load_queue, language))
+    to_generate = QUEUE_SIZE - size
     if to_generate > 0:
         new_questions = await generate_questions_for_language(language, to_generate)
-        queue.extend(new_questions)
-        save_queue(language, queue)
-    return {"message": f"Queue for {language} filled to {QUEUE_SIZE} questions.", "current_size": len(queue)}
+        size = await asyncio.to_thread(extend_queue, language, new_questions)
+    return {"message": f"Queue for {language} filled to {QUEUE_SIZE} questions.", "current_size": size}
 
 @app.post("/next-question/")
 async def next_question(language: str = Query(...)):
     """Pop and return the next question for a language. Auto-refill if queue is low."""
-    queue = load_queue(language)
-    if not queue:
+    question, remaining = await asyncio.to_thread(pop_queue, language)
+    if question is None:
         # Auto-refill if empty
         queue = await generate_questions_for_language(language, QUEUE_SIZE)
-    question = queue.pop(0)
+        if not queue:
+            return None
+        question = queue.pop(0)
+        remaining = await asyncio.to_thread(extend_queue, language, queue)
     # Auto-refill if queue is now below half full
-    if len(queue) < QUEUE_SIZE // 2:
-        to_generate = QUEUE_SIZE - len(queue)
-        new_questions = await generate_questions_for_language(language, to_generate)
-        queue.extend(new_questions)
-    save_queue(language, queue)
+    await refill_queue(language, remaining)
     return question
 
 @app.post("/peek-next-question/")
 async def peek_next_question(language: str = Query(...)):
     """Return the next question for a language WITHOUT removing it from the queue. Auto-refill if empty."""
-    queue = load_queue(language)
-    if not queue:
-        queue = await generate_questions_for_language(language, QUEUE_SIZE)
-        save_queue(language, queue)
-    # Auto-refill if queue is now below half full
+    queue = await asyncio.to_thread(load_queue, language)
+    # Auto-refill if the queue is empty or below half full
     if len(queue) < QUEUE_SIZE // 2:
-        to_generate = QUEUE_SIZE - len(queue)
-        new_questions = await generate_questions_for_language(language, to_generate)
-        queue.extend(new_questions)
-    save_queue(language, queue)
+        await refill_queue(language, len(queue))
+        queue = await asyncio.to_thread(load_queue, language)
     return queue[0] if queue else None
 
 @app.post("/pop-next-question/")
 async def pop_next_question(language: str = Query(...)):
     """Pop and return the next question for a language. Auto-refill if queue is low."""
-    queue = load_queue(language)
-    if not queue:
+    question, remaining = await asyncio.to_thread(pop_queue, language)
+    if question is None:
         queue = await generate_questions_for_language(language, QUEUE_SIZE)
-    if not queue:
-        save_queue(language, queue)
-        return None
-    question = queue.pop(0)
+        if not queue:
+            return None
+        question = queue.pop(0)
+        remaining = await asyncio.to_thread(extend_queue, language, queue)
     # Auto-refill if queue is now below half full
-    if len(queue) < QUEUE_SIZE // 2:
-        to_generate = QUEUE_SIZE - len(queue)
-        new_questions = await generate_questions_for_language(language, to_generate)
-        queue.extend(new_questions)
-    save_queue(language, queue)
+    await refill_queue(language, remaining)
     return question
 
 @app.post("/generate-daily-challenges-llama/")
@@ -1186,7 +1483,7 @@ async def generate_daily_challenges_llama(payload: dict = Body(...)):
     """Generate daily challenges using DeepSeek."""
     try:
         prompt = payload.get("prompt", "Generate a daily coding challenge.")
-        async with httpx.AsyncClient(timeout=60.0) as client:
+        async with deepseek_client(timeout=60.0) as client:
             headers = {
                 "Authorization": f"Bearer {settings.deepseek_api_key}",
                 "Content-Type": "application/json"
@@ -1222,15 +1519,18 @@ DSA_QUESTIONS = [
 ]
 STATE_FILE = os.path.join(os.path.dirname(__file__), 'daily_challenge_state.json')
 
-def load_daily_state():
-    if os.path.exists(STATE_FILE):
-        with open(STATE_FILE, 'r') as f:
-            return json.load(f)
-    return {"last_index": -1, "last_time": None}
+def daily_state_store() -> JsonStore:
+    # Built on each call so tests and benchmarks can repoint STATE_FILE.
+    return JsonStore(STATE_FILE, default=lambda: {"last_index": -1, "last_time": None}, indent=None)
+
+@observe_time(JSON_STORE_SECONDS, store="daily_state", op="read")
+def load_daily_state(with_version: bool = False):
+    state, version = daily_state_store().load_versioned()
+    return (state, version) if with_version else state
 
-def save_daily_state(state):
-    with open(STATE_FILE, 'w') as f:
-        json.dump(state, f)
+@observe_time(JSON_STORE_SECONDS, store="daily_state", op="write")
+def save_daily_state(state, expected_version=...):
+    return daily_state_store().save(state, expected_version)
 
 def get_dsa_prompt():
     return (
@@ -1242,7 +1542,7 @@ def get_dsa_prompt():
 
 async def generate_dsa_question():
     prompt = get_dsa_prompt()
-    async with httpx.AsyncClient(timeout=30.0) as client:
+    async with deepseek_client(timeout=30.0) as client:
         response = await client.post(
             f"{settings.deepseek_url}/v1/chat/completions",
             json={
@@ -1277,7 +1577,7 @@ async def generate_dsa_question_with_difficulty(difficulty):
         f"Difficulty: {difficulty}. "
         f"Respond with a single line of valid JSON: {{\"question\": \"...\", \"difficulty\": \"...\"}}"
     )
-    async with httpx.AsyncClient(timeout=30.0) as client:
+    async with deepseek_client(timeout=30.0) as client:
         response = await client.post(
             settings.deepseek_url,
             headers={
@@ -1307,12 +1607,14 @@ async def generate_dsa_question_with_difficulty(difficulty):
                 challenge = result_json
         except Exception:
             challenge = {}
-        print("DeepSeek RAW RESPONSE:", challenge)
+        logger.debug(f"DeepSeek daily challenge: {challenge}")
         if not (isinstance(challenge, dict) and "question" in challenge and "difficulty" in challenge):
             challenge = {"question": "Write a function to reverse a linked list.", "difficulty": difficulty}
         return challenge
 
 DIFFICULTY_CYCLE = ["intermediate", "advanced"]
+# Daily challenge candidates generated concurrently; the first that isn't a near-duplicate is used.
+DAILY_CANDIDATES = 3
 
 def get_next_difficulty(state):
     last_difficulty_index = state.get("last_difficulty_index", -1)
@@ -1322,7 +1624,7 @@ def get_next_difficulty(state):
 
 @app.post("/techclub/daily-challenge/")
 async def techclub_daily_challenge():
-    state = load_daily_state()
+    state, version = await asyncio.to_thread(load_daily_state, with_version=True)
     now = datetime.utcnow()
     last_time = (
         datetime.fromisoformat(state["last_time"]) if state.get("last_time") else None
@@ -1331,21 +1633,25 @@ async def techclub_daily_challenge():
     used_questions = state.get("used_questions", [])
     if not last_time or (now - last_time) > timedelta(hours=24) or not last_challenge:
         difficulty = get_next_difficulty(state)
-        challenge = await generate_dsa_question_with_difficulty(difficulty)
-        question_text = challenge["question"]
-        if question_text in used_questions:
-            for _ in range(5):
-                challenge = await generate_dsa_question_with_difficulty(difficulty)
-                question_text = challenge["question"]
-                if question_text not in used_questions:
-                    break
-        used_questions.append(question_text)
+        candidates = await asyncio.gather(
+            *(generate_dsa_question_with_difficulty(difficulty) for _ in range(DAILY_CANDIDATES)),
+            return_exceptions=True)
+        challenges = [c for c in candidates if not isinstance(c, BaseException)]
+        if not challenges:
+            raise candidates[0]
+        fresh = await fresh_questions(challenges, limit=1)
+        challenge = fresh[0] if fresh else challenges[0]
+        used_questions.append(challenge["question"])
         if len(used_questions) >= 30:
             used_questions = []
         state["used_questions"] = used_questions
         state["last_challenge"] = challenge
         state["last_time"] = now.isoformat()
-        save_daily_state(state)
+        try:
+            await asyncio.to_thread(save_daily_state, state, expected_version=version)
+        except ConflictError:
+            # Another worker rotated the challenge while we were generating; serve theirs.
+            challenge = (await asyncio.to_thread(load_daily_state)).get("last_challenge") or challenge
     else:
         challenge = state["last_challenge"]
     return {"challenge": challenge}
@@ -1358,7 +1664,7 @@ async def techclub_pvp_arena_question(payload: dict = Body(...)):
     try:
         if prompt:
             model_prompt = f"Generate a coding challenge for a PVP arena match. Title: {prompt}. Description: {description or ''}. Problem: {problem or ''}. The challenge should be suitable for a timed coding battle. Respond as a JSON object with fields: question, starterCode, expectedOutput, timeLimit, difficulty, xpReward."
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with deepseek_client(timeout=30.0) as client:
                 response = await client.post(
                     settings.deepseek_url,
                     headers={
@@ -1389,6 +1695,75 @@ async def techclub_pvp_arena_question(payload: dict = Body(...)):
     except Exception as e:
         return {"question": get_fallback_challenge("python", "code")}
 
+# --- XP Leaderboard ---
+RANKINGS_DB = Path(os.getenv("RANKINGS_DB", "rankings.db"))
+leaderboard = Leaderboard(RANKINGS_DB)
+
+class XPIncrement(BaseModel):
+    user_id: str
+    amount: int
+
+class XPIncrementsRequest(BaseModel):
+    increments: List[XPIncrement]
+
+# Plain ``def`` endpoints: sqlite calls run in the threadpool, not on the event loop.
+@app.get("/leaderboard/")
+def get_leaderboard(limit: int = Query(10, ge=1, le=1000)):
+    return {"leaderboard": leaderboard.top(limit)}
+
+@app.get("/leaderboard/rank/{user_id}")
+def get_leaderboard_rank(user_id: str):
+    rank = leaderboard.rank(user_id)
+    if rank is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return rank
+
+@app.get("/leaderboard/around/{user_id}")
+def get_leaderboard_around(user_id: str, radius: int = Query(5, ge=0, le=100)):
+    """The user's position with ``radius`` neighbours above and below, e.g. for a live arena panel."""
+    entries = leaderboard.around(user_id, radius)
+    if entries is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return {"user_id": user_id, "leaderboard": entries}
+
+@app.post("/leaderboard/xp/")
+def add_leaderboard_xp(req: XPIncrementsRequest):
+    """Applies a batch of XP increments in a single transaction."""
+    updated = leaderboard.add_xp_many((inc.user_id, inc.amount) for inc in req.increments)
+    return {"updated": list(updated.values())}
+
+# --- Per-challenge progress (replaces user_progress.progress_json) ---
+challenge_progress = ChallengeProgress(RANKINGS_DB)
+
+class ProgressUpdate(BaseModel):
+    user_id: str
+    challenge_id: str
+    language: Optional[str] = None
+    status: Optional[str] = None  # "started" or "completed"
+    score: Optional[int] = None
+    attempts: int = 0
+
+class ProgressUpdatesRequest(BaseModel):
+    updates: List[ProgressUpdate]
+
+@app.post("/progress/")
+def update_progress(req: ProgressUpdatesRequest):
+    """Partial updates to (user, challenge) rows, applied in one transaction."""
+    try:
+        count = challenge_progress.update_many(u.model_dump() for u in req.updates)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"updated": count}
+
+@app.get("/progress/{user_id}")
+def get_progress(user_id: str, language: Optional[str] = None):
+    return {"user_id": user_id, "progress": challenge_progress.for_user(user_id, language)}
+
+@app.get("/progress/{user_id}/completed")
+def get_completed_challenges(user_id: str, language: str = Query(...)):
+    return {"user_id": user_id, "language": language,
+            "completed_ids": challenge_progress.completed_ids(user_id, language)}
+
 # --- LMS Uploads Section ---
 LMS_UPLOAD_DIR = Path("lms_uploads")
 LMS_UPLOAD_DIR.mkdir(exist_ok=True)
@@ -1415,55 +1790,101 @@ async def lms_save_file(file: UploadFile, subdir: str = "") -> str:
         await out_file.write(content)
     return str(file_path)
 
+_lms_stores: Dict[Path, JsonStore] = {}
+
+def lms_store(path: Path) -> JsonStore:
+    """Shared JsonStore for an LMS file, so all handlers take the same lock."""
+    if path not in _lms_stores:
+        _lms_stores[path] = JsonStore(path)
+    return _lms_stores[path]
+
+@observe_time(JSON_STORE_SECONDS, store="lms_metadata", op="read")
 def lms_load_metadata(meta_file=LMS_METADATA_FILE):
-    if meta_file.exists():
-        with open(meta_file, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return []
+    return lms_store(meta_file).load()
 
+@observe_time(JSON_STORE_SECONDS, store="lms_metadata", op="write")
 def lms_save_metadata(metadata, meta_file=LMS_METADATA_FILE):
-    with open(meta_file, "w", encoding="utf-8") as f:
-        json.dump(metadata, f, indent=2)
+    lms_store(meta_file).save(metadata)
+
+@observe_time(JSON_STORE_SECONDS, store="lms_metadata", op="update")
+def lms_append_metadata(*entries, meta_file=LMS_METADATA_FILE):
+    lms_store(meta_file).append(*entries)
 
 # --- LMS Quiz/Assignment Storage ---
 LMS_QUIZ_FILE = LMS_UPLOAD_DIR / "quiz_metadata.json"
 
+@observe_time(JSON_STORE_SECONDS, store="lms_quizzes", op="read")
 def lms_load_quizzes():
-    if LMS_QUIZ_FILE.exists():
-        with open(LMS_QUIZ_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return []
+    return lms_store(LMS_QUIZ_FILE).load()
 
+@observe_time(JSON_STORE_SECONDS, store="lms_quizzes", op="write")
 def lms_save_quizzes(quizzes):
-    with open(LMS_QUIZ_FILE, "w", encoding="utf-8") as f:
-        json.dump(quizzes, f, indent=2)
+    lms_store(LMS_QUIZ_FILE).save(quizzes)
+
+@observe_time(JSON_STORE_SECONDS, store="lms_quizzes", op="update")
+def lms_append_quiz(quiz):
+    return lms_store(LMS_QUIZ_FILE).append(quiz)
 
 # --- LMS Quiz Assignment Storage ---
 LMS_ASSIGN_FILE = LMS_UPLOAD_DIR / "quiz_assignments.json"
 
+@observe_time(JSON_STORE_SECONDS, store="lms_assignments", op="read")
 def lms_load_assignments():
-    if LMS_ASSIGN_FILE.exists():
-        with open(LMS_ASSIGN_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return []
+    return lms_store(LMS_ASSIGN_FILE).load()
 
+@observe_time(JSON_STORE_SECONDS, store="lms_assignments", op="write")
 def lms_save_assignments(assignments):
-    with open(LMS_ASSIGN_FILE, "w", encoding="utf-8") as f:
-        json.dump(assignments, f, indent=2)
+    lms_store(LMS_ASSIGN_FILE).save(assignments)
+
+@observe_time(JSON_STORE_SECONDS, store="lms_assignments", op="update")
+def lms_append_assignment(assignment):
+    return lms_store(LMS_ASSIGN_FILE).append(assignment)
+
+@observe_time(JSON_STORE_SECONDS, store="lms_assignments", op="update")
+def lms_append_new_assignment(assignment):
+    """Appends an assignment unless its quiz is already assigned to the class; None if it was."""
+    def same(existing):
+        return existing.get("quiz_id") == assignment["quiz_id"] and existing.get("class_id") == assignment["class_id"]
+    return lms_store(LMS_ASSIGN_FILE).append_new(assignment, same)
 
+quiz_index = QuizAssignmentIndex(LMS_QUIZ_FILE, LMS_ASSIGN_FILE, lms_load_quizzes, lms_load_assignments)
+
+LMS_RESULTS_FILE = LMS_UPLOAD_DIR / "quiz_results.json"
+
+@observe_time(JSON_STORE_SECONDS, store="lms_quiz_results", op="read")
 def lms_load_quiz_results():
     """Load quiz results from JSON file."""
-    results_file = LMS_UPLOAD_DIR / "quiz_results.json"
-    if results_file.exists():
-        with open(results_file, "r") as f:
-            return json.load(f)
-    return []
+    return lms_store(LMS_RESULTS_FILE).load()
 
+@observe_time(JSON_STORE_SECONDS, store="lms_quiz_results", op="write")
 def lms_save_quiz_results(results):
     """Save quiz results to JSON file."""
-    results_file = LMS_UPLOAD_DIR / "quiz_results.json"
-    with open(results_file, "w") as f:
-        json.dump(results, f, indent=2)
+    lms_store(LMS_RESULTS_FILE).save(results)
+
+@observe_time(JSON_STORE_SECONDS, store="lms_quiz_results", op="update")
+def lms_append_quiz_result(result):
+    """Append one quiz result under the store lock."""
+    lms_store(LMS_RESULTS_FILE).append(result)
+
+# Running per-quiz / per-class aggregates, updated as results are saved.
+LMS_ANALYTICS_FILE = LMS_UPLOAD_DIR / "quiz_analytics.json"
+quiz_analytics = QuizAnalytics(LMS_ANALYTICS_FILE)
+
+def lms_quiz_questions(quiz_id):
+    return (quiz_index.get_quiz(quiz_id) or {}).get("questions")
+
+def lms_analytics_backlog():
+    return [(r, lms_quiz_questions(r.get("quizId") or r.get("quiz_id"))) for r in lms_load_quiz_results()]
+
+@observe_time(JSON_STORE_SECONDS, store="lms_quiz_analytics", op="update")
+def lms_save_and_record_quiz_result(result):
+    """Appends a result and folds it into the aggregates (built from all saved results the first time).
+
+    The append runs under the analytics lock, so a concurrent first build sees
+    the result either in its backlog or as a later update, never both.
+    """
+    quiz_analytics.record(result, lms_quiz_questions(result["quizId"]), backlog=lms_analytics_backlog,
+                          save=lms_append_quiz_result)
 
 @app.post("/lms/upload/")
 async def lms_upload_files(
@@ -1473,7 +1894,6 @@ async def lms_upload_files(
     description: str = Form("")
 ):
     """Teacher uploads notes/assignments for LMS."""
-    metadata = lms_load_metadata()
     uploaded = []
     for file in files:
         await lms_validate_file(file)
@@ -1498,15 +1918,14 @@ async def lms_upload_files(
             "uploaded_at": datetime.utcnow().isoformat(),
             "uuid": unique_id
         }
-        metadata.append(entry)
         uploaded.append(entry)
-    lms_save_metadata(metadata)
+    await asyncio.to_thread(lms_append_metadata, *uploaded)
     return {"uploaded": uploaded}
 
 @app.get("/lms/files/")
 async def lms_list_files():
     """List all LMS teacher-uploaded files."""
-    return lms_load_metadata()
+    return await asyncio.to_thread(lms_load_metadata)
 
 @app.get("/lms/public/notes/{filename}")
 async def serve_public_note(filename: str):
@@ -1530,8 +1949,6 @@ async def lms_upload_submission(
     notes: str = Form("")
 ):
     """Student uploads assignment submission for LMS."""
-    meta_file = LMS_SUBMISSIONS_METADATA_FILE
-    metadata = lms_load_metadata(meta_file)
     await lms_validate_file(file)
     # Generate unique filename
     unique_id = str(uuid.uuid4())
@@ -1554,14 +1971,13 @@ async def lms_upload_submission(
         "uploaded_at": datetime.utcnow().isoformat(),
         "uuid": unique_id
     }
-    metadata.append(entry)
-    lms_save_metadata(metadata, meta_file)
+    await asyncio.to_thread(lms_append_metadata, entry, meta_file=LMS_SUBMISSIONS_METADATA_FILE)
     return {"uploaded": entry}
 
 @app.get("/lms/submissions/")
 async def lms_list_submissions():
     """List all LMS student submissions."""
-    return lms_load_metadata(LMS_SUBMISSIONS_METADATA_FILE)
+    return await asyncio.to_thread(lms_load_metadata, LMS_SUBMISSIONS_METADATA_FILE)
 
 @app.get("/lms/download/notes/{filename}")
 async def download_lms_note(filename: str):
@@ -1579,6 +1995,24 @@ async def download_lms_submission(filename: str):
         raise HTTPException(status_code=404, detail="File not found.")
     return FileResponse(str(file_path), filename=filename)
 
+# The response parser depends on this format, so it goes in as instructions and is never dropped for budget.
+LMS_QUIZ_FORMAT = """Generate multiple choice questions in the following JSON format:
+[
+  {
+    "question": "What is the main purpose of LLMs?",
+    "options": [
+      "To process natural language",
+      "To generate images",
+      "To play games",
+      "To create music"
+    ],
+    "correct_answer": "To process natural language",
+    "explanation": "LLMs are designed to understand and generate human language."
+  }
+]
+
+Make sure each question has exactly 4 options and one correct_answer. Return only the JSON array."""
+
 class LMSAIQuizRequest(BaseModel):
     file_url: str
     instructions: str = "Generate a quiz from this file."
@@ -1588,6 +2022,19 @@ class LMSAIAssessmentRequest(BaseModel):
     student_answer: str
     instructions: str = "Grade this answer based on the file."
 
+async def lms_unique_questions(quiz: list, source_text: str) -> list:
+    """Drops repeats within a generated quiz, then indexes and banks the rest.
+
+    Unlike the student-facing generators, earlier questions are not filtered
+    out: a teacher may deliberately build a quiz that reuses them. Nor is the
+    quiz served from the bank, as its size is only given in free-text instructions.
+    """
+    unique = SimilarityIndex().filter_new(quiz, key=question_text)
+    await index_questions(unique)
+    dicts = [q for q in unique if isinstance(q, dict)]
+    await bank_generated("lms_quiz", dicts, len(dicts), source_hash=content_hash(source_text))
+    return unique
+
 @app.post("/lms/ai/generate-quiz/")
 async def lms_generate_quiz(payload: LMSAIQuizRequest):
     """Generate a quiz from a Supabase file using DeepSeek AI."""
@@ -1598,34 +2045,14 @@ async def lms_generate_quiz(payload: LMSAIQuizRequest):
             raise HTTPException(status_code=400, detail="Could not fetch file from Supabase Storage.")
         file_content = file_response.text
     
-    # Truncate file content if too large (DeepSeek has limits)
-    MAX_CONTENT_LENGTH = 8000  # characters
-    if len(file_content) > MAX_CONTENT_LENGTH:
-        file_content = file_content[:MAX_CONTENT_LENGTH] + "\n\n[Content truncated due to size limits]"
-        print(f"DEBUG: File content truncated from {len(file_response.text)} to {len(file_content)} characters")
-    
-    # Compose prompt for DeepSeek with specific MCQ format
-    prompt = f"""{payload.instructions}
-
-File Content:
-{file_content}
-
-Generate multiple choice questions in the following JSON format:
-[
-  {{
-    "question": "What is the main purpose of LLMs?",
-    "options": [
-      "To process natural language",
-      "To generate images",
-      "To play games",
-      "To create music"
-    ],
-    "correct_answer": "To process natural language",
-    "explanation": "LLMs are designed to understand and generate human language."
-  }}
-]
-
-Make sure each question has exactly 4 options and one correct_answer. Return only the JSON array."""
+    # Compose prompt for DeepSeek with specific MCQ format, trimming the file to the model's budget
+    prompt = (PromptBuilder(prompt_budget())
+              .instructions(f"{payload.instructions}\n\nFile Content:")
+              .passages([file_content])
+              .instructions(LMS_QUIZ_FORMAT)
+              .build(endpoint="lms_generate_quiz"))
+    if prompt.truncated:
+        logger.debug(f"File content truncated to fit {prompt.budget} prompt tokens")
     
     # Use DeepSeek logic (reuse existing)
     headers = {
@@ -1635,10 +2062,10 @@ Make sure each question has exactly 4 options and one correct_answer. Return onl
     deepseek_payload = {
         "model": settings.deepseek_model,
         "messages": [
-            {"role": "user", "content": prompt}
+            {"role": "user", "content": prompt.text}
         ]
     }
-    async with httpx.AsyncClient(timeout=120.0) as client:
+    async with deepseek_client(timeout=120.0) as client:
         response = await client.post(
             settings.deepseek_url,
             headers=headers,
@@ -1653,7 +2080,7 @@ Make sure each question has exactly 4 options and one correct_answer. Return onl
             elif response.status_code == 401:
                 error_detail = "API key authentication failed."
             
-            print(f"DEBUG: DeepSeek API error - Status: {response.status_code}, Detail: {error_detail}")
+            logger.error(f"DeepSeek API error - Status: {response.status_code}, Detail: {error_detail}")
             raise HTTPException(status_code=500, detail=error_detail)
         
         response_data = response.json()
@@ -1677,20 +2104,19 @@ Make sure each question has exactly 4 options and one correct_answer. Return onl
         import json
         try:
             quiz_json = json.loads(json_str)
-            print(f"DEBUG: Generated quiz JSON: {quiz_json}")
+            logger.debug(f"Generated quiz JSON with {len(quiz_json)} entries")
             # If it's an object with 'quiz', return that array, else return the object
             if isinstance(quiz_json, dict) and 'quiz' in quiz_json:
-                return {"quiz": quiz_json["quiz"]}
+                return {"quiz": await lms_unique_questions(quiz_json["quiz"], file_content)}
             elif isinstance(quiz_json, list):
-                return {"quiz": quiz_json}
+                return {"quiz": await lms_unique_questions(quiz_json, file_content)}
             else:
                 return {"quiz": [quiz_json]}
         except Exception as e:
-            print(f"DEBUG: JSON parsing error: {e}")
-            pass
+            logger.warning(f"Quiz JSON parsing error: {e}")
 
     # fallback: return an empty array
-    print(f"DEBUG: Using fallback empty quiz")
+    logger.warning("Using fallback empty quiz")
     return {"quiz": []}
 
 @app.post("/lms/ai/grade-submission/")
@@ -1716,7 +2142,7 @@ async def lms_grade_submission(payload: LMSAIAssessmentRequest):
             {"role": "user", "content": prompt}
         ]
     }
-    async with httpx.AsyncClient(timeout=120.0) as client:
+    async with deepseek_client(timeout=120.0) as client:
         response = await client.post(
             settings.deepseek_url,
             headers=headers,
@@ -1731,64 +2157,46 @@ async def lms_grade_submission(payload: LMSAIAssessmentRequest):
 @app.post("/lms/quiz/")
 async def lms_save_quiz(request: Request):
     data = await request.json()
-    print(f"DEBUG: Saving quiz data: {data}")
-    quizzes = lms_load_quizzes()
-    print(f"DEBUG: Current quizzes: {quizzes}")
     # Add a unique ID and timestamp
-    import uuid
     quiz_id = str(uuid.uuid4())
     data["id"] = quiz_id
     data["created_at"] = datetime.utcnow().isoformat()
-    print(f"DEBUG: Quiz ID generated: {quiz_id}")
-    quizzes.append(data)
-    lms_save_quizzes(quizzes)
-    print(f"DEBUG: Quiz saved successfully")
+    quiz_index.add_quiz(data, versions=await asyncio.to_thread(lms_append_quiz, data))
+    await index_questions(data.get("questions") or [])
+    logger.debug(f"Saved quiz {quiz_id}")
     return {"status": "success", "id": quiz_id}
 
 @app.get("/lms/quiz/")
 async def lms_list_quizzes():
-    return lms_load_quizzes()
+    return await asyncio.to_thread(quiz_index.quizzes)
 
 @app.post("/lms/quiz/assign/")
 async def lms_assign_quiz(request: Request):
     data = await request.json()
     quiz_id = data.get("quiz_id")
     class_id = data.get("class_id")
-    print(f"DEBUG: Assigning quiz {quiz_id} to class {class_id}")
     
     if not quiz_id or not class_id:
         raise HTTPException(status_code=400, detail="quiz_id and class_id are required")
     
-    assignments = lms_load_assignments()
-    print(f"DEBUG: Current assignments: {assignments}")
-    
-    # Prevent duplicate assignment
-    for a in assignments:
-        if a["quiz_id"] == quiz_id and a["class_id"] == class_id:
-            print(f"DEBUG: Quiz already assigned")
-            return {"status": "already_assigned"}
-    
     new_assignment = {
         "quiz_id": quiz_id,
         "class_id": class_id,
         "assigned_at": datetime.utcnow().isoformat()
     }
-    assignments.append(new_assignment)
-    print(f"DEBUG: Saving assignments: {assignments}")
-    lms_save_assignments(assignments)
+    # The duplicate check and the append happen under one store lock, so two workers can't both assign.
+    versions = await asyncio.to_thread(lms_append_new_assignment, new_assignment)
+    if versions is None:
+        logger.debug(f"Quiz {quiz_id} already assigned to class {class_id}")
+        return {"status": "already_assigned"}
+    quiz_index.add_assignment(new_assignment, versions=versions)
+    logger.debug(f"Assigned quiz {quiz_id} to class {class_id}")
     return {"status": "success"}
 
 @app.get("/lms/quiz/assigned/{class_id}")
 async def lms_list_assigned_quizzes(class_id: str):
-    print(f"DEBUG: Fetching assigned quizzes for class {class_id}")
-    assignments = lms_load_assignments()
-    quizzes = lms_load_quizzes()
-    print(f"DEBUG: All assignments: {assignments}")
-    print(f"DEBUG: All quizzes: {quizzes}")
-    assigned_quiz_ids = [a["quiz_id"] for a in assignments if a["class_id"] == class_id]
-    print(f"DEBUG: Assigned quiz IDs for class {class_id}: {assigned_quiz_ids}")
-    assigned_quizzes = [q for q in quizzes if q["id"] in assigned_quiz_ids]
-    print(f"DEBUG: Final assigned quizzes: {assigned_quizzes}")
+    assigned_quizzes = await asyncio.to_thread(quiz_index.quizzes_for_class, class_id)
+    logger.debug(f"Class {class_id} has {len(assigned_quizzes)} assigned quizzes")
     return assigned_quizzes
 
 @app.post("/lms/quiz/result/")
@@ -1806,11 +2214,12 @@ async def lms_save_quiz_result(request: Request):
     
     if not quiz_id or not student_id:
         raise HTTPException(status_code=400, detail="quizId and studentId are required")
-    
-    results = lms_load_quiz_results()
+    if as_number(score or 0) is None:
+        raise HTTPException(status_code=400, detail="score must be a number")
+    if time_taken and as_number(time_taken) is None:
+        raise HTTPException(status_code=400, detail="timeTaken must be a number of seconds")
     
     # Add unique ID and timestamp
-    import uuid
     result_id = str(uuid.uuid4())
     result_data = {
         "id": result_id,
@@ -1824,16 +2233,15 @@ async def lms_save_quiz_result(request: Request):
         "completedAt": completed_at
     }
     
-    results.append(result_data)
-    lms_save_quiz_results(results)
+    await asyncio.to_thread(lms_save_and_record_quiz_result, result_data)
     
-    print(f"DEBUG: Saved quiz result: {result_data}")
+    logger.debug(f"Saved quiz result {result_id} for quiz {quiz_id}")
     return {"status": "success", "id": result_id}
 
 @app.get("/lms/quiz/results/{quiz_id}")
 async def lms_get_quiz_results(quiz_id: str):
     """Get all results for a specific quiz."""
-    results = lms_load_quiz_results()
+    results = await asyncio.to_thread(lms_load_quiz_results)
     # Handle both quiz_id and quizId field names
     quiz_results = [r for r in results if r.get("quiz_id") == quiz_id or r.get("quizId") == quiz_id]
     
@@ -1855,11 +2263,23 @@ async def lms_get_quiz_results(quiz_id: str):
     
     return normalized_results
 
+@app.get("/lms/quiz/analytics/{quiz_id}")
+async def lms_get_quiz_analytics(quiz_id: str):
+    """Score statistics, per-question correct rates and time percentiles, from the running aggregates."""
+    await asyncio.to_thread(quiz_analytics.ensure_built, lms_analytics_backlog)
+    return {"quiz_id": quiz_id, **quiz_analytics.quiz_summary(quiz_id)}
+
+@app.get("/lms/class/analytics/{class_id}")
+async def lms_get_class_analytics(class_id: str):
+    """The same statistics over every quiz result saved for a class."""
+    await asyncio.to_thread(quiz_analytics.ensure_built, lms_analytics_backlog)
+    return {"class_id": class_id, **quiz_analytics.class_summary(class_id)}
+
 @app.get("/lms/quiz/student-results/{student_id}")
 async def lms_get_student_results(student_id: str):
     """Get all quiz results for a specific student"""
     try:
-        results = lms_load_quiz_results()
+        results = await asyncio.to_thread(lms_load_quiz_results)
         student_results = [r for r in results if r.get('studentId') == student_id]
         return student_results
     except Exception as e:
@@ -1870,7 +2290,7 @@ async def lms_get_student_results(student_id: str):
 async def get_quiz_results(studentId: str = Query(...), classId: str = Query(...)):
     """Get quiz results for a specific student in a specific class"""
     try:
-        results = lms_load_quiz_results()
+        results = await asyncio.to_thread(lms_load_quiz_results)
         filtered_results = [
             r for r in results 
             if r.get('studentId') == studentId and r.get('classId') == classId
@@ -1894,34 +2314,14 @@ async def lms_generate_quiz_from_file(
         content = await file.read()
         file_content = content.decode('utf-8', errors='ignore')
         
-        # Truncate file content if too large (DeepSeek has limits)
-        MAX_CONTENT_LENGTH = 8000  # characters
-        if len(file_content) > MAX_CONTENT_LENGTH:
-            file_content = file_content[:MAX_CONTENT_LENGTH] + "\n\n[Content truncated due to size limits]"
-            print(f"DEBUG: File content truncated from {len(content.decode('utf-8', errors='ignore'))} to {len(file_content)} characters")
-        
-        # Compose prompt for DeepSeek with specific MCQ format
-        prompt = f"""{instructions}
-
-File Content:
-{file_content}
-
-Generate multiple choice questions in the following JSON format:
-[
-  {{
-    "question": "What is the main purpose of LLMs?",
-    "options": [
-      "To process natural language",
-      "To generate images",
-      "To play games",
-      "To create music"
-    ],
-    "correct_answer": "To process natural language",
-    "explanation": "LLMs are designed to understand and generate human language."
-  }}
-]
-
-Make sure each question has exactly 4 options and one correct_answer. Return only the JSON array."""
+        # Compose prompt for DeepSeek with specific MCQ format, trimming the file to the model's budget
+        prompt = (PromptBuilder(prompt_budget())
+                  .instructions(f"{instructions}\n\nFile Content:")
+                  .passages([file_content])
+                  .instructions(LMS_QUIZ_FORMAT)
+                  .build(endpoint="lms_generate_quiz_from_file"))
+        if prompt.truncated:
+            logger.debug(f"File content truncated to fit {prompt.budget} prompt tokens")
         
         # Use DeepSeek logic
         headers = {
@@ -1931,11 +2331,11 @@ Make sure each question has exactly 4 options and one correct_answer. Return onl
         deepseek_payload = {
             "model": settings.deepseek_model,
             "messages": [
-                {"role": "user", "content": prompt}
+                {"role": "user", "content": prompt.text}
             ]
         }
         
-        async with httpx.AsyncClient(timeout=120.0) as client:
+        async with deepseek_client(timeout=120.0) as client:
             response = await client.post(
                 settings.deepseek_url,
                 headers=headers,
@@ -1950,7 +2350,7 @@ Make sure each question has exactly 4 options and one correct_answer. Return onl
                 elif response.status_code == 401:
                     error_detail = "API key authentication failed."
                 
-                print(f"DEBUG: DeepSeek API error - Status: {response.status_code}, Detail: {error_detail}")
+                logger.error(f"DeepSeek API error - Status: {response.status_code}, Detail: {error_detail}")
                 raise HTTPException(status_code=500, detail=error_detail)
             
             response_data = response.json()
@@ -1970,15 +2370,15 @@ Make sure each question has exactly 4 options and one correct_answer. Return onl
 
         try:
             quiz_data = json.loads(json_str)
-            print(f"DEBUG: Generated quiz with {len(quiz_data)} questions")
-            return {"quiz": quiz_data}
+            logger.debug(f"Generated quiz with {len(quiz_data)} questions")
+            return {"quiz": await lms_unique_questions(quiz_data, file_content) if isinstance(quiz_data, list) else quiz_data}
         except json.JSONDecodeError as e:
-            print(f"DEBUG: JSON parsing error: {e}")
-            print(f"DEBUG: Raw content: {content}")
+            logger.warning(f"Quiz JSON parsing error: {e}")
+            logger.debug(f"Raw content: {content[:500]}")
             raise HTTPException(status_code=500, detail="Failed to parse quiz JSON from AI response")
             
     except Exception as e:
-        print(f"DEBUG: Quiz generation error: {e}")
+        logger.error(f"Quiz generation error: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to generate quiz: {str(e)}")
 
 
@@ -1986,4 +2386,5 @@ Make sure each question has exactly 4 options and one correct_answer. Return onl
 
 
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,40 @@
+# tests/conftest.py
+import numpy as np
+import pytest
+
+from api import services
+from api.config import settings
+
+
+@pytest.fixture(autouse=True)
+def dataset_cache_dir(tmp_path, monkeypatch):
+    # Parsed-CSV caches go to the test's own directory, never the working tree; job
+    # and pool processes inherit the environment.
+    path = str(tmp_path / "dataset_cache")
+    monkeypatch.setenv("DATASET_CACHE_DIR", path)
+    return path
+
+
+@pytest.fixture(autouse=True)
+def registry_dir(tmp_path, monkeypatch):
+    # Job processes read the registry location from the environment when they start.
+    path = str(tmp_path / "registry")
+    monkeypatch.setenv("MODEL_REGISTRY_DIR", path)
+    monkeypatch.setattr(settings, "MODEL_REGISTRY_DIR", path)
+    monkeypatch.setattr(services, "_registry", None)
+    return path
+
+
+@pytest.fixture
+def write_dataset():
+    """Writes a small, learnable pass/fail CSV and returns its path."""
+    def write(path, rows=400, seed=0):
+        rng = np.random.default_rng(seed)
+        X = rng.uniform(-1, 1, size=(rows, 3))
+        labels = np.where(X[:, 0] + 0.5 * X[:, 1] > 0, "pass", "fail")
+        with open(path, "w") as f:
+            f.write("hours,attempts,noise,outcome\n")
+            for x, label in zip(X, labels):
+                f.write(f"{x[0]:.4f},{x[1]:.4f},{x[2]:.4f},{label}\n")
+        return str(path)
+    return write
@@ -0,0 +1,53 @@
+# tests/test_answer_check.py
+import pytest
+
+from utils.answer_check import _compile, check_answer, check_answers, get_normalizer
+
+
+def test_plain_text_answers_ignore_case_and_padding():
+    assert check_answer("  Read Thoroughly ", "read thoroughly")
+    assert not check_answer("Skim", "read thoroughly")
+    # Without a code language, comment markers are just text.
+    assert not check_answer("x = 1  # set x", "x = 1")
+
+
+def test_code_answers_drop_comments_and_semicolons():
+    assert check_answer("x = 1  # set x", "x = 1", language="python")
+    assert check_answer("let a = 2; // two", "let a = 2", language="js")
+    assert check_answer("int a = /* note */ 1;", "int a =  1", language="c++")
+
+
+def test_comment_markers_inside_strings_are_kept():
+    assert not check_answer('print("#wrong")', 'print("#right")', language="python")
+    assert check_answer('print("#x")  # note', 'print("#x")', language="python")
+    assert not check_answer('"http://a.com"', '"http://b.org"', language="js", compare="tokens")
+    assert not check_answer("s = 'a;b'", "s = 'ab'", language="python")
+
+
+def test_token_comparison_ignores_spacing_outside_strings():
+    assert not check_answer("print( 'hi' )", "print('hi')", language="python")
+    assert check_answer("print( 'hi' )", "print('hi')", language="python", compare="tokens")
+    assert not check_answer("print('h i')", "print('hi')", language="python", compare="tokens")
+    with pytest.raises(ValueError):
+        check_answer("a", "a", compare="fuzzy")
+
+
+def test_normalisers_are_compiled_once_per_language():
+    assert get_normalizer("JS") is get_normalizer("javascript")
+    assert get_normalizer(None).is_code is False
+    before = _compile.cache_info().currsize
+    for i in range(100):
+        assert get_normalizer(f"made-up-{i}") is get_normalizer(None)
+    assert _compile.cache_info().currsize <= before + 1
+
+
+def test_batch_grades_every_item_with_overrides():
+    items = [
+        {"question": "q1", "userAnswer": "Paris", "correctAnswer": "paris"},
+        {"question": "q2", "userAnswer": "x=1", "correctAnswer": "x = 1", "compare": "tokens"},
+        {"question": "q3", "userAnswer": "return 1 # done", "correctAnswer": "return 2"},
+    ]
+    result = check_answers(items, language="python")
+    assert [r["isCorrect"] for r in result["results"]] == [True, True, False]
+    assert result["correct"] == 2 and result["total"] == 3
+    assert result["score"] == pytest.approx(2 / 3)
@@ -1,7 +1,7 @@
 # tests/test_api.py
 import pytest
 from fastapi.testclient import TestClient
-from main.main import app
+from api.main import app
 
 client = TestClient(app)
 
@@ -10,11 +10,19 @@ def test_root():
     assert response.status_code == 200
     assert response.json() == {"message": "Welcome to AutoTrainerX API"}
 
-def test_train():
+def test_train(tmp_path, write_dataset):
     response = client.post("/train", json={
         "model_type": "Neural Network",
         "hyperparameters": {"lr": 0.01},
-        "dataset_path": "data.csv"
+        "dataset_path": write_dataset(tmp_path / "data.csv")
     })
     assert response.status_code == 200
-    assert "success" in response.json()["status"]
\ No newline at end of file
+    assert "success" in response.json()["status"]
+
+def test_train_unknown_model(tmp_path, write_dataset):
+    response = client.post("/train", json={
+        "model_type": "Random Forest",
+        "hyperparameters": {},
+        "dataset_path": write_dataset(tmp_path / "data.csv")
+    })
+    assert response.status_code == 400
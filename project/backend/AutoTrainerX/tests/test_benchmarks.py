@@ -0,0 +1,48 @@
+# tests/test_benchmarks.py
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from benchmarks.harness import compare, percentile, summarize
+from benchmarks.mock_deepseek import MockConfig, create_app
+
+PAYLOAD = {"model": "deepseek-chat", "messages": [{"role": "user", "content": "Generate 4 questions. Respond ONLY as a JSON array."}]}
+
+
+def test_mock_returns_requested_items_with_usage():
+    client = TestClient(create_app(MockConfig(latency=0)))
+    body = client.post("/chat/completions", json=PAYLOAD).json()
+    content = body["choices"][0]["message"]["content"]
+    items = json.loads(content.strip("`").removeprefix("json"))
+    assert len(items) == 4
+    assert body["usage"]["total_tokens"] > 0
+
+
+def test_mock_rate_limits_and_malformed_bodies():
+    client = TestClient(create_app(MockConfig(latency=0, rate_limit_ratio=1.0)))
+    assert client.post("/v1/chat/completions", json=PAYLOAD).status_code == 429
+    client = TestClient(create_app(MockConfig(latency=0, malformed_ratio=1.0)))
+    response = client.post("/chat/completions", json=PAYLOAD)
+    assert response.status_code == 200
+    with pytest.raises(ValueError):
+        response.json()
+
+
+def test_mock_streams_sse_chunks():
+    client = TestClient(create_app(MockConfig(latency=0, stream_chunk_delay=0)))
+    response = client.post("/chat/completions", json={**PAYLOAD, "stream": True})
+    events = [line[6:] for line in response.text.splitlines() if line.startswith("data: ")]
+    assert events[-1] == "[DONE]"
+    content = "".join(json.loads(e)["choices"][0]["delta"].get("content", "") for e in events[:-1])
+    assert "Mock question" in content
+
+
+def test_percentiles_and_regression_check():
+    values = sorted(i / 1000 for i in range(1, 101))
+    assert percentile(values, 50) == 0.05
+    assert percentile(values, 99) == 0.099
+    result = summarize("scenario", values, errors=0, elapsed=1.0, concurrency=4)
+    assert result["throughput_rps"] == 100
+    baseline = {"results": {"scenario": dict(result, p95_ms=result["p95_ms"] / 2)}}
+    assert compare([result], baseline, tolerance=0.2) == ["scenario: p95_ms 47.5 -> 95.0"]
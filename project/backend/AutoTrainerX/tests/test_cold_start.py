@@ -0,0 +1,29 @@
+# tests/test_cold_start.py
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from benchmarks.cold_start import BUDGET_FILE, import_profile
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_main_import_skips_heavy_modules(tmp_path):
+    code = (f"import sys; sys.path.insert(0, {str(ROOT)!r}); import main; "
+            "print('loaded:', [m for m in ('streamlit', 'pandas', 'PyPDF2', 'uvicorn') if m in sys.modules])")
+    env = dict(os.environ, DEEPSEEK_API_KEY="test-key")
+    out = subprocess.run([sys.executable, "-c", code], cwd=tmp_path, env=env, capture_output=True, text=True, check=True)
+    assert out.stdout.strip().splitlines()[-1] == "loaded: []"
+
+
+def test_import_profile_reports_main():
+    rows = import_profile(top=5)
+    assert rows[0]["module"] == "main"
+    assert rows[0]["cumulative_ms"] >= rows[-1]["cumulative_ms"]
+
+
+def test_budget_file_covers_measured_keys():
+    budget = json.loads(BUDGET_FILE.read_text(encoding="utf-8"))
+    assert {"import_ms", "first_request_ms", "process_ms"} <= set(budget)
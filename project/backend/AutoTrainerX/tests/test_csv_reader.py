@@ -0,0 +1,37 @@
+# tests/test_csv_reader.py
+from utils.csv_reader import infer_type, iter_csv_chunks, summarize_csv
+
+
+def write_csv(path, rows):
+    path.write_text("id,score,passed,name\n" + "".join(f"{r}\n" for r in rows), encoding="utf-8")
+    return path
+
+
+def test_infer_type():
+    assert [infer_type(v) for v in ["3", "3.5", "yes", "abc", " "]] == ["int", "float", "bool", "str", None]
+
+
+def test_chunks(tmp_path):
+    path = write_csv(tmp_path / "data.csv", [f"{i},{i}.5,true,n{i}" for i in range(25)])
+    assert [len(c) for c in iter_csv_chunks(path, chunk_size=10)] == [10, 10, 5]
+
+
+def test_summary_infers_types_and_bounds_the_sample(tmp_path):
+    rows = [f"{i},{i * 2},{'yes' if i % 2 else 'no'},student {i}" for i in range(1000)]
+    rows.append("1000,1.5,,")
+    path = write_csv(tmp_path / "data.csv", rows)
+    summary = summarize_csv(path, sample_size=5)
+    assert summary.row_count == 1001
+    assert len(summary.sample) == 5
+    types = {c.name: c.dtype for c in summary.columns}
+    assert types == {"id": "int", "score": "float", "passed": "bool", "name": "str"}
+    score = summary.columns[1]
+    assert (score.minimum, score.maximum) == (0, 1998)
+
+
+def test_render_drops_whole_rows_to_fit(tmp_path):
+    path = write_csv(tmp_path / "data.csv", [f"{i},{i},no,{'x' * 30}" for i in range(50)])
+    text = summarize_csv(path, sample_size=50).render(max_chars=400)
+    assert len(text) <= 400
+    assert text.startswith("CSV with 50 rows and 4 columns: id (int, 0..49)")
+    assert all(line.count(" | ") == 3 for line in text.splitlines()[2:])
@@ -0,0 +1,59 @@
+# tests/test_dataset_cache.py
+import numpy as np
+
+from core import dataset_cache
+from core.data import load_csv
+from core.dataset_cache import load_dataset
+
+
+def write_mixed(path, rows=300):
+    rng = np.random.default_rng(0)
+    with open(path, "w") as f:
+        f.write("score,city,code,label\n")
+        for i in range(rows):
+            score = "" if i % 7 == 0 else f"{rng.normal():.3f}"
+            # code looks numeric until late in the file, then turns categorical.
+            code = "x9" if i == rows - 1 else str(i % 5)
+            f.write(f"{score},{['oslo', 'lima', 'rome'][i % 3]},{code},{'yes' if i % 2 else 'no'}\n")
+    return str(path)
+
+
+def test_cache_matches_the_in_memory_parser(tmp_path):
+    path = write_mixed(tmp_path / "mixed.csv")
+    expected = load_csv(path)
+    cached = load_dataset(path, cache_dir=str(tmp_path / "cache"), chunk_rows=64)
+    assert cached.feature_names == expected.feature_names
+    assert cached.classes == expected.classes and cached.target == "label"
+    assert cached.categories == expected.categories
+    np.testing.assert_allclose(cached.X, expected.X, rtol=1e-5)
+    np.testing.assert_array_equal(cached.y, expected.y)
+
+
+def test_second_load_maps_the_cache_without_parsing(tmp_path, monkeypatch):
+    path = write_mixed(tmp_path / "mixed.csv")
+    cache_dir = str(tmp_path / "cache")
+    load_dataset(path, cache_dir=cache_dir)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("cache should have been reused")
+    monkeypatch.setattr(dataset_cache, "build_cache", fail)
+    data = load_dataset(path, cache_dir=cache_dir)
+    assert isinstance(data.X, np.memmap) and not data.X.flags.writeable
+    assert data.X.flags.f_contiguous  # each column is one contiguous block
+
+    with open(path, "a") as f:
+        f.write("1.0,oslo,1,yes\n")
+    monkeypatch.undo()
+    assert len(load_dataset(path, cache_dir=cache_dir).y) == 301
+
+
+def test_least_recently_used_entries_are_evicted_past_the_quota(tmp_path, dataset_cache_dir):
+    paths = [write_mixed(tmp_path / f"mixed{i}.csv", rows=300 + i) for i in range(3)]
+    load_dataset(paths[0])
+    size = dataset_cache.usage()["bytes"]
+    load_dataset(paths[1], quota_bytes=size * 2.5)
+    load_dataset(paths[2], quota_bytes=size * 2.5)
+    assert dataset_cache.usage()["datasets"] == 2
+    assert not dataset_cache.cache_path(paths[0]).exists()
+    assert dataset_cache.cache_path(paths[2]).parent == tmp_path / "dataset_cache"
+    assert len(load_dataset(paths[0]).y) == 300  # rebuilt on the next load
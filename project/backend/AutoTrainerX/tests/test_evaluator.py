@@ -0,0 +1,56 @@
+# tests/test_evaluator.py
+import numpy as np
+import pytest
+
+from core.evaluator import (StreamingEvaluator, confusion_matrix, cross_validate, evaluate_model,
+                            metrics_from_confusion, roc_auc)
+
+
+def test_confusion_and_macro_metrics():
+    y_true = np.array([0, 0, 1, 1, 2, 2])
+    y_pred = np.array([0, 1, 1, 1, 2, 0])
+    cm = confusion_matrix(y_true, y_pred, 3)
+    assert cm.tolist() == [[1, 1, 0], [0, 2, 0], [1, 0, 1]]
+    metrics = metrics_from_confusion(cm, ["a", "b", "c"])
+    assert metrics["accuracy"] == pytest.approx(4 / 6)
+    assert metrics["per_class"]["b"] == {"precision": pytest.approx(2 / 3), "recall": 1.0, "f1": pytest.approx(0.8),
+                                         "support": 2}
+    assert metrics["recall_macro"] == pytest.approx((0.5 + 1 + 0.5) / 3)
+
+
+def test_roc_auc_matches_pairwise_count_and_streaming_histogram():
+    rng = np.random.default_rng(0)
+    y = rng.integers(0, 2, 3000)
+    scores = np.clip(rng.normal(0.4 + 0.2 * y, 0.15), 0, 1)
+    pos, neg = scores[y == 1], scores[y == 0]
+    pairwise = ((pos[:, None] > neg[None, :]).sum() + 0.5 * (pos[:, None] == neg[None, :]).sum()) / (len(pos) * len(neg))
+    assert roc_auc(y, scores) == pytest.approx(pairwise)
+
+    evaluator = StreamingEvaluator(2)
+    proba = np.column_stack([1 - scores, scores])
+    for start in range(0, len(y), 500):
+        part = slice(start, start + 500)
+        evaluator.update(y[part], proba[part].argmax(axis=1), proba[part])
+    assert evaluator.roc_auc() == pytest.approx(pairwise, abs=1e-3)
+    assert evaluator.result()["rows"] == len(y)
+
+
+def test_streamed_test_file_matches_in_memory_evaluation(tmp_path, write_dataset):
+    train = write_dataset(tmp_path / "train.csv")
+    test = write_dataset(tmp_path / "test.csv", rows=1000, seed=5)
+    streamed = evaluate_model("Decision Tree", train, {"max_depth": 4}, test_path=test, chunk_rows=64)
+    whole = evaluate_model("Decision Tree", train, {"max_depth": 4}, test_path=test)
+    assert streamed["rows"] == 1000
+    assert streamed["confusion_matrix"] == whole["confusion_matrix"]
+    assert streamed["accuracy"] > 0.85 and streamed["roc_auc"] > 0.85
+    assert set(streamed["per_class"]) == {"fail", "pass"}
+
+
+def test_cross_validation_runs_every_fold(tmp_path, write_dataset):
+    dataset = write_dataset(tmp_path / "data.csv")
+    result = cross_validate("SVM", dataset, {"lr": 0.05}, folds=3, max_workers=2)
+    assert [f["fold"] for f in result["fold_metrics"]] == [0, 1, 2]
+    assert sum(f["rows"] for f in result["fold_metrics"]) == 400
+    assert result["accuracy"]["mean"] > 0.8
+    with pytest.raises(ValueError):
+        cross_validate("SVM", dataset, folds=1)
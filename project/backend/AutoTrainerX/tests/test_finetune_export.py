@@ -0,0 +1,112 @@
+# tests/test_finetune_export.py
+import json
+from dataclasses import asdict
+
+import pytest
+
+from utils import finetune_export
+from utils.dedup import NearDuplicateFilter
+from utils.finetune_export import ExportConfig, chunk_blocks, export
+
+
+def paragraph(topic, n=40):
+    return " ".join(f"{topic} sentence {i} explains part {i} of the {topic} lesson." for i in range(n))
+
+
+def make_corpus(root):
+    (root / "uploads").mkdir(parents=True)
+    (root / "lms_uploads" / "notes").mkdir(parents=True)
+    (root / "uploads" / "graphs.txt").write_text("\n\n".join(paragraph(f"graph{i}") for i in range(6)))
+    (root / "uploads" / "graphs_copy.txt").write_text("\n\n".join(paragraph(f"graph{i}") for i in range(6)))
+    (root / "uploads" / "marks.csv").write_text("student,score\n" + "".join(f"s{i},{i}\n" for i in range(120)))
+    (root / "lms_uploads" / "notes" / "trees.txt").write_text("\n\n".join(paragraph(f"tree{i}") for i in range(6)))
+    (root / "lms_uploads" / "quiz_metadata.json").write_text("[]")
+
+
+def read_records(out_dir, manifest):
+    names = [s["name"] for s in manifest["shards"]] + [manifest["open_shard"]["name"]]
+    return [json.loads(line) for name in names for line in (out_dir / name).read_text().splitlines()]
+
+
+def test_chunk_blocks_respects_target():
+    chunks = list(chunk_blocks(iter([paragraph("a"), paragraph("b", 400)]), target_tokens=200))
+    assert len(chunks) > 2
+    assert all(finetune_export.estimate_tokens(c) <= 200 for c in chunks)
+
+
+def test_near_duplicate_filter():
+    dedup = NearDuplicateFilter(capacity=1000)
+    assert dedup.add_if_new(paragraph("heap"))
+    assert not dedup.add_if_new(paragraph("heap").replace("sentence 3", "line 3"))
+    assert dedup.add_if_new(paragraph("trie"))
+
+
+def test_export_dedups_and_shards(tmp_path):
+    make_corpus(tmp_path)
+    config = ExportConfig(roots=[str(tmp_path / "uploads"), str(tmp_path / "lms_uploads")],
+                          target_tokens=300, shard_records=4, checkpoint_every=100, capacity=1000)
+    manifest = export(tmp_path / "out", config)
+    records = read_records(tmp_path / "out", manifest)
+    assert manifest["complete"]
+    assert manifest["stats"]["duplicates"] >= 6
+    assert len(records) == manifest["stats"]["records"]
+    assert all(len(r["messages"]) == 1 and r["messages"][0]["role"] == "user" for r in records)
+    assert all(s["records"] == 4 for s in manifest["shards"])
+
+
+def test_interrupted_export_resumes_to_same_output(tmp_path, monkeypatch):
+    make_corpus(tmp_path)
+    config = ExportConfig(roots=[str(tmp_path / "uploads"), str(tmp_path / "lms_uploads")],
+                          target_tokens=300, shard_records=4, checkpoint_every=3, capacity=1000)
+    expected = read_records(tmp_path / "full", export(tmp_path / "full", config))
+
+    original_write = finetune_export.ShardWriter.write
+    calls = {"n": 0}
+
+    def failing_write(self, record):
+        calls["n"] += 1
+        if calls["n"] == 9:
+            raise KeyboardInterrupt
+        original_write(self, record)
+
+    monkeypatch.setattr(finetune_export.ShardWriter, "write", failing_write)
+    with pytest.raises(KeyboardInterrupt):
+        export(tmp_path / "resumed", config)
+    monkeypatch.setattr(finetune_export.ShardWriter, "write", original_write)
+
+    manifest = export(tmp_path / "resumed")
+    assert read_records(tmp_path / "resumed", manifest) == expected
+
+
+def test_crash_between_filter_and_manifest_writes_resumes_cleanly(tmp_path, monkeypatch):
+    make_corpus(tmp_path)
+    config = ExportConfig(roots=[str(tmp_path / "uploads"), str(tmp_path / "lms_uploads")],
+                          target_tokens=300, shard_records=4, checkpoint_every=3, capacity=1000)
+    expected = read_records(tmp_path / "full", export(tmp_path / "full", config))
+
+    original_save = finetune_export.JsonStore.save
+    calls = {"n": 0}
+
+    def failing_save(self, data, expected_version=...):
+        calls["n"] += 1
+        if calls["n"] == 3:
+            raise KeyboardInterrupt  # the new filter file is already on disk
+        return original_save(self, data, expected_version)
+
+    monkeypatch.setattr(finetune_export.JsonStore, "save", failing_save)
+    with pytest.raises(KeyboardInterrupt):
+        export(tmp_path / "resumed", config)
+    monkeypatch.setattr(finetune_export.JsonStore, "save", original_save)
+
+    manifest = export(tmp_path / "resumed")
+    assert read_records(tmp_path / "resumed", manifest) == expected
+    assert sorted(p.name for p in (tmp_path / "resumed").glob("*.bloom")) == [manifest["bloom_file"]]
+
+
+def test_checkpoint_from_an_older_hasher_is_refused(tmp_path):
+    out = tmp_path / "out"
+    out.mkdir()
+    config = ExportConfig(roots=[str(tmp_path / "uploads")])
+    (out / finetune_export.MANIFEST).write_text(json.dumps({"config": asdict(config), "complete": False}))
+    with pytest.raises(ValueError, match="MinHash version 1"):
+        export(out, config)
@@ -0,0 +1,56 @@
+# tests/test_health.py
+import asyncio
+import time
+
+from utils.health import HealthProber
+
+
+async def ok():
+    return {"status": "ok"}
+
+
+async def failing():
+    raise ConnectionError("refused")
+
+
+async def hanging():
+    await asyncio.sleep(10)
+    return {"status": "ok"}
+
+
+def test_probe_records_results_errors_and_timeouts():
+    prober = HealthProber({"db": ok, "api": failing, "slow": hanging}, timeout=0.05, critical=("db",))
+    assert not prober.ready and prober.snapshot()["status"] == "starting"
+
+    start = time.perf_counter()
+    asyncio.run(prober.probe_once())
+    assert time.perf_counter() - start < 1.0
+    assert prober.results["db"]["status"] == "ok"
+    assert prober.results["api"] == {**prober.results["api"], "status": "error", "error": "refused"}
+    assert "timed out" in prober.results["slow"]["error"]
+    assert prober.ready  # only "db" is critical
+
+    prober.critical = ("db", "api")
+    assert not prober.ready and prober.snapshot()["status"] == "unavailable"
+
+
+def test_background_tasks_refresh_results_and_measure_loop_lag():
+    calls = []
+
+    async def counted():
+        calls.append(time.perf_counter())
+        return {"status": "ok"}
+
+    async def run():
+        prober = HealthProber({"db": counted}, interval=0.02, lag_interval=0.01, critical=("db",))
+        prober.start()
+        await asyncio.sleep(0.05)
+        time.sleep(0.1)  # block the loop so the lag probe wakes late
+        await asyncio.sleep(0.05)
+        await prober.stop()
+        return prober
+    prober = asyncio.run(run())
+    assert len(calls) >= 2 and prober.ready
+    snapshot = prober.snapshot()
+    assert snapshot["event_loop_lag"]["max_ms"] >= 50
+    assert snapshot["last_probe_age_s"] is not None
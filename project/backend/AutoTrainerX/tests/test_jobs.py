@@ -0,0 +1,60 @@
+# tests/test_jobs.py
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.jobs import JobManager, QueueFullError
+from api.main import app
+
+client = TestClient(app)
+
+
+def request(dataset, **hyperparameters):
+    return {"model_type": "Neural Network", "hyperparameters": hyperparameters, "dataset_path": dataset}
+
+
+def test_submit_stream_and_fetch_result(tmp_path, write_dataset):
+    dataset = write_dataset(tmp_path / "data.csv")
+    response = client.post("/train/jobs", json=request(dataset, epochs=5))
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+
+    with client.stream("GET", f"/train/jobs/{job_id}/events") as stream:
+        events = [json.loads(line[len("data: "):]) for line in stream.iter_lines() if line.startswith("data: ")]
+    assert events[-1]["status"] == "succeeded"
+    assert events[-1]["progress"]["step"] == 5
+
+    result = client.get(f"/train/jobs/{job_id}/result").json()
+    assert result["result"]["validation_accuracy"] > 0.8
+    assert client.get("/train/jobs/missing").status_code == 404
+
+
+def test_failed_job_reports_client_error(tmp_path):
+    response = client.post("/train", json=request(str(tmp_path / "missing.csv")))
+    assert response.status_code == 400
+
+
+def test_queue_is_bounded_and_cancel_frees_a_slot(tmp_path, write_dataset):
+    dataset = write_dataset(tmp_path / "data.csv")
+    manager = JobManager(max_concurrent=1, max_queued=1)
+    slow = manager.submit(request(dataset, epochs=100_000))
+    quick = manager.submit(request(dataset, epochs=2))
+    assert slow.status == "running" and manager.position(quick.id) == 0
+    with pytest.raises(QueueFullError):
+        manager.submit(request(dataset))
+
+    manager.cancel(slow.id)
+    assert slow.status == "cancelled"
+    assert manager.wait(quick.id, timeout=60).status == "succeeded"
+    manager.shutdown()
+
+
+def test_identical_request_is_served_from_the_registry(tmp_path, write_dataset):
+    payload = request(write_dataset(tmp_path / "data.csv"), epochs=3)
+    first = client.post("/train", json=payload).json()["details"]
+    second = client.post("/train", json=payload).json()["details"]
+    assert first["cached"] is False and second["cached"] is True
+    assert second["model_id"] == first["model_id"]
+    assert second["validation_accuracy"] == first["validation_accuracy"]
+    assert client.post("/train/jobs", json=payload).json()["status"] == "succeeded"
@@ -0,0 +1,96 @@
+# tests/test_leaderboard.py
+import random
+import sqlite3
+
+import pytest
+
+from utils.leaderboard import Leaderboard, level_for
+
+
+@pytest.fixture
+def board(tmp_path):
+    board = Leaderboard(tmp_path / "rankings.db")
+    yield board
+    board.close()
+
+
+def expected_order(xp):
+    return sorted(xp, key=lambda user: (-xp[user], user))
+
+
+def test_batched_increments_and_queries_match_a_full_sort(board):
+    rng = random.Random(0)
+    xp = {}
+    for _ in range(20):
+        batch = [(f"u{rng.randrange(300)}", rng.randrange(1, 500)) for _ in range(50)]
+        board.add_xp_many(batch)
+        for user, amount in batch:
+            xp[user] = xp.get(user, 0) + amount
+    order = expected_order(xp)
+
+    assert [e["user_id"] for e in board.top(25)] == order[:25]
+    for user in rng.sample(order, 20):
+        rank = board.rank(user)
+        assert rank["rank"] == order.index(user) + 1
+        assert rank["total_xp"] == xp[user] and rank["level"] == level_for(xp[user])
+        assert rank["total_users"] == len(order)
+    position = order.index(order[100])
+    assert [e["user_id"] for e in board.around(order[100], 3)] == order[position - 3:position + 4]
+    assert [e["user_id"] for e in board.around(order[0], 2)] == order[:3]
+    assert board.rank("nobody") is None and board.around("nobody") is None
+
+
+def test_increments_are_persisted_in_one_transaction(board, tmp_path):
+    updated = board.add_xp_many([("alice", 700), ("bob", 300), ("alice", 500)])
+    assert updated["alice"] == {"user_id": "alice", "total_xp": 1200, "level": 2}
+    conn = sqlite3.connect(tmp_path / "rankings.db")
+    rows = dict(conn.execute("SELECT user_id, total_xp FROM user_progress").fetchall())
+    indexes = [row[1] for row in conn.execute("PRAGMA index_list(user_progress)")]
+    conn.close()
+    assert rows == {"alice": 1200, "bob": 300}
+    assert "idx_user_progress_xp" in indexes
+
+
+def test_other_writers_are_synced_without_a_reload(board, tmp_path):
+    board.add_xp("alice", 100)
+    assert board.top(1)[0]["user_id"] == "alice"
+    reloads = board.reloads
+    board.top(1)
+    assert board.reloads == reloads
+
+    conn = sqlite3.connect(tmp_path / "rankings.db")
+    with conn:
+        conn.execute("INSERT INTO user_progress (user_id, total_xp) VALUES ('carol', 5000)")
+    conn.close()
+    syncs = board.syncs
+    assert board.top(1)[0]["user_id"] == "carol"
+    assert board.reloads == reloads and board.syncs == syncs + 1
+
+    other = Leaderboard(tmp_path / "rankings.db")
+    other.add_xp("alice", 10_000)
+    other.close()
+    assert board.rank("alice")["rank"] == 1 and board.rank("alice")["total_xp"] == 10_100
+
+    conn = sqlite3.connect(tmp_path / "rankings.db")
+    with conn:
+        conn.execute("DELETE FROM user_progress WHERE user_id = 'carol'")
+    conn.close()
+    assert board.rank("carol") is None and len(board) == 1
+    assert board.reloads == reloads
+
+
+def test_readers_behind_the_pruned_change_log_reload(board, tmp_path, monkeypatch):
+    monkeypatch.setattr("utils.leaderboard.KEEP_CHANGES", 2)
+    board.add_xp("alice", 100)
+    reloads = board.reloads
+    other = Leaderboard(tmp_path / "rankings.db")
+    for i in range(5):
+        other.add_xp(f"u{i}", 10 * i)
+    other.close()
+    assert [e["user_id"] for e in board.top(3)] == ["alice", "u4", "u3"]
+    assert board.reloads == reloads + 1
+
+
+def test_xp_never_goes_negative(board):
+    board.add_xp("alice", 50)
+    assert board.add_xp("alice", -80)["total_xp"] == 0
@@ -0,0 +1,110 @@
+# tests/test_learning_paths.py
+import asyncio
+import time
+
+import pytest
+
+from utils.learning_paths import LearningPathCache, _filename, assign_stable_ids, language_key
+
+STEPS = [{"id": "1", "title": "Hello World"}, {"id": "2", "title": "Variables & Types"},
+         {"id": "3", "title": "Loops"}]
+
+
+def counting_generator(steps=STEPS, delay=0.0):
+    calls = []
+
+    async def generate(language):
+        calls.append(language)
+        await asyncio.sleep(delay)
+        return [dict(s) for s in steps]
+    return generate, calls
+
+
+def test_stable_ids_come_from_titles():
+    ids = [s["id"] for s in assign_stable_ids("Python", STEPS + [{"title": "Loops"}])]
+    assert ids == ["python-hello-world", "python-variables-types", "python-loops", "python-loops-2"]
+    regenerated = assign_stable_ids("python", [{"id": "x", "title": "Loops"}, {"id": "y", "title": "Hello World"}])
+    assert [s["id"] for s in regenerated] == ["python-loops", "python-hello-world"]
+
+
+def test_regenerated_steps_keep_ids_when_titles_match_or_are_reworded():
+    first = assign_stable_ids("python", STEPS)
+    regenerated = assign_stable_ids("python", [{"id": "a", "title": "Loops"}, {"id": "b", "title": "Functions"},
+                                               {"id": "c", "title": "Variables and Data Types"}], first)
+    assert [s["id"] for s in regenerated] == ["python-loops", "python-functions", "python-variables-types"]
+    # Ids the generator gave the steps the first time stay recognisable as legacy ids.
+    assert [s["legacy_id"] for s in regenerated] == ["3", "b", "2"]
+
+
+def test_languages_with_symbols_do_not_share_keys():
+    assert [language_key(lang) for lang in ("C", "C++", "cpp", "C#")] == ["c", "cpp", "cpp", "csharp"]
+    assert len({_filename(lang) for lang in ("c", "c++", "c#", "objective c", "objective-c")}) == 5
+    assert _filename("Python") == "python.json"
+
+
+def test_concurrent_misses_share_one_generation_and_filter_per_student(tmp_path):
+    generate, calls = counting_generator(delay=0.05)
+    cache = LearningPathCache(tmp_path, generate)
+
+    async def run():
+        return await asyncio.gather(cache.path_for("python"),
+                                    cache.path_for("python", ["python-hello-world"]),
+                                    cache.path_for("Python", ["python-hello-world", "python-loops"]))
+    full, partial, last = asyncio.run(run())
+    assert calls == ["python"]
+    assert [s["id"] for s in full] == ["python-hello-world", "python-variables-types", "python-loops"]
+    assert [s["id"] for s in partial] == ["python-variables-types", "python-loops"]
+    assert [s["id"] for s in last] == ["python-variables-types"]
+
+    # A new cache instance (another worker, a restart) reads the stored path without generating.
+    reopened = LearningPathCache(tmp_path, generate)
+    assert len(asyncio.run(reopened.path_for("python"))) == 3
+    assert calls == ["python"]
+
+
+def test_unchanged_path_is_served_from_memory(tmp_path, monkeypatch):
+    generate, _ = counting_generator()
+    cache = LearningPathCache(tmp_path, generate)
+    asyncio.run(cache.steps("python"))
+    store = cache._store("python")
+    loads = []
+    original = store.load_versioned
+    monkeypatch.setattr(store, "load_versioned", lambda: loads.append(1) or original())
+    for _ in range(3):
+        asyncio.run(cache.steps("python"))
+    assert loads == []
+    store.update(lambda entry: entry["steps"].pop())
+    loads.clear()
+    assert len(asyncio.run(cache.steps("python"))) == 2 and loads == [1]
+
+
+def test_stale_path_is_served_while_refreshing_in_background(tmp_path):
+    generate, calls = counting_generator()
+    cache = LearningPathCache(tmp_path, generate, max_age=60)
+    asyncio.run(cache.steps("python"))
+    cache._store("python").update(lambda entry: entry.update(generated_at=time.time() - 120))
+
+    async def run():
+        first = await cache.steps("python")
+        again = await cache.steps("python")  # refresh already running: not started twice
+        await asyncio.sleep(0.01)
+        return first, again
+    first, again = asyncio.run(run())
+    assert len(first) == len(again) == 3
+    assert calls == ["python", "python"]
+    assert time.time() - asyncio.run(cache.cached("python"))["generated_at"] < 60
+
+
+def test_failed_generation_is_not_cached(tmp_path):
+    async def failing(language):
+        raise RuntimeError("down")
+    cache = LearningPathCache(tmp_path, failing)
+    with pytest.raises(RuntimeError):
+        asyncio.run(cache.steps("go"))
+    assert asyncio.run(cache.cached("go")) is None
+
+
+def test_legacy_completed_ids_still_filter_steps(tmp_path):
+    generate, _ = counting_generator()
+    cache = LearningPathCache(tmp_path, generate)
+    assert [s["title"] for s in asyncio.run(cache.path_for("python", ["1", "python-loops"]))] == ["Variables & Types"]
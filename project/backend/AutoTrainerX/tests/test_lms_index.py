@@ -0,0 +1,52 @@
+# tests/test_lms_index.py
+import json
+
+from utils.lms_index import QuizAssignmentIndex
+from utils.storage import JsonStore
+
+
+def make_index(tmp_path, quizzes, assignments):
+    quiz_file = tmp_path / "quiz_metadata.json"
+    assign_file = tmp_path / "quiz_assignments.json"
+    quiz_file.write_text(json.dumps(quizzes))
+    assign_file.write_text(json.dumps(assignments))
+    load = lambda path: (lambda: json.loads(path.read_text()))
+    return QuizAssignmentIndex(quiz_file, assign_file, load(quiz_file), load(assign_file)), quiz_file
+
+
+def test_quizzes_for_class_keeps_creation_order(tmp_path):
+    index, _ = make_index(
+        tmp_path,
+        [{"id": "q1"}, {"id": "q2"}, {"id": "q3"}],
+        [{"quiz_id": "q3", "class_id": "c1"}, {"quiz_id": "q1", "class_id": "c1"},
+         {"quiz_id": "q2", "class_id": "c2"}],
+    )
+    assert [q["id"] for q in index.quizzes_for_class("c1")] == ["q1", "q3"]
+    assert index.is_assigned("q2", "c2")
+    assert not index.is_assigned("q2", "c1")
+    assert index.quizzes_for_class("missing") == []
+
+
+def test_writes_update_index_without_reload(tmp_path):
+    index, quiz_file = make_index(tmp_path, [{"id": "q1"}], [])
+    quizzes, assignments = JsonStore(quiz_file), JsonStore(tmp_path / "quiz_assignments.json")
+    index.quizzes()
+    reloads = index.reloads
+    index.add_quiz({"id": "q2"}, quizzes.append({"id": "q2"}))
+    assignment = {"quiz_id": "q2", "class_id": "c1"}
+    index.add_assignment(assignment, assignments.append(assignment))
+    assert [q["id"] for q in index.quizzes_for_class("c1")] == ["q2"]
+    assert index.reloads == reloads
+
+    # An out-of-band edit is picked up on the next lookup.
+    quiz_file.write_text(json.dumps([{"id": "q1"}, {"id": "q2"}, {"id": "q9"}]))
+    assert index.get_quiz("q9") == {"id": "q9"}
+
+
+def test_write_after_another_workers_write_reloads(tmp_path):
+    index, quiz_file = make_index(tmp_path, [], [])
+    store = JsonStore(quiz_file)
+    index.quizzes()
+    store.append({"id": "from_B"})  # another worker; this index hasn't looked since
+    index.add_quiz({"id": "from_A"}, store.append({"id": "from_A"}))
+    assert [q["id"] for q in index.quizzes()] == ["from_B", "from_A"]
@@ -0,0 +1,40 @@
+# tests/test_logger.py
+import logging
+import os
+import queue
+import subprocess
+import sys
+from pathlib import Path
+
+from utils.logger import DebugRateLimitFilter, NonBlockingQueueHandler
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def make_record(level):
+    return logging.LogRecord("test", level, __file__, 1, "message", None, None)
+
+
+def test_debug_records_are_rate_limited():
+    limiter = DebugRateLimitFilter(rate=0.0, burst=3)
+    passed = [limiter.filter(make_record(logging.DEBUG)) for _ in range(10)]
+    assert passed.count(True) == 3
+    assert limiter.suppressed == 7
+    assert limiter.filter(make_record(logging.WARNING))
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=2))
+    for _ in range(5):
+        handler.handle(make_record(logging.INFO))
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+
+
+def test_log_files_go_to_the_configured_directory(tmp_path):
+    code = (f"import sys; sys.path.insert(0, {str(ROOT)!r}); import logging; import utils.logger; "
+            "logging.getLogger('test').warning('configured')")
+    env = dict(os.environ, LOG_DIR=str(tmp_path / "custom"))
+    subprocess.run([sys.executable, "-c", code], cwd=tmp_path, env=env, capture_output=True, check=True)
+    assert "configured" in (tmp_path / "custom" / "app.log").read_text()
+    assert not (tmp_path / "logs").exists()
@@ -0,0 +1,40 @@
+# tests/test_metrics.py
+import asyncio
+
+from utils.metrics import MetricsRegistry, observe_time
+
+
+def test_render_prometheus_text():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests.", ["route"])
+    latency = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    requests.labels(route="/files/").inc()
+    requests.labels(route="/files/").inc(2)
+    assert requests.values() == {("/files/",): 3.0}
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(5)
+    text = registry.render()
+    assert 'requests_total{route="/files/"} 3.0' in text
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="1.0"} 2' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in text
+    assert "latency_seconds_count 3" in text
+
+
+def test_observe_time_wraps_sync_and_async():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("store_seconds", "Store.", ["op"])
+
+    @observe_time(histogram, op="read")
+    def read():
+        return 1
+
+    @observe_time(histogram, op="write")
+    async def write():
+        return 2
+
+    assert read() == 1
+    assert asyncio.run(write()) == 2
+    assert histogram.labels(op="read").count == 1
+    assert histogram.labels(op="write").count == 1
@@ -0,0 +1,34 @@
+# tests/test_models.py
+import numpy as np
+import pytest
+
+from core.models import DecisionTree, LinearSVM, MLPClassifier
+
+
+def blobs(n=600, seed=0):
+    rng = np.random.default_rng(seed)
+    y = rng.integers(0, 3, n)
+    centers = np.array([[0, 0], [4, 0], [0, 4]], dtype=np.float32)
+    return (centers[y] + rng.standard_normal((n, 2))).astype(np.float32), y
+
+
+@pytest.mark.parametrize("factory", [
+    lambda: MLPClassifier(hidden_layers=(16,), epochs=15, seed=0),
+    lambda: LinearSVM(learning_rate=0.1, epochs=15),
+    lambda: DecisionTree(max_depth=4),
+])
+def test_fit_predict_and_state_round_trip(factory):
+    X, y = blobs()
+    model = factory().fit(X, y)
+    assert np.mean(model.predict(X) == y) > 0.9
+    restored = type(model).from_state(model.state_dict())
+    np.testing.assert_allclose(restored.predict_proba(X), model.predict_proba(X), rtol=1e-6)
+
+
+def test_tree_splits_on_informative_feature():
+    rng = np.random.default_rng(1)
+    X = rng.uniform(size=(2000, 3)).astype(np.float32)
+    y = (X[:, 1] > 0.5).astype(np.int64)
+    tree = DecisionTree(max_depth=1).fit(X, y)
+    assert tree.feature[0] == 1
+    assert abs(tree.threshold[0] - 0.5) < 0.05
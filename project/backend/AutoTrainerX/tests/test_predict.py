@@ -0,0 +1,79 @@
+# tests/test_predict.py
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api import predict, services
+from api.main import app
+from api.predict import MicroBatcher
+from core.registry import ModelRegistry, train_cached
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def model_id(tmp_path, monkeypatch, write_dataset):
+    registry = ModelRegistry(str(tmp_path / "registry"))
+    monkeypatch.setattr(services, "_registry", registry)
+    monkeypatch.setattr(predict, "_predictor", None)
+    return train_cached(registry, "Decision Tree", write_dataset(tmp_path / "data.csv"), {"max_depth": 4})["model_id"]
+
+
+def test_single_and_multi_row_prediction(model_id):
+    response = client.post("/predict", json={"model_id": model_id,
+                                             "features": {"hours": 0.9, "attempts": 0.8, "noise": 0.1}})
+    assert response.status_code == 200
+    assert response.json()["label"] == "pass"
+    assert response.json()["probabilities"]["pass"] > 0.5
+
+    rows = [{"hours": -0.9, "attempts": -0.8, "noise": 0}, {"hours": 0.7, "attempts": 0.2, "noise": 0}]
+    body = client.post("/predict", json={"model_id": model_id, "rows": rows}).json()
+    assert [p["label"] for p in body["predictions"]] == ["fail", "pass"]
+    assert client.post("/predict", json={"model_id": "nope", "features": {}}).status_code == 404
+
+
+def test_bulk_csv_and_jsonl_scoring_streams_every_row(model_id, tmp_path, write_dataset):
+    csv_path = write_dataset(tmp_path / "score.csv", rows=250, seed=3)
+    with open(csv_path, "rb") as f:
+        response = client.post(f"/predict/{model_id}/batch", files={"file": ("score.csv", f, "text/csv")})
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["row"] for line in lines] == list(range(250))
+
+    jsonl = "\n".join(json.dumps({"hours": h, "attempts": h, "noise": 0}) for h in (-0.5, 0.5)) + "\n"
+    response = client.post(f"/predict/{model_id}/batch",
+                           files={"file": ("rows.jsonl", jsonl.encode(), "application/json")})
+    assert [json.loads(line)["label"] for line in response.text.splitlines()] == ["fail", "pass"]
+
+
+def test_concurrent_rows_are_merged_into_batches():
+    sizes = []
+
+    def infer(key, rows):
+        sizes.append(len(rows))
+        return [row["x"] * 2 for row in rows]
+
+    batcher = MicroBatcher(infer, max_batch=8, max_wait=0.05)
+
+    async def run():
+        results = await asyncio.gather(*(batcher.submit("m", {"x": i}) for i in range(20)))
+        batcher.close()
+        return results
+
+    assert asyncio.run(run()) == [i * 2 for i in range(20)]
+    assert sizes == [8, 8, 4]
+
+
+def test_a_bad_row_fails_alone(model_id):
+    predictor = predict.get_predictor()
+
+    async def run():
+        return await asyncio.gather(predictor.predict_one(model_id, {"hours": "abc", "attempts": 0, "noise": 0}),
+                                    predictor.predict_one(model_id, {"hours": 0.9, "attempts": 0.8, "noise": 0.1}),
+                                    return_exceptions=True)
+
+    bad, good = asyncio.run(run())
+    assert isinstance(bad, ValueError)
+    assert good["label"] == "pass"
+    predictor.batcher.close()
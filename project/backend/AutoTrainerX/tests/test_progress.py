@@ -0,0 +1,82 @@
+# tests/test_progress.py
+import json
+import sqlite3
+
+import pytest
+
+from utils.progress import ChallengeProgress, blob_entries
+
+
+@pytest.fixture
+def db(tmp_path):
+    return tmp_path / "rankings.db"
+
+
+def legacy_db(path, blobs):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE user_progress (user_id TEXT PRIMARY KEY, total_xp INTEGER DEFAULT 0, "
+                 "level INTEGER DEFAULT 1, progress_json TEXT DEFAULT '{}')")
+    conn.executemany("INSERT INTO user_progress (user_id, progress_json) VALUES (?, ?)",
+                     [(user, json.dumps(blob)) for user, blob in blobs.items()])
+    conn.commit()
+    conn.close()
+
+
+def test_partial_updates_keep_completion_and_best_score(db):
+    progress = ChallengeProgress(db)
+    progress.update("alice", "py-1", language="Python", status="started", attempts=1, score=40)
+    progress.update("alice", "py-1", status="completed", attempts=1, score=90)
+    progress.update("alice", "py-1", status="started", attempts=1, score=60)
+    row, = progress.for_user("alice")
+    assert (row["language"], row["status"], row["attempts"], row["best_score"]) == ("python", "completed", 3, 90)
+    assert row["completed_at"] is not None
+
+    progress.update_many([{"user_id": "alice", "challenge_id": "py-2", "language": "python", "status": "completed"},
+                          {"user_id": "alice", "challenge_id": "js-1", "language": "javascript", "status": "completed"},
+                          {"user_id": "alice", "challenge_id": "py-3", "language": "python"},
+                          {"user_id": "bob", "challenge_id": "py-9", "language": "python", "status": "completed"}])
+    assert sorted(progress.completed_ids("alice", "PYTHON")) == ["py-1", "py-2"]
+    with pytest.raises(ValueError):
+        progress.update("alice", "py-1", status="done")
+    progress.close()
+
+
+def test_completed_ids_query_uses_the_covering_index(db):
+    progress = ChallengeProgress(db)
+    conn = sqlite3.connect(db)
+    plan = " ".join(row[-1] for row in conn.execute(
+        "EXPLAIN QUERY PLAN SELECT challenge_id FROM challenge_progress "
+        "WHERE user_id = ? AND language IN (?, '') AND status = 'completed'", ("alice", "python")))
+    conn.close()
+    progress.close()
+    assert "idx_challenge_progress_completed" in plan
+
+
+def test_blob_migration_runs_once(db):
+    legacy_db(db, {
+        "alice": {"python": {"completed": ["py-1", "py-2"]}, "react": ["react-hello-world"]},
+        "bob": {"completed_ids": ["x-1"], "py-7": {"completed": True, "language": "Python"}},
+        "carol": {},
+    })
+    progress = ChallengeProgress(db)
+    assert sorted(progress.completed_ids("alice", "python")) == ["py-1", "py-2"]
+    assert progress.completed_ids("alice", "react") == ["react-hello-world"]
+    assert sorted(progress.completed_ids("bob", "python")) == ["py-7", "x-1"]
+    progress.update("alice", "py-1", status="started", attempts=1)
+    assert progress.migrate() == 0
+    progress.close()
+    reopened = ChallengeProgress(db)
+    rows = {row["challenge_id"]: row for row in reopened.for_user("alice")}
+    reopened.close()
+    assert len(rows) == 3 and rows["py-1"]["attempts"] == 1
+
+
+def test_blob_entries_ignores_unparseable_blobs():
+    assert blob_entries("not json") == []
+    assert blob_entries(["a", None, ""]) == [("a", "")]
+
+
+def test_blob_entries_reads_completed_flags_of_any_type():
+    blob = {"c1": {"completed": True}, "c2": {"completed": 1}, "c3": {"completed": "true"},
+            "c4": {"completed": "false"}, "c5": {"completed": 0}, "c6": {"status": "completed"}}
+    assert sorted(i for i, _ in blob_entries(blob)) == ["c1", "c2", "c3", "c6"]
@@ -0,0 +1,48 @@
+# tests/test_prompt_builder.py
+from utils.metrics import PROMPT_TOKENS
+from utils.prompt_builder import TRUNCATION_MARKER, PromptBuilder, estimate_tokens, truncate_to_tokens
+
+
+def test_estimate_tokens_counts_word_pieces_and_punctuation():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("a cat, sat.") == 5
+    assert estimate_tokens("internationalization") == 5
+
+
+def test_truncate_to_tokens_cuts_on_piece_boundaries():
+    text = "one two three four five"
+    assert truncate_to_tokens(text, 4) == "one two three"
+    assert truncate_to_tokens(text, 3) == "one two"
+    assert truncate_to_tokens(text, 100) == text
+
+
+def test_small_content_is_kept_whole():
+    prompt = PromptBuilder(1000).instructions("Summarise:").passages(["short text"]).example("Format: JSON").build()
+    assert prompt.text == "Summarise:\n\nshort text\n\nFormat: JSON"
+    assert not prompt.truncated and prompt.dropped_examples == 0
+
+
+def test_passages_share_budget_and_stay_within_it():
+    long_text = " ".join(f"word{i}" for i in range(2000))
+    prompt = (PromptBuilder(300)
+              .instructions("Generate questions from:")
+              .passages(["tiny source", long_text, long_text])
+              .example("Example format: []")
+              .build())
+    assert prompt.tokens <= 300
+    assert prompt.truncated
+    assert "tiny source" in prompt.text
+    assert prompt.text.count(TRUNCATION_MARKER.strip()) == 2
+    assert prompt.text.endswith("Example format: []")
+
+
+def test_examples_dropped_before_instructions():
+    prompt = PromptBuilder(10).instructions("Do the task now please").example("x " * 50).build()
+    assert prompt.dropped_examples == 1
+    assert prompt.text == "Do the task now please"
+
+
+def test_build_records_prompt_tokens_per_endpoint():
+    before = PROMPT_TOKENS.labels(endpoint="unit_test").count
+    PromptBuilder(100).instructions("hello world").build(endpoint="unit_test")
+    assert PROMPT_TOKENS.labels(endpoint="unit_test").count == before + 1
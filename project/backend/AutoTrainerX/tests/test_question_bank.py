@@ -0,0 +1,93 @@
+# tests/test_question_bank.py
+import sqlite3
+
+import pytest
+
+from utils.metrics import QUESTION_BANK_HIT_RATIO
+from utils.question_bank import QuestionBank, content_hash
+
+
+@pytest.fixture
+def bank(tmp_path):
+    bank = QuestionBank(tmp_path / "question_bank.db")
+    yield bank
+    bank.close()
+
+
+def questions(prefix, n):
+    return [{"question": f"{prefix} question number {i}?", "options": ["a", "b", "c", "d"]} for i in range(n)]
+
+
+def test_add_is_idempotent_and_tags_are_case_insensitive(bank):
+    batch = questions("Python", 3)
+    assert bank.add(batch, "learning_queue", language="Python") == 3
+    assert bank.add([{"question": "PYTHON question number 0"}], "learning_queue", language="python") == 0
+    assert bank.add(batch, "arena_questions") == 3  # same text, different endpoint
+    found = bank.search("learning_queue", language="PYTHON")
+    assert [e["question"]["question"] for e in found] == [q["question"] for q in reversed(batch)]
+    assert found[0]["language"] == "python"
+
+
+def test_anonymous_callers_get_each_question_once(bank):
+    bank.add(questions("Go", 3), "learning_queue", language="go")
+    first = bank.take(2, "learning_queue", language="go")
+    second = bank.take(2, "learning_queue", language="go")
+    assert len(first) == 2 and len(second) == 1
+    assert not {q["question"] for q in first} & {q["question"] for q in second}
+    assert bank.take(1, "learning_queue", language="rust") == []
+
+
+def test_users_get_questions_they_have_not_seen(bank):
+    bank.add(questions("Exam", 4), "generate_questions", subject="Maths", exam="Finals")
+    alice = bank.take(3, "generate_questions", "alice", subject="maths", exam="finals")
+    assert len(alice) == 3
+    # Bob hasn't seen any; the least served come first.
+    bob = bank.take(2, "generate_questions", "bob", subject="maths", exam="finals")
+    assert bob[0]["question"] == "Exam question number 3?" and bob[1] == alice[0]
+    assert len(bank.take(3, "generate_questions", "alice", subject="maths", exam="finals")) == 1
+
+
+def test_generated_questions_marked_served_and_hit_ratio(bank):
+    origin = "test_hit_ratio"
+    generated = questions("Arena", 4)
+    bank.add(generated, origin, source_hash=content_hash("notes"))
+    bank.mark_served(generated[:2], origin, "carol")
+    bank.record_generated(origin, 2)
+    served = bank.take(4, origin)
+    assert [q["question"] for q in served] == [q["question"] for q in generated[2:]]
+    assert len(bank.take(4, origin, "carol")) == 2
+    stats = bank.stats()["origins"][origin]
+    assert stats["stored"] == 4 and stats["unserved"] == 0
+    assert stats["served_from_bank"] == 4 and stats["generated"] == 2
+    assert stats["hit_ratio"] == pytest.approx(4 / 6, abs=1e-3)
+    assert QUESTION_BANK_HIT_RATIO.function()[(origin,)] == pytest.approx(4 / 6)
+
+
+def test_lookups_use_the_tag_indexes(bank, tmp_path):
+    conn = sqlite3.connect(tmp_path / "question_bank.db")
+    plans = [" ".join(row[-1] for row in conn.execute("EXPLAIN QUERY PLAN " + query, params)) for query, params in (
+        ("SELECT id FROM questions WHERE origin = ? AND language = ? AND times_served = 0", ("q", "py")),
+        ("SELECT id FROM questions WHERE origin = ? AND subject = ? AND exam = ?", ("q", "s", "e")))]
+    conn.close()
+    assert "idx_questions_language" in plans[0]
+    assert "idx_questions_subject" in plans[1]
+
+
+def test_list_tags_match_any_value_and_old_banks_gain_new_tag_columns(tmp_path):
+    path = tmp_path / "old.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE questions (id INTEGER PRIMARY KEY, fingerprint TEXT NOT NULL UNIQUE, origin TEXT NOT NULL, "
+                 "language TEXT NOT NULL DEFAULT '', difficulty TEXT NOT NULL DEFAULT '', "
+                 "subject TEXT NOT NULL DEFAULT '', exam TEXT NOT NULL DEFAULT '', "
+                 "source_file TEXT NOT NULL DEFAULT '', source_hash TEXT NOT NULL DEFAULT '', payload TEXT NOT NULL, "
+                 "times_served INTEGER NOT NULL DEFAULT 0, created_at REAL NOT NULL)")
+    conn.close()
+    bank = QuestionBank(path)
+    bank.add(questions("A", 1), "arena", source_hash="file-a", prompt="p1")
+    bank.add(questions("B", 1), "arena", source_hash="file-b", prompt="p1")
+    bank.add(questions("C", 1), "arena", source_hash="file-a", prompt="p2")
+    assert bank.take(5, "arena", source_hash=[], prompt="p1") == []
+    served = bank.take(5, "arena", source_hash=["file-b", "deleted"], prompt="p1")
+    assert [q["question"] for q in served] == ["B question number 0?"]
+    assert len(bank.take(5, "arena", source_hash=["file-a", "file-b"], prompt="p1")) == 1
+    bank.close()
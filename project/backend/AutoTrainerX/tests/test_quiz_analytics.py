@@ -0,0 +1,64 @@
+# tests/test_quiz_analytics.py
+import statistics
+
+import pytest
+
+from utils.quiz_analytics import Aggregate, QuizAnalytics
+
+QUESTIONS = [{"question": "q1", "correct_answer": "a"}, {"question": "q2", "answer": "b"}]
+
+
+def result(score, quiz="quiz1", klass="class1", answers=("a", "b"), time_taken=60):
+    return {"quizId": quiz, "classId": klass, "score": score, "answers": list(answers), "timeTaken": time_taken}
+
+
+def test_welford_matches_batch_statistics():
+    scores = [55, 70, 90, 100, 35, 80]
+    aggregate = Aggregate()
+    for score in scores:
+        aggregate.add(score)
+    summary = aggregate.summary()
+    assert summary["mean"] == pytest.approx(statistics.mean(scores), abs=1e-3)
+    assert summary["variance"] == pytest.approx(statistics.pvariance(scores), abs=1e-3)
+    assert (summary["min"], summary["max"]) == (35, 100)
+    histogram = {b["range"]: b["count"] for b in summary["score_histogram"]}
+    assert histogram["90-100"] == 2 and histogram["30-39"] == 1
+
+
+def test_question_rates_and_time_percentiles():
+    aggregate = Aggregate()
+    for seconds in range(1, 101):
+        aggregate.add(50, seconds, answers=["a", "x"] if seconds % 2 else ["c", "b"], questions=QUESTIONS)
+    summary = aggregate.summary()
+    assert [q["correct_rate"] for q in summary["questions"]] == [0.5, 0.5]
+    p50 = summary["time_taken_percentiles"]["p50"]
+    assert 40 <= p50 <= 62
+
+
+def test_analytics_persist_and_build_from_backlog_once(tmp_path):
+    saved = [result(40), result(80, klass="class2")]
+    analytics = QuizAnalytics(tmp_path / "quiz_analytics.json")
+    new = result(100, answers=("a", "x"))
+    saved.append(new)
+    # The backlog already holds the new result, so it is counted exactly once.
+    analytics.record(new, QUESTIONS, backlog=lambda: [(r, QUESTIONS) for r in saved])
+    analytics.record(result(60, quiz="quiz2"), QUESTIONS, backlog=lambda: pytest.fail("already built"))
+
+    reloaded = QuizAnalytics(tmp_path / "quiz_analytics.json")
+    quiz = reloaded.quiz_summary("quiz1")
+    assert quiz["count"] == 3 and quiz["mean"] == pytest.approx(220 / 3, abs=1e-3)
+    assert quiz["questions"][1] == {"index": 1, "answered": 3, "correct": 2, "correct_rate": 0.667}
+    assert reloaded.class_summary("class1")["count"] == 3
+    assert reloaded.class_summary("class2")["count"] == 1
+    assert reloaded.quiz_summary("missing")["count"] == 0
+
+
+def test_unparseable_results_are_skipped_and_saves_run_under_the_lock(tmp_path):
+    saved = [result("80%"), result(50, time_taken="soon"), result(70)]
+    analytics = QuizAnalytics(tmp_path / "quiz_analytics.json")
+    new = result("90")
+    analytics.record(new, QUESTIONS, backlog=lambda: [(r, QUESTIONS) for r in saved], save=saved.append)
+    analytics.record(result(30), QUESTIONS, save=saved.append)
+    quiz = analytics.quiz_summary("quiz1")
+    assert quiz["count"] == 3 and quiz["mean"] == pytest.approx(190 / 3, abs=1e-3)
+    assert len(saved) == 5
@@ -0,0 +1,42 @@
+# tests/test_registry.py
+import numpy as np
+
+from core.registry import ModelRegistry, train_cached
+
+
+def test_put_and_load_round_trip(tmp_path, write_dataset):
+    registry = ModelRegistry(str(tmp_path / "registry"))
+    dataset = write_dataset(tmp_path / "data.csv")
+    result = train_cached(registry, "Neural Network", dataset, {"epochs": 5})
+    assert result["cached"] is False
+    again = train_cached(registry, "Neural Network", dataset, {"epochs": 5})
+    assert again["cached"] is True and again["model_id"] == result["model_id"]
+
+    trained = registry.load(result["model_id"])
+    assert not trained.model.weights[0].flags.writeable  # a read-only view of the mapped file
+    assert trained.schema.classes == ["fail", "pass"] and trained.schema.target == "outcome"
+    X = np.array([[0.9, 0.9, 0.0], [-0.9, -0.9, 0.0]], dtype=np.float32)
+    assert trained.predict(X).tolist() == [1, 0]
+
+
+def test_key_follows_dataset_content(tmp_path, write_dataset):
+    registry = ModelRegistry(str(tmp_path / "registry"))
+    a = write_dataset(tmp_path / "a.csv")
+    b = write_dataset(tmp_path / "b.csv")
+    c = write_dataset(tmp_path / "c.csv", seed=1)
+    assert registry.key_for("SVM", a, {}) == registry.key_for("SVM", b, {})
+    assert registry.key_for("SVM", a, {}) != registry.key_for("SVM", c, {})
+    assert registry.key_for("SVM", a, {}) != registry.key_for("SVM", a, {"lr": 0.1})
+
+
+def test_least_recently_used_model_is_evicted_over_quota(tmp_path, write_dataset):
+    registry = ModelRegistry(str(tmp_path / "registry"))
+    dataset = write_dataset(tmp_path / "data.csv")
+    first = train_cached(registry, "SVM", dataset, {"epochs": 1})["model_id"]
+    size = registry.usage()["bytes"]
+    registry.quota_bytes = int(size * 2.5)
+    second = train_cached(registry, "SVM", dataset, {"epochs": 2})["model_id"]
+    third = train_cached(registry, "SVM", dataset, {"epochs": 3})["model_id"]
+    assert registry.usage()["models"] == 2
+    assert registry.summary(first) is None
+    assert registry.summary(second) is not None and registry.summary(third) is not None
@@ -0,0 +1,64 @@
+# tests/test_search.py
+import pytest
+
+from core.search import HyperparameterSearch, expand_trials, run_search
+
+
+def test_expand_grid_and_random():
+    grid = expand_trials({"strategy": "grid", "space": {"lr": [0.01, 0.1], "epochs": [5, 10, 20]}})
+    assert len(grid) == 6 and {"lr": 0.1, "epochs": 20} in grid
+    spec = {"strategy": "random", "n_trials": 5, "seed": 3,
+            "space": {"l2": {"low": 1e-5, "high": 1e-2, "log": True}, "epochs": {"low": 5, "high": 30, "type": "int"}}}
+    trials = expand_trials(spec)
+    assert trials == expand_trials(spec)
+    assert all(1e-5 <= t["l2"] <= 1e-2 and isinstance(t["epochs"], int) for t in trials)
+    with pytest.raises(ValueError):
+        expand_trials({"strategy": "bayesian"})
+
+
+def test_grid_search_finds_best(tmp_path, write_dataset):
+    dataset = write_dataset(tmp_path / "data.csv")
+    spec = {"strategy": "grid", "space": {"max_depth": [1, 4]}}
+    result = run_search("Decision Tree", dataset, spec, max_workers=1, search_dir=str(tmp_path / "searches"))
+    assert result["trials"] == 2
+    assert result["best_params"]["max_depth"] == 4
+    assert result["validation_accuracy"] > 0.8
+
+
+def test_successive_halving_promotes_top_configs(tmp_path, write_dataset):
+    dataset = write_dataset(tmp_path / "data.csv")
+    spec = {"strategy": "successive_halving", "n_trials": 6, "eta": 3, "min_budget": 2, "max_budget": 18,
+            "space": {"lr": {"low": 0.001, "high": 0.5, "log": True}}}
+    search = HyperparameterSearch("SVM", dataset, spec, {"seed": 1}, max_workers=1,
+                                  search_dir=str(tmp_path / "searches"))
+    result = search.run()
+    rungs = [t["rung"] for t in search.store.load()["trials"]]
+    assert rungs.count(0) == 6 and rungs.count(1) == 2 and rungs.count(2) == 1
+    assert result["best_params"]["epochs"] == 18 and result["best_params"]["seed"] == 1
+
+
+def test_rerun_reuses_trial_table(tmp_path, write_dataset):
+    dataset = write_dataset(tmp_path / "data.csv")
+    spec = {"strategy": "random", "n_trials": 3, "space": {"max_depth": {"low": 1, "high": 6, "type": "int"}}}
+    kwargs = dict(max_workers=1, search_dir=str(tmp_path / "searches"))
+    first = run_search("Decision Tree", dataset, spec, **kwargs)
+    second = run_search("Decision Tree", dataset, spec, **kwargs)
+    assert second["search_id"] == first["search_id"]
+    assert second["trials"] == first["trials"] == 3
+    assert second["best_params"] == first["best_params"]
+
+    write_dataset(dataset, seed=7)  # same path, new content: the old trials don't apply
+    assert run_search("Decision Tree", dataset, spec, **kwargs)["search_id"] != first["search_id"]
+
+
+def test_bad_specs_are_rejected_before_any_trial_runs(tmp_path, write_dataset):
+    dataset = write_dataset(tmp_path / "data.csv")
+    kwargs = dict(max_workers=1, search_dir=str(tmp_path / "searches"))
+    halving = {"strategy": "successive_halving", "n_trials": 2, "space": {"lr": [0.01, 0.1]}}
+    with pytest.raises(ValueError, match="Unknown model type"):
+        run_search("Random Forest", dataset, halving, **kwargs)
+    with pytest.raises(ValueError, match="Unknown hyperparameter"):
+        run_search("Decision Tree", dataset, {"strategy": "grid", "space": {"depth_limit": [1, 2]}}, **kwargs)
+    with pytest.raises(ValueError, match="metric"):
+        run_search("Decision Tree", dataset, {"strategy": "grid", "metric": "f1", "space": {}}, **kwargs)
+    assert not (tmp_path / "searches").exists()
@@ -0,0 +1,78 @@
+# tests/test_similarity_index.py
+import random
+import threading
+import time
+
+from utils.dedup import MinHasher, SimilarityIndex, estimate_jaccard
+
+QUESTION = ("Given an array of integers, return the length of the longest strictly increasing "
+            "subsequence and explain the time complexity of your approach.")
+
+
+def test_minhash_estimates_jaccard_of_shingle_sets():
+    hasher = MinHasher(num_perm=256, shingle_size=2)
+    other = QUESTION.replace("integers", "numbers")
+    a, b = set(hasher.shingles(QUESTION)), set(hasher.shingles(other))
+    exact = len(a & b) / len(a | b)
+    assert abs(estimate_jaccard(hasher.signature(QUESTION), hasher.signature(other)) - exact) < 0.1
+
+
+def test_near_duplicates_are_caught_and_distinct_questions_kept():
+    index = SimilarityIndex()
+    assert index.add(QUESTION)
+    assert index.is_duplicate(QUESTION.upper().replace(",", ""))
+    assert index.query(QUESTION.replace("integers", "numbers")) == QUESTION
+    assert not index.is_duplicate("Implement Dijkstra's shortest path algorithm on a weighted directed graph "
+                                  "and return the distance to every vertex.")
+    assert not index.add(QUESTION + " ")
+    assert len(index) == 1
+
+
+def test_filter_new_drops_repeats_within_a_batch_and_respects_limit():
+    index = SimilarityIndex()
+    index.add(QUESTION)
+    batch = [{"question": QUESTION.replace("strictly ", "")},
+             {"question": "Reverse a singly linked list in place and return the new head node of the list."},
+             {"question": "Reverse a singly linked list in place and return the new head node of this list."},
+             {"question": "Check whether a binary tree is a valid binary search tree using an in-order walk."},
+             {"question": "Find all pairs in an array whose sum equals a given target value k."},
+             {"question": ""}]
+    fresh = index.filter_new(batch, key=lambda q: q["question"], limit=2)
+    assert [q["question"][:10] for q in fresh] == ["Reverse a ", "Check whet"]
+    assert len(index) == 3
+    assert index.filter_new([{"question": ""}], key=lambda q: q["question"]) == [{"question": ""}]
+
+
+def test_ensure_built_runs_once_and_lookups_are_fast():
+    index = SimilarityIndex()
+    rng = random.Random(0)
+    words = [f"w{i}" for i in range(5000)]
+    calls = []
+
+    def texts():
+        calls.append(1)
+        return [" ".join(rng.sample(words, 15)) for _ in range(2000)]
+    index.ensure_built(texts)
+    index.ensure_built(texts)
+    assert calls == [1] and len(index) == 2000
+
+    start = time.perf_counter()
+    for i in range(200):
+        index.is_duplicate(f"A completely new prompt about topic {i} with several extra words")
+    assert (time.perf_counter() - start) / 200 < 0.005
+
+
+def test_concurrent_callers_wait_for_the_build():
+    index = SimilarityIndex()
+    started = threading.Event()
+
+    def texts():
+        started.set()
+        time.sleep(0.05)
+        return [QUESTION]
+    builder = threading.Thread(target=index.ensure_built, args=(texts,))
+    builder.start()
+    started.wait()
+    index.ensure_built(lambda: [])
+    assert index.is_duplicate(QUESTION)
+    builder.join()
@@ -0,0 +1,75 @@
+# tests/test_storage.py
+import json
+import multiprocessing
+
+import pytest
+
+from utils.storage import ConflictError, JsonStore
+
+
+def _append_many(path, worker, count):
+    store = JsonStore(path)
+    for i in range(count):
+        store.append({"worker": worker, "i": i})
+
+
+def _assign_once(path, worker):
+    JsonStore(path).append_new({"class": "c1", "worker": worker}, lambda e: e["class"] == "c1")
+
+
+def test_missing_file_loads_default(tmp_path):
+    store = JsonStore(tmp_path / "state.json", default=lambda: {"last_index": -1})
+    assert store.load() == {"last_index": -1}
+    assert store.load_versioned()[1] is None
+
+
+def test_save_is_atomic_and_leaves_no_temp_files(tmp_path):
+    path = tmp_path / "queue.json"
+    store = JsonStore(path)
+    store.save([1, 2, 3])
+    assert json.loads(path.read_text()) == [1, 2, 3]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["queue.json", "queue.json.lock"]
+
+
+def test_update_returns_mutator_result(tmp_path):
+    store = JsonStore(tmp_path / "queue.json")
+    store.save(["a", "b"])
+    assert store.update(lambda q: q.pop(0)) == "a"
+    assert store.load() == ["b"]
+
+
+def test_stale_version_raises_conflict(tmp_path):
+    store = JsonStore(tmp_path / "state.json", default=dict)
+    _, version = store.load_versioned()
+    store.save({"winner": "other worker"}, expected_version=version)
+    with pytest.raises(ConflictError):
+        store.save({"winner": "me"}, expected_version=version)
+    assert store.load() == {"winner": "other worker"}
+
+
+def test_concurrent_processes_do_not_lose_appends(tmp_path):
+    path = tmp_path / "results.json"
+    ctx = multiprocessing.get_context("spawn")
+    workers = [ctx.Process(target=_append_many, args=(path, w, 25)) for w in range(4)]
+    for p in workers:
+        p.start()
+    for p in workers:
+        p.join(timeout=60)
+        assert p.exitcode == 0
+    assert len(JsonStore(path).load()) == 100
+
+
+def test_append_new_skips_duplicates_across_processes(tmp_path):
+    path = tmp_path / "assignments.json"
+    store = JsonStore(path)
+    before, after = store.append_new({"class": "c0"}, lambda e: e["class"] == "c0")
+    assert before is None and after == store.version
+    assert store.append_new({"class": "c0"}, lambda e: e["class"] == "c0") is None
+    ctx = multiprocessing.get_context("spawn")
+    workers = [ctx.Process(target=_assign_once, args=(path, w)) for w in range(4)]
+    for p in workers:
+        p.start()
+    for p in workers:
+        p.join(timeout=60)
+        assert p.exitcode == 0
+    assert [e["class"] for e in store.load()] == ["c0", "c1"]
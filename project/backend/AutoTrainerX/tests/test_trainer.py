@@ -1,6 +1,22 @@
 # tests/test_trainer.py
+import pytest
+
 from core.trainer import train_model
 
-def test_train_model():
-    result = train_model("Neural Network", "data.csv", {"lr": 0.01})
-    assert "Training Neural Network" in result
+
+@pytest.mark.parametrize("model_type", ["Neural Network", "Decision Tree", "SVM"])
+def test_train_model(tmp_path, model_type, write_dataset):
+    dataset = write_dataset(tmp_path / "data.csv")
+    epochs = []
+    result = train_model(model_type, dataset, {"lr": 0.05, "seed": 1} if model_type != "Decision Tree" else {},
+                         progress=lambda step, total, metrics: epochs.append(step))
+    assert result["model_type"] == model_type
+    assert result["classes"] == ["fail", "pass"]
+    assert result["validation_accuracy"] > 0.8
+    assert result["rows_per_second"] > 0
+    assert epochs and epochs[0] == 1
+
+
+def test_unknown_hyperparameter_is_rejected(tmp_path, write_dataset):
+    with pytest.raises(ValueError):
+        train_model("SVM", write_dataset(tmp_path / "data.csv"), {"depth_of_field": 3})
@@ -0,0 +1,37 @@
+# tests/test_upload_catalogue.py
+from utils.upload_catalogue import UploadCatalogue
+
+
+def test_record_and_list(tmp_path):
+    catalogue = UploadCatalogue(str(tmp_path), [".pdf", ".txt"], check_interval=60)
+    assert catalogue.list() == []
+    path = tmp_path / "notes.txt"
+    with catalogue.adding(path):
+        path.write_text("hello")
+    with catalogue.adding(tmp_path / "image.png"):
+        (tmp_path / "image.png").write_bytes(b"x")
+    assert [f["filename"] for f in catalogue.list()] == ["notes.txt"]
+    assert catalogue.list()[0]["size"] == 5
+    assert catalogue.rescans == 1
+
+
+def test_out_of_band_changes_show_up_after_the_check_interval(tmp_path):
+    catalogue = UploadCatalogue(str(tmp_path), [".txt"], check_interval=0)
+    assert catalogue.list() == []
+    (tmp_path / "external.txt").write_text("abc")
+    assert [f["filename"] for f in catalogue.list()] == ["external.txt"]
+    (tmp_path / "external.txt").write_text("abcdef")
+    assert catalogue.list()[0]["size"] == 6
+
+
+def test_write_alongside_another_worker_rescans(tmp_path):
+    catalogue = UploadCatalogue(str(tmp_path), [".txt"], check_interval=60)
+    assert catalogue.list() == []
+    with catalogue.adding(tmp_path / "mine.txt"):
+        (tmp_path / "other_worker.txt").write_text("abc")
+        (tmp_path / "mine.txt").write_text("abc")
+    assert sorted(f["filename"] for f in catalogue.list()) == ["mine.txt", "other_worker.txt"]
+    rescans = catalogue.rescans
+    with catalogue.adding(tmp_path / "second.txt"):
+        (tmp_path / "second.txt").write_text("abc")
+    assert catalogue.rescans == rescans
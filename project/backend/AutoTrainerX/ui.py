@@ -28,7 +28,7 @@ if uploaded_files:
 st.subheader("📊 Uploaded File History")
 
 try:
-    uploaded_history = requests.get("http://localhost:8000/files").json()
+    uploaded_history = requests.get("http://localhost:8000/files/").json()
 
     if isinstance(uploaded_history, list) and uploaded_history:
         for file in uploaded_history:
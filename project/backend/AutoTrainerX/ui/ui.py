@@ -1,6 +1,7 @@
 # ui/ui.py
 import streamlit as st
 from core.trainer import train_model
+from utils.helper import parse_hyperparameters
 
 def main():
     st.title("AutoTrainerX UI")
@@ -9,8 +10,14 @@ def main():
     hyperparameters = st.text_area("Hyperparameters (JSON format)")
     
     if st.button("Train Model"):
-        result = train_model(model_type, dataset_path, eval(hyperparameters))
-        st.success(result)
+        progress_bar = st.progress(0.0)
+        result = train_model(model_type, dataset_path, parse_hyperparameters(hyperparameters or "{}"),
+                             progress=lambda step, total, metrics: progress_bar.progress(step / total))
+        accuracy = result["validation_accuracy"]
+        # None when the validation split came out empty.
+        st.success(f"Trained {model_type}: validation accuracy "
+                   f"{'n/a' if accuracy is None else format(accuracy, '.3f')}")
+        st.json(result)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,108 @@
+# utils/answer_check.py
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Pattern, Tuple
+
+_HASH_COMMENTS = r"#[^\n]*"
+_SLASH_COMMENTS = r"//[^\n]*|/\*.*?\*/"
+_DASH_COMMENTS = r"--[^\n]*|/\*.*?\*/"
+
+# Comment syntax by language; anything else is compared as plain text.
+COMMENT_PATTERNS: Dict[str, str] = {
+    "python": _HASH_COMMENTS,
+    "ruby": _HASH_COMMENTS,
+    "bash": _HASH_COMMENTS,
+    "r": _HASH_COMMENTS,
+    "java": _SLASH_COMMENTS,
+    "javascript": _SLASH_COMMENTS,
+    "typescript": _SLASH_COMMENTS,
+    "c": _SLASH_COMMENTS,
+    "c++": _SLASH_COMMENTS,
+    "c#": _SLASH_COMMENTS,
+    "go": _SLASH_COMMENTS,
+    "rust": _SLASH_COMMENTS,
+    "kotlin": _SLASH_COMMENTS,
+    "swift": _SLASH_COMMENTS,
+    "php": _SLASH_COMMENTS + "|" + _HASH_COMMENTS,
+    "sql": _DASH_COMMENTS,
+}
+LANGUAGE_ALIASES = {"py": "python", "js": "javascript", "react": "javascript", "jsx": "javascript",
+                    "ts": "typescript", "cpp": "c++", "csharp": "c#", "golang": "go", "sh": "bash"}
+
+_STRINGS = r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|`[^`]*`'
+# String literals stay one token so spacing inside them still matters.
+_TOKENS = re.compile(_STRINGS + r'|\w+|[^\w\s]')
+
+
+def canonical_language(language: Optional[str]) -> Optional[str]:
+    if not language:
+        return None
+    language = language.strip().lower()
+    return LANGUAGE_ALIASES.get(language, language)
+
+
+@dataclass(frozen=True)
+class Normalizer:
+    """Lower-cases and trims answers; for code languages also drops comments and semicolons."""
+    language: Optional[str]
+    comments: Optional[Pattern]
+
+    @property
+    def is_code(self) -> bool:
+        return self.comments is not None
+
+    def text(self, answer: str) -> str:
+        answer = answer.strip().lower()
+        if self.comments is not None:
+            # String literals are matched first and put back, so "#" or ";" inside them is kept.
+            answer = self.comments.sub(lambda m: m.group("string") or "", answer)
+        return answer.strip()
+
+    def tokens(self, answer: str) -> Tuple[str, ...]:
+        """Token sequence of the normalised answer, so ``x=1`` and ``x = 1`` compare equal."""
+        return tuple(_TOKENS.findall(self.text(answer)))
+
+
+@lru_cache(maxsize=None)
+def _compile(language: Optional[str]) -> Normalizer:
+    pattern = COMMENT_PATTERNS.get(language)
+    if not pattern:
+        return Normalizer(language, None)
+    return Normalizer(language, re.compile(f"(?P<string>{_STRINGS})|{pattern}|;", re.DOTALL))
+
+
+def get_normalizer(language: Optional[str] = None) -> Normalizer:
+    """One compiled normaliser per language, shared by every request.
+
+    Languages without comment syntax all share the plain-text normaliser, so
+    the cache holds at most one entry per known language.
+    """
+    language = canonical_language(language)
+    return _compile(language if language in COMMENT_PATTERNS else None)
+
+
+def check_answer(user_answer: str, correct_answer: str, language: Optional[str] = None,
+                 compare: str = "text") -> bool:
+    """``compare="tokens"`` also ignores whitespace between tokens, e.g. for code answers."""
+    normalizer = get_normalizer(language)
+    if compare == "tokens":
+        return normalizer.tokens(user_answer) == normalizer.tokens(correct_answer)
+    if compare != "text":
+        raise ValueError(f"Unknown compare mode {compare!r}; expected 'text' or 'tokens'")
+    return normalizer.text(user_answer) == normalizer.text(correct_answer)
+
+
+def check_answers(items: Iterable[dict], language: Optional[str] = None, compare: str = "text") -> Dict[str, object]:
+    """Grades a whole submission; each item may override ``language`` and ``compare``."""
+    results: List[Dict[str, object]] = []
+    for index, item in enumerate(items):
+        results.append({
+            "index": index,
+            "question": item.get("question"),
+            "isCorrect": check_answer(item.get("userAnswer") or "", item.get("correctAnswer") or "",
+                                      item.get("language") or language, item.get("compare") or compare),
+        })
+    correct = sum(1 for r in results if r["isCorrect"])
+    return {"results": results, "correct": correct, "total": len(results),
+            "score": correct / len(results) if results else 0.0}
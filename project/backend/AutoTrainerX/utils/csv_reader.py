@@ -0,0 +1,139 @@
+# utils/csv_reader.py
+import csv
+import random
+from dataclasses import dataclass, field
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+# Widening order for inferred column types; a column takes the widest type seen.
+_NUMERIC_RANK = {"int": 0, "float": 1}
+_BOOLEANS = {"true", "false", "yes", "no"}
+_MAX_CELL_CHARS = 40
+
+
+def iter_csv_rows(path, encoding: str = "utf-8") -> Iterator[Dict[str, str]]:
+    """Yields rows as dicts, reading the file incrementally."""
+    with open(path, "r", encoding=encoding, newline="") as f:
+        yield from csv.DictReader(f)
+
+
+def iter_csv_chunks(path, chunk_size: int = 1000, encoding: str = "utf-8") -> Iterator[List[Dict[str, str]]]:
+    """Yields lists of at most ``chunk_size`` rows; only one chunk is held at a time."""
+    rows = iter_csv_rows(path, encoding)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def infer_type(value: str) -> Optional[str]:
+    """'int', 'float', 'bool' or 'str' for a cell; None for an empty cell."""
+    value = value.strip()
+    if not value:
+        return None
+    if value.lower() in _BOOLEANS:
+        return "bool"
+    try:
+        int(value)
+        return "int"
+    except ValueError:
+        pass
+    try:
+        float(value)
+        return "float"
+    except ValueError:
+        return "str"
+
+
+@dataclass
+class ColumnProfile:
+    name: str
+    dtype: Optional[str] = None
+    nulls: int = 0
+    minimum: Optional[float] = None
+    maximum: Optional[float] = None
+
+    def observe(self, value: Optional[str]):
+        kind = infer_type(value) if value is not None else None
+        if kind is None:
+            self.nulls += 1
+            return
+        if self.dtype is None or self.dtype == kind:
+            self.dtype = kind
+        elif self.dtype in _NUMERIC_RANK and kind in _NUMERIC_RANK:
+            self.dtype = max(self.dtype, kind, key=_NUMERIC_RANK.__getitem__)
+        else:
+            self.dtype = "str"
+        if kind in _NUMERIC_RANK:
+            number = float(value)
+            self.minimum = number if self.minimum is None else min(self.minimum, number)
+            self.maximum = number if self.maximum is None else max(self.maximum, number)
+
+    def describe(self) -> str:
+        text = f"{self.name} ({self.dtype or 'empty'}"
+        if self.dtype in _NUMERIC_RANK and self.minimum is not None:
+            text += f", {self.minimum:g}..{self.maximum:g}"
+        if self.nulls:
+            text += f", {self.nulls} empty"
+        return text + ")"
+
+
+@dataclass
+class CsvSummary:
+    columns: List[ColumnProfile]
+    row_count: int
+    sample: List[Dict[str, str]] = field(default_factory=list)
+
+    def render(self, max_chars: Optional[int] = None) -> str:
+        """Compact text for prompts: schema line, then sampled rows as a pipe table.
+
+        With ``max_chars``, sample rows are dropped from the end rather than
+        cutting a row in half.
+        """
+        names = [c.name for c in self.columns]
+        lines = [
+            f"CSV with {self.row_count} rows and {len(names)} columns: " + ", ".join(c.describe() for c in self.columns),
+            f"Sample of {len(self.sample)} rows:",
+            " | ".join(names),
+        ]
+        size = sum(len(line) + 1 for line in lines)
+        for row in self.sample:
+            line = " | ".join(_clip(row.get(name)) for name in names)
+            if max_chars is not None and size + len(line) + 1 > max_chars:
+                break
+            lines.append(line)
+            size += len(line) + 1
+        return "\n".join(lines)
+
+
+def _clip(value: Optional[str]) -> str:
+    value = (value or "").replace("\n", " ").strip()
+    return value if len(value) <= _MAX_CELL_CHARS else value[:_MAX_CELL_CHARS - 1] + "…"
+
+
+def summarize_csv(path, sample_size: int = 20, max_rows: Optional[int] = None,
+                  seed: Optional[int] = 0, encoding: str = "utf-8") -> CsvSummary:
+    """One pass over a CSV: row count, column types and a uniform reservoir sample.
+
+    Memory is bounded by ``sample_size`` rows however large the file is.
+    ``max_rows`` stops reading early for callers that only need a prefix.
+    """
+    rng = random.Random(seed)
+    with open(path, "r", encoding=encoding, newline="") as f:
+        reader = csv.DictReader(f)
+        columns = [ColumnProfile(name) for name in (reader.fieldnames or [])]
+        sample: List[Dict[str, str]] = []
+        count = 0
+        for row in islice(reader, max_rows):
+            for column in columns:
+                column.observe(row.get(column.name))
+            if count < sample_size:
+                sample.append(row)
+            else:
+                slot = rng.randint(0, count)
+                if slot < sample_size:
+                    sample[slot] = row
+            count += 1
+    return CsvSummary(columns=columns, row_count=count, sample=sample)
@@ -0,0 +1,233 @@
+# utils/dedup.py
+import hashlib
+import math
+import os
+import re
+import threading
+import zlib
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, TypeVar
+
+import numpy as np
+
+_WORDS = re.compile(r"\w+")
+_PRIME = np.uint64((1 << 32) - 5)
+
+T = TypeVar("T")
+
+
+class MinHasher:
+    """MinHash signatures over word shingles.
+
+    Shingles are hashed to 32 bits and permuted with ``(a * h + b) mod p``
+    for the prime ``p = 2**32 - 5`` and ``a, b < p``. The products stay inside
+    uint64 while ``a`` spans the whole field, so each permutation really
+    reorders the shingles, and the whole signature is a single vectorised
+    min over a (shingles x permutations) array.
+    """
+
+    # Bumped whenever the signature of a given text changes; filters persisted
+    # from an older version (the finetune export's Bloom file) no longer match.
+    VERSION = 2
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 5, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.a = rng.integers(1, int(_PRIME), size=num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, int(_PRIME), size=num_perm, dtype=np.uint64)
+
+    def shingles(self, text: str) -> List[str]:
+        words = _WORDS.findall(text.lower())
+        k = self.shingle_size
+        if len(words) <= k:
+            return [" ".join(words)] if words else []
+        return [" ".join(words[i:i + k]) for i in range(len(words) - k + 1)]
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in set(self.shingles(text))), dtype=np.uint64)
+        if hashes.size == 0:
+            return np.full(self.num_perm, _PRIME, dtype=np.uint64)
+        return ((np.outer(hashes, self.a) + self.b) % _PRIME).min(axis=0)
+
+
+def estimate_jaccard(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+    return float(np.mean(sig_a == sig_b))
+
+
+class BloomFilter:
+    """Fixed-size bit array sized for ``capacity`` items at ``error_rate`` false positives."""
+
+    def __init__(self, capacity: int, error_rate: float = 1e-4):
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, key: bytes):
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def __contains__(self, key: bytes) -> bool:
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+    def add(self, key: bytes):
+        for p in self._positions(key):
+            self.bits[p >> 3] |= 1 << (p & 7)
+
+    def save(self, path: Path):
+        """Writes the bit array atomically (temp file + rename)."""
+        path = Path(path)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(self.bits)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def load(self, path: Path):
+        data = Path(path).read_bytes()
+        if len(data) != len(self.bits):
+            raise ValueError(f"{path} holds {len(data)} bytes, expected {len(self.bits)}")
+        self.bits[:] = data
+
+
+class NearDuplicateFilter:
+    """Streaming near-duplicate detection with constant memory.
+
+    Each text's MinHash signature is cut into ``bands``; a text is a near
+    duplicate when any of its bands was seen before (classic LSH banding,
+    Jaccard threshold about ``(1 / bands) ** (1 / rows)``). Instead of an LSH
+    table the seen bands go into one Bloom filter, so memory is fixed up front
+    and the state is a single byte array that can be checkpointed.
+    """
+
+    def __init__(self, num_perm: int = 128, bands: int = 16, capacity: int = 200_000,
+                 error_rate: float = 1e-4, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.hasher = MinHasher(num_perm=num_perm, seed=seed)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.bloom = BloomFilter(capacity * bands, error_rate)
+
+    def _band_keys(self, text: str) -> List[bytes]:
+        signature = self.hasher.signature(text)
+        return [i.to_bytes(2, "little") + signature[i * self.rows:(i + 1) * self.rows].tobytes()
+                for i in range(self.bands)]
+
+    def add_if_new(self, text: str) -> bool:
+        """Records ``text`` and returns True unless it near-duplicates something already seen."""
+        keys = self._band_keys(text)
+        if any(key in self.bloom for key in keys):
+            return False
+        for key in keys:
+            self.bloom.add(key)
+        return True
+
+
+class SimilarityIndex:
+    """In-memory near-duplicate index over short texts such as generated questions.
+
+    Signatures are banded into an LSH table; texts sharing a band are
+    candidates, and a candidate counts as a duplicate when its estimated
+    Jaccard similarity reaches ``threshold``. Word bigrams suit texts of a
+    sentence or two; a lookup is one signature plus a few dict probes.
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, threshold: float = 0.7, shingle_size: int = 2,
+                 seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.hasher = MinHasher(num_perm=num_perm, shingle_size=shingle_size, seed=seed)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self._buckets: Dict[bytes, List[int]] = {}
+        self._signatures: List[np.ndarray] = []
+        self._texts: List[str] = []
+        self._exact: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._built = False
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    @staticmethod
+    def _normalise(text: str) -> str:
+        return " ".join(_WORDS.findall(text.lower()))
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [i.to_bytes(2, "little") + signature[i * self.rows:(i + 1) * self.rows].tobytes()
+                for i in range(self.bands)]
+
+    def _match(self, normalised: str, signature: np.ndarray, keys: List[bytes]) -> Optional[int]:
+        if normalised in self._exact:
+            return self._exact[normalised]
+        seen = set()
+        for key in keys:
+            for i in self._buckets.get(key, ()):
+                if i not in seen:
+                    seen.add(i)
+                    if estimate_jaccard(signature, self._signatures[i]) >= self.threshold:
+                        return i
+        return None
+
+    def query(self, text: str) -> Optional[str]:
+        """The indexed text ``text`` near-duplicates, or None."""
+        normalised = self._normalise(text)
+        signature = self.hasher.signature(normalised)
+        with self._lock:
+            i = self._match(normalised, signature, self._band_keys(signature))
+            return None if i is None else self._texts[i]
+
+    def is_duplicate(self, text: str) -> bool:
+        return self.query(text) is not None
+
+    def add(self, text: str) -> bool:
+        """Indexes ``text`` unless it near-duplicates something already indexed; returns whether it was added."""
+        normalised = self._normalise(text)
+        if not normalised:
+            return False
+        signature = self.hasher.signature(normalised)
+        keys = self._band_keys(signature)
+        with self._lock:
+            if self._match(normalised, signature, keys) is not None:
+                return False
+            i = len(self._texts)
+            self._texts.append(text)
+            self._signatures.append(signature)
+            self._exact[normalised] = i
+            for key in keys:
+                self._buckets.setdefault(key, []).append(i)
+            return True
+
+    def filter_new(self, items: Iterable[T], key: Callable[[T], str] = str, limit: Optional[int] = None) -> List[T]:
+        """Keeps the items that duplicate neither the index nor an earlier item, up to ``limit``, and indexes them."""
+        kept: List[T] = []
+        for item in items:
+            if limit is not None and len(kept) >= limit:
+                break
+            text = key(item)
+            # Items with no words have nothing to compare, so they are kept as they are.
+            if not self._normalise(text) or self.add(text):
+                kept.append(item)
+        return kept
+
+    def ensure_built(self, texts: Callable[[], Iterable[str]]):
+        """Indexes ``texts()`` the first time it is called.
+
+        Concurrent callers wait until the index is complete, so none of them
+        checks against a partial one; if ``texts()`` fails the next call retries.
+        """
+        if self._built:
+            return
+        with self._build_lock:
+            if self._built:
+                return
+            for text in texts():
+                if text:
+                    self.add(text)
+            self._built = True
@@ -0,0 +1,270 @@
+# utils/finetune_export.py
+"""Streaming, resumable export of uploaded study material to fine-tuning JSONL.
+
+Walks the upload roots in a fixed order, extracts text page by page (PDF),
+line block by line block (TXT) or row by row (CSV), packs paragraphs into
+chunks of about ``target_tokens`` and drops near-duplicate chunks. Records use
+the same ``{"messages": [...]}`` shape as ``process_file`` and are written to
+numbered shards next to a ``manifest.json`` that doubles as the checkpoint.
+
+    python -m utils.finetune_export --out finetune_export --target-tokens 512
+    python -m utils.finetune_export --out finetune_export            # resumes
+
+Memory does not grow with the corpus: one page/row block, one chunk and the
+fixed-size duplicate filter are all that is held.
+"""
+import argparse
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from utils.csv_reader import iter_csv_rows
+from utils.dedup import MinHasher, NearDuplicateFilter
+from utils.prompt_builder import estimate_tokens, truncate_to_tokens
+from utils.storage import JsonStore
+
+DEFAULT_ROOTS = ("uploads", "lms_uploads")
+EXTENSIONS = (".pdf", ".txt", ".csv")
+MANIFEST = "manifest.json"
+# Manifests written before ``bloom_file`` was recorded all used this one name.
+BLOOM_FILE = "dedup.bloom"
+_TEXT_BLOCK = 64 * 1024
+_CSV_ROWS_PER_BLOCK = 50
+
+
+@dataclass
+class ExportConfig:
+    roots: List[str] = field(default_factory=lambda: list(DEFAULT_ROOTS))
+    target_tokens: int = 512
+    shard_records: int = 1000
+    checkpoint_every: int = 200
+    num_perm: int = 128
+    bands: int = 16
+    capacity: int = 200_000
+
+
+def iter_source_files(roots: Sequence[str]) -> Iterator[Tuple[int, Tuple[str, ...], Path]]:
+    """Yields (root index, relative path parts, path) in a stable, sorted order.
+
+    Directories are listed one at a time, so only one listing is held in memory.
+    """
+    def walk(root: Path, directory: Path):
+        try:
+            entries = sorted(os.scandir(directory), key=lambda e: e.name)
+        except FileNotFoundError:
+            return
+        for entry in entries:
+            path = Path(entry.path)
+            if entry.is_dir(follow_symlinks=False):
+                yield from walk(root, path)
+            elif path.suffix.lower() in EXTENSIONS:
+                yield path.relative_to(root).parts, path
+
+    for index, root in enumerate(roots):
+        for parts, path in walk(Path(root), Path(root)):
+            yield index, parts, path
+
+
+def iter_text_blocks(path: Path) -> Iterator[str]:
+    """Text of a source file in blocks: PDF pages, TXT reads, or batches of CSV rows."""
+    suffix = path.suffix.lower()
+    if suffix == ".pdf":
+        import PyPDF2  # deferred: only needed when a PDF is exported
+        with open(path, "rb") as f:
+            for page in PyPDF2.PdfReader(f).pages:
+                text = page.extract_text() or ""
+                if text.strip():
+                    yield text
+    elif suffix == ".txt":
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            while True:
+                block = f.read(_TEXT_BLOCK)
+                if not block:
+                    return
+                # Finish the current line so a paragraph is not split mid-block.
+                yield block + f.readline()
+    elif suffix == ".csv":
+        rows = []
+        for row in iter_csv_rows(path):
+            rows.append(", ".join(f"{k}: {v}" for k, v in row.items() if v))
+            if len(rows) == _CSV_ROWS_PER_BLOCK:
+                yield "\n".join(rows)
+                rows = []
+        if rows:
+            yield "\n".join(rows)
+
+
+def chunk_blocks(blocks: Iterator[str], target_tokens: int) -> Iterator[str]:
+    """Packs paragraphs into chunks of about ``target_tokens``; long paragraphs are split."""
+    parts: List[str] = []
+    size = 0
+    for block in blocks:
+        for paragraph in block.split("\n\n"):
+            paragraph = paragraph.strip()
+            while paragraph:
+                tokens = estimate_tokens(paragraph)
+                if size + tokens <= target_tokens:
+                    parts.append(paragraph)
+                    size += tokens
+                    break
+                if parts:
+                    yield "\n\n".join(parts)
+                    parts, size = [], 0
+                    continue
+                head = truncate_to_tokens(paragraph, target_tokens) or paragraph[:1]
+                yield head
+                paragraph = paragraph[len(head):].strip()
+    if parts:
+        yield "\n\n".join(parts)
+
+
+class ShardWriter:
+    """Appends records to ``shard-NNNNN.jsonl`` files, rolling over every ``shard_records``."""
+
+    def __init__(self, out_dir: Path, shard_records: int, state: Optional[Dict[str, Any]] = None):
+        self.out_dir = out_dir
+        self.shard_records = shard_records
+        state = state or {}
+        self.shards: List[Dict[str, Any]] = state.get("shards", [])
+        self.current: Dict[str, Any] = state.get("open_shard") or self._new_shard()
+        path = self.out_dir / self.current["name"]
+        # Anything past the checkpointed offset was written after the last checkpoint.
+        with open(path, "ab") as f:
+            f.truncate(self.current["bytes"])
+        self._file = open(path, "ab")
+
+    def _new_shard(self) -> Dict[str, Any]:
+        return {"name": f"shard-{len(self.shards):05d}.jsonl", "records": 0, "bytes": 0}
+
+    def write(self, record: Dict[str, Any]):
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        self._file.write(line)
+        self.current["records"] += 1
+        self.current["bytes"] += len(line)
+        if self.current["records"] >= self.shard_records:
+            self._file.close()
+            self.shards.append(self.current)
+            self.current = self._new_shard()
+            # "wb": a shard past the last checkpoint may hold records from an interrupted run.
+            self._file = open(self.out_dir / self.current["name"], "wb")
+
+    def flush(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+    def state(self) -> Dict[str, Any]:
+        return {"shards": list(self.shards), "open_shard": dict(self.current)}
+
+
+def export(out_dir: Path, config: Optional[ExportConfig] = None) -> Dict[str, Any]:
+    """Runs (or resumes) an export into ``out_dir`` and returns the final manifest."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest_store = JsonStore(out_dir / MANIFEST, default=dict)
+    manifest = manifest_store.load()
+    config = config or ExportConfig(**manifest.get("config", {}))
+    if manifest and manifest.get("config") != asdict(config):
+        raise ValueError(f"{out_dir} was exported with different settings; use a new output directory")
+    if manifest.get("complete"):
+        return manifest
+    if manifest and manifest.get("minhash_version") != MinHasher.VERSION:
+        # The saved duplicate filter holds signatures the current hasher would not reproduce.
+        raise ValueError(f"{out_dir} was checkpointed with MinHash version {manifest.get('minhash_version', 1)}, "
+                         f"not {MinHasher.VERSION}; use a new output directory")
+
+    dedup = NearDuplicateFilter(num_perm=config.num_perm, bands=config.bands, capacity=config.capacity)
+    bloom_file = manifest.get("bloom_file", BLOOM_FILE)
+    if manifest and (out_dir / bloom_file).exists():
+        dedup.bloom.load(out_dir / bloom_file)
+    writer = ShardWriter(out_dir, config.shard_records, manifest)
+    stats = manifest.get("stats", {"documents": 0, "chunks": 0, "duplicates": 0, "records": 0})
+    cursor = manifest.get("cursor")
+    resume_key = (cursor["root"], tuple(cursor["path"])) if cursor else None
+
+    checkpoints = manifest.get("checkpoints", 0)
+
+    def checkpoint(root: int, parts: Tuple[str, ...], chunks_done: int, finished: bool, complete: bool = False):
+        nonlocal bloom_file, checkpoints
+        writer.flush()
+        # Each checkpoint writes the filter to a new file and the manifest names it, so the
+        # manifest on disk always points at the filter that matches its cursor.
+        checkpoints += 1
+        previous, bloom_file = bloom_file, f"dedup-{checkpoints:06d}.bloom"
+        dedup.bloom.save(out_dir / bloom_file)
+        state = {
+            "config": asdict(config),
+            "minhash_version": MinHasher.VERSION,
+            "checkpoints": checkpoints,
+            "bloom_file": bloom_file,
+            **writer.state(),
+            "cursor": {"root": root, "path": list(parts), "chunks_done": chunks_done, "finished": finished},
+            "stats": stats,
+            "complete": complete,
+        }
+        manifest_store.save(state)
+        try:
+            os.unlink(out_dir / previous)
+        except FileNotFoundError:
+            pass
+        return state
+
+    last = (0, (), 0, True)
+    since_checkpoint = 0
+    try:
+        for root, parts, path in iter_source_files(config.roots):
+            key = (root, parts)
+            skip = 0
+            if resume_key is not None:
+                if key < resume_key or (key == resume_key and cursor["finished"]):
+                    continue
+                if key == resume_key:
+                    skip = cursor["chunks_done"]
+            index = 0
+            for index, chunk in enumerate(chunk_blocks(iter_text_blocks(path), config.target_tokens), start=1):
+                if index <= skip:
+                    continue
+                stats["chunks"] += 1
+                if dedup.add_if_new(chunk):
+                    writer.write({"messages": [{"role": "user", "content": chunk}]})
+                    stats["records"] += 1
+                else:
+                    stats["duplicates"] += 1
+                since_checkpoint += 1
+                if since_checkpoint >= config.checkpoint_every:
+                    checkpoint(root, parts, index, False)
+                    since_checkpoint = 0
+            stats["documents"] += 1
+            last = (root, parts, index, True)
+        final = checkpoint(*last, complete=True)
+    finally:
+        writer.close()
+    return final
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export uploaded material to sharded fine-tuning JSONL.")
+    parser.add_argument("--out", default="finetune_export", help="output directory (resumes if it has a manifest)")
+    parser.add_argument("--roots", nargs="+", default=list(DEFAULT_ROOTS))
+    parser.add_argument("--target-tokens", type=int, default=512)
+    parser.add_argument("--shard-records", type=int, default=1000)
+    parser.add_argument("--checkpoint-every", type=int, default=200, help="chunks between checkpoints")
+    args = parser.parse_args()
+
+    config = None
+    if not (Path(args.out) / MANIFEST).exists():
+        config = ExportConfig(roots=args.roots, target_tokens=args.target_tokens,
+                              shard_records=args.shard_records, checkpoint_every=args.checkpoint_every)
+    manifest = export(Path(args.out), config)
+    stats = manifest["stats"]
+    shards = len(manifest["shards"]) + (1 if manifest["open_shard"]["records"] else 0)
+    print(f"{stats['records']} records in {shards} shard(s) from {stats['documents']} "
+          f"documents ({stats['duplicates']} near-duplicate chunks dropped)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# utils/health.py
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+from utils.metrics import DEPENDENCY_UP, EVENT_LOOP_LAG
+
+# A check returns at least {"status": ...}; "ok" means healthy. Raising or
+# overrunning the timeout is recorded as an error.
+Check = Callable[[], Awaitable[Dict[str, Any]]]
+
+
+class HealthProber:
+    """Runs dependency checks on an interval in the background and keeps the last results.
+
+    Health endpoints only read ``results``, so a probe costs nothing however
+    often load balancers call it, and a slow dependency can't make it hang.
+    A second task sleeps ``lag_interval`` at a time and records how late it
+    wakes up: the event loop's lag.
+    """
+
+    def __init__(self, checks: Dict[str, Check], interval: float = 30.0, timeout: float = 3.0,
+                 critical: Iterable[str] = (), lag_interval: float = 0.5, lag_window: int = 20):
+        self.checks = checks
+        self.interval = interval
+        self.timeout = timeout
+        self.critical = tuple(critical)
+        self.lag_interval = lag_interval
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self.last_probe: Optional[float] = None
+        self._lags = deque(maxlen=lag_window)
+        self._tasks = []
+
+    async def _run(self, name: str, check: Check) -> Dict[str, Any]:
+        start = time.perf_counter()
+        try:
+            result = dict(await asyncio.wait_for(check(), self.timeout))
+        except asyncio.TimeoutError:
+            result = {"status": "error", "error": f"timed out after {self.timeout}s"}
+        except Exception as e:
+            result = {"status": "error", "error": str(e) or type(e).__name__}
+        result["latency_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        result["checked_at"] = time.time()
+        DEPENDENCY_UP.labels(dependency=name).set(1.0 if result.get("status") == "ok" else 0.0)
+        return result
+
+    async def probe_once(self):
+        names = list(self.checks)
+        results = await asyncio.gather(*(self._run(name, self.checks[name]) for name in names))
+        self.results = dict(zip(names, results))
+        self.last_probe = time.time()
+
+    async def _probe_loop(self):
+        while True:
+            await self.probe_once()
+            await asyncio.sleep(self.interval)
+
+    async def _lag_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.lag_interval)
+            lag = max(0.0, loop.time() - start - self.lag_interval)
+            self._lags.append(lag)
+            EVENT_LOOP_LAG.set(lag)
+
+    def start(self):
+        if not self._tasks:
+            self._tasks = [asyncio.ensure_future(self._probe_loop()), asyncio.ensure_future(self._lag_loop())]
+
+    async def stop(self):
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    @property
+    def ready(self) -> bool:
+        """True once a probe has run and every critical check passed."""
+        return self.last_probe is not None and all(
+            self.results.get(name, {}).get("status") == "ok" for name in self.critical)
+
+    def loop_lag(self) -> Dict[str, Optional[float]]:
+        lags = list(self._lags)
+        return {"last_ms": round(lags[-1] * 1000, 2) if lags else None,
+                "max_ms": round(max(lags) * 1000, 2) if lags else None}
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "status": "ready" if self.ready else ("starting" if self.last_probe is None else "unavailable"),
+            "checks": self.results,
+            "last_probe_age_s": round(time.time() - self.last_probe, 2) if self.last_probe else None,
+            "event_loop_lag": self.loop_lag(),
+        }
@@ -0,0 +1,202 @@
+# utils/leaderboard.py
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sortedcontainers import SortedList
+
+XP_PER_LEVEL = 1000
+# Change log rows kept behind the newest; a reader further behind than this reloads in full.
+KEEP_CHANGES = 10_000
+# Reload in full once more than this many users, or this share of them, changed since the last sync.
+RELOAD_MIN_CHANGES = 64
+RELOAD_FRACTION = 0.25
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS user_progress (
+    user_id TEXT PRIMARY KEY,
+    total_xp INTEGER DEFAULT 0,
+    level INTEGER DEFAULT 1,
+    progress_json TEXT DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS idx_user_progress_xp ON user_progress (total_xp DESC, user_id);
+CREATE TABLE IF NOT EXISTS xp_changes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS user_progress_xp_insert AFTER INSERT ON user_progress
+BEGIN INSERT INTO xp_changes (user_id) VALUES (NEW.user_id); END;
+CREATE TRIGGER IF NOT EXISTS user_progress_xp_update AFTER UPDATE OF total_xp, user_id ON user_progress
+BEGIN INSERT INTO xp_changes (user_id) VALUES (OLD.user_id), (NEW.user_id); END;
+CREATE TRIGGER IF NOT EXISTS user_progress_xp_delete AFTER DELETE ON user_progress
+BEGIN INSERT INTO xp_changes (user_id) VALUES (OLD.user_id); END;
+"""
+
+
+def level_for(xp: int) -> int:
+    return max(0, int(xp)) // XP_PER_LEVEL + 1
+
+
+class Leaderboard:
+    """XP rankings over ``user_progress`` in ``rankings.db``.
+
+    Every user is kept in memory as a ``(-total_xp, user_id)`` key in a
+    ``SortedList``, so rank-of-user, inserting and removing a key, and reading
+    the entry at a position are all O(log n); top-K and the neighbours of a
+    user are k such reads. Ties are broken by ``user_id`` so the order is stable.
+
+    Triggers append every user whose XP changes, from any writer, to
+    ``xp_changes``. When another connection has committed (``PRAGMA
+    data_version`` changed), only the users logged since the last sync are
+    re-read. The list is rebuilt in full only on first use, when this reader
+    has fallen behind the pruned log, or when most users changed.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.RLock()
+        # Autocommit mode: transactions are opened explicitly with BEGIN IMMEDIATE.
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.executescript(SCHEMA)
+        self._xp: Dict[str, int] = {}
+        self._order: SortedList = SortedList()
+        self._data_version = None
+        self._seq: Optional[int] = None
+        self.reloads = 0
+        self.syncs = 0
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _refresh(self):
+        # Read the version, the changes and the rows from one snapshot.
+        own = not self._conn.in_transaction
+        if own:
+            self._conn.execute("BEGIN")
+        try:
+            version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            if version == self._data_version:
+                return
+            oldest, newest = self._conn.execute("SELECT MIN(seq), MAX(seq) FROM xp_changes").fetchone()
+            changed = None
+            if self._seq is not None and (oldest is None or oldest <= self._seq + 1):
+                changed = {user_id for (user_id,) in self._conn.execute(
+                    "SELECT DISTINCT user_id FROM xp_changes WHERE seq > ?", (self._seq,))}
+            if changed is None or len(changed) > max(RELOAD_MIN_CHANGES, RELOAD_FRACTION * len(self._xp)):
+                self._reload()
+            else:
+                self._apply(changed)
+            self._seq = newest or 0
+            self._data_version = version
+        finally:
+            if own:
+                self._conn.execute("COMMIT")
+
+    def _reload(self):
+        rows = self._conn.execute("SELECT user_id, total_xp FROM user_progress").fetchall()
+        self._xp = {user_id: xp or 0 for user_id, xp in rows}
+        self._order = SortedList((-xp, user_id) for user_id, xp in self._xp.items())
+        self.reloads += 1
+
+    def _apply(self, user_ids):
+        user_ids = list(user_ids)
+        current: Dict[str, int] = {}
+        for i in range(0, len(user_ids), 500):
+            chunk = user_ids[i:i + 500]
+            current.update((user_id, xp or 0) for user_id, xp in self._conn.execute(
+                f"SELECT user_id, total_xp FROM user_progress WHERE user_id IN ({', '.join('?' * len(chunk))})",
+                chunk))
+        for user_id in user_ids:
+            self._set(user_id, current.get(user_id))
+        self.syncs += 1
+
+    def _set(self, user_id: str, xp: Optional[int]):
+        old = self._xp.pop(user_id, None)
+        if old is not None:
+            self._order.remove((-old, user_id))
+        if xp is not None:
+            self._xp[user_id] = xp
+            self._order.add((-xp, user_id))
+
+    def _entry(self, position: int) -> Dict[str, Any]:
+        neg_xp, user_id = self._order[position]
+        return {"rank": position + 1, "user_id": user_id, "total_xp": -neg_xp, "level": level_for(-neg_xp)}
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._order)
+
+    def top(self, k: int = 10) -> List[Dict[str, Any]]:
+        with self._lock:
+            self._refresh()
+            return [self._entry(i) for i in range(min(max(0, k), len(self._order)))]
+
+    def rank(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """The user's 1-based rank and XP, or None for an unknown user."""
+        with self._lock:
+            self._refresh()
+            position = self._position(user_id)
+            if position is None:
+                return None
+            return {**self._entry(position), "total_users": len(self._order)}
+
+    def around(self, user_id: str, radius: int = 5) -> Optional[List[Dict[str, Any]]]:
+        """Up to ``radius`` users either side of ``user_id``, including them; None for an unknown user."""
+        with self._lock:
+            self._refresh()
+            position = self._position(user_id)
+            if position is None:
+                return None
+            radius = max(0, radius)
+            start, end = max(0, position - radius), min(len(self._order), position + radius + 1)
+            return [self._entry(i) for i in range(start, end)]
+
+    def _position(self, user_id: str) -> Optional[int]:
+        xp = self._xp.get(user_id)
+        if xp is None:
+            return None
+        return self._order.bisect_left((-xp, user_id))
+
+    def add_xp(self, user_id: str, amount: int) -> Dict[str, Any]:
+        return self.add_xp_many([(user_id, amount)])[user_id]
+
+    def add_xp_many(self, increments: Iterable[Tuple[str, int]]) -> Dict[str, Dict[str, Any]]:
+        """Applies ``(user_id, amount)`` increments in one transaction.
+
+        Repeated users are summed first; new users start from 0 XP. Returns
+        each touched user's new XP and level.
+        """
+        totals: Dict[str, int] = {}
+        for user_id, amount in increments:
+            totals[user_id] = totals.get(user_id, 0) + int(amount)
+        if not totals:
+            return {}
+        with self._lock:
+            # Take the write lock before reading current XP, so no other
+            # connection can commit between the read and our update.
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._refresh()
+                updated = {user_id: max(0, self._xp.get(user_id, 0) + amount) for user_id, amount in totals.items()}
+                self._conn.executemany(
+                    "INSERT INTO user_progress (user_id, total_xp, level) VALUES (?, ?, ?) "
+                    "ON CONFLICT(user_id) DO UPDATE SET total_xp = excluded.total_xp, level = excluded.level",
+                    [(user_id, xp, level_for(xp)) for user_id, xp in updated.items()])
+                # Holding the write lock, the log up to here is other writers' changes
+                # (synced above) plus ours (applied below).
+                newest = self._conn.execute("SELECT MAX(seq) FROM xp_changes").fetchone()[0]
+                self._conn.execute("DELETE FROM xp_changes WHERE seq <= ?", (newest - KEEP_CHANGES,))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            for user_id, xp in updated.items():
+                self._set(user_id, xp)
+            self._seq = newest
+            # Our own commits don't move data_version for this connection, so the
+            # in-place updates above stay authoritative until someone else writes.
+            return {user_id: {"user_id": user_id, "total_xp": xp, "level": level_for(xp)}
+                    for user_id, xp in updated.items()}
@@ -0,0 +1,166 @@
+# utils/learning_paths.py
+import asyncio
+import hashlib
+import logging
+import re
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from utils.answer_check import canonical_language
+from utils.metrics import record_cache
+from utils.storage import JsonStore, Version
+
+logger = logging.getLogger(__name__)
+
+# Generates the full learning path for a language; raises if it can't.
+Generator = Callable[[str], Awaitable[List[Dict[str, Any]]]]
+
+
+# Titles sharing at least this fraction of their words count as the same step when a path is regenerated.
+TITLE_MATCH = 0.5
+
+
+def slug(text: Any) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", str(text).lower()).strip("-") or "step"
+
+
+def language_key(language: str) -> str:
+    """Id prefix for a language: the canonical name, with ``+`` and ``#`` spelled out
+    so ``c``, ``c++`` and ``c#`` become ``c``, ``cpp`` and ``csharp``."""
+    name = canonical_language(language) or ""
+    return slug(name.replace("+", "p").replace("#", "sharp"))
+
+
+def _filename(language: str) -> str:
+    # The id prefix alone may merge names ("objective c" / "objective-c"); a hash keeps files apart.
+    name, key = canonical_language(language) or "", language_key(language)
+    return f"{key}.json" if name == key else f"{key}-{hashlib.sha1(name.encode()).hexdigest()[:8]}.json"
+
+
+def _words(step: Dict[str, Any]) -> set:
+    return set(slug(step.get("title") or step.get("id")).split("-"))
+
+
+def assign_stable_ids(language: str, steps: Iterable[Dict[str, Any]],
+                      previous: Iterable[Dict[str, Any]] = ()) -> List[Dict[str, Any]]:
+    """Ids derived from the language and step title, kept across regenerations.
+
+    A step whose title matches one in ``previous`` (the path being replaced)
+    exactly, or failing that shares ``TITLE_MATCH`` of its words, keeps that
+    step's id, so students' completed ids stay valid when the wording shifts.
+    ``legacy_id`` keeps the id the generator gave the step the first time:
+    progress saved before paths were cached refers to steps by those ids.
+    """
+    steps = list(steps)
+    unmatched = {step["id"]: step for step in previous if step.get("id")}
+    matches: Dict[int, Dict[str, Any]] = {}
+    by_slug = {slug(step.get("title") or step_id): step_id for step_id, step in unmatched.items()}
+    for i, step in enumerate(steps):
+        step_id = by_slug.get(slug(step.get("title") or step.get("id")))
+        if step_id in unmatched:
+            matches[i] = unmatched.pop(step_id)
+    for i, step in enumerate(steps):
+        if i in matches or not unmatched:
+            continue
+        words = _words(step)
+        overlap, step_id = max((len(words & _words(old)) / len(words | _words(old)), step_id)
+                               for step_id, old in unmatched.items())
+        if overlap >= TITLE_MATCH:
+            matches[i] = unmatched.pop(step_id)
+
+    used = {old["id"] for old in matches.values()}
+    result = []
+    for i, step in enumerate(steps):
+        if i in matches:
+            old = matches[i]
+            result.append({**step, "id": old["id"], "legacy_id": old.get("legacy_id")})
+            continue
+        base = f"{language_key(language)}-{slug(step.get('title') or step.get('id'))}"
+        step_id, n = base, 1
+        while step_id in used:
+            n += 1
+            step_id = f"{base}-{n}"
+        used.add(step_id)
+        legacy_id = step.get("id")
+        result.append({**step, "id": step_id, "legacy_id": None if legacy_id is None else str(legacy_id)})
+    return result
+
+
+class LearningPathCache:
+    """One canonical learning path per language, shared by every student.
+
+    A path is generated once and stored on disk; each request filters out the
+    student's completed steps locally. The parsed path stays in memory and is
+    re-read (off the event loop) only when the file's version changes. Once a path is older than ``max_age``
+    it is still served while a single background task regenerates it.
+    Concurrent misses for the same language wait on the same generation.
+    """
+
+    def __init__(self, directory: Path, generate: Generator, max_age: float = 7 * 24 * 3600):
+        self.directory = Path(directory)
+        self.generate = generate
+        self.max_age = max_age
+        self._stores: Dict[str, JsonStore] = {}
+        self._entries: Dict[str, Tuple[Version, Dict[str, Any]]] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    @staticmethod
+    def _key(language: str) -> str:
+        return canonical_language(language) or ""
+
+    def _store(self, language: str) -> JsonStore:
+        key = self._key(language)
+        if key not in self._stores:
+            self._stores[key] = JsonStore(self.directory / _filename(language), default=dict)
+        return self._stores[key]
+
+    async def cached(self, language: str) -> Optional[Dict[str, Any]]:
+        key, store = self._key(language), self._store(language)
+        version, entry = self._entries.get(key, (None, None))
+        if entry is None or store.version != version:
+            entry, version = await asyncio.to_thread(store.load_versioned)
+            self._entries[key] = (version, entry)
+        return entry if entry.get("steps") else None
+
+    async def steps(self, language: str) -> List[Dict[str, Any]]:
+        entry = await self.cached(language)
+        record_cache("learning_path", entry is not None)
+        if entry is None:
+            return await self.refresh(language)
+        stale = time.time() - entry.get("generated_at", 0) > self.max_age
+        if stale and self._key(language) not in self._inflight:
+            self._start(language).add_done_callback(self._log_failure)
+        return entry["steps"]
+
+    async def path_for(self, language: str, completed_ids: Iterable[Any] = ()) -> List[Dict[str, Any]]:
+        """The path minus completed steps, matched by ``id`` or by ``legacy_id``."""
+        done = {str(i) for i in completed_ids}
+        return [step for step in await self.steps(language)
+                if step["id"] not in done and step.get("legacy_id") not in done]
+
+    async def refresh(self, language: str) -> List[Dict[str, Any]]:
+        """Regenerates the path, joining a generation already running for ``language``."""
+        return await asyncio.shield(self._inflight.get(self._key(language)) or self._start(language))
+
+    def _start(self, language: str) -> asyncio.Future:
+        key = self._key(language)
+        task = asyncio.ensure_future(self._generate(language))
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return task
+
+    async def _generate(self, language: str) -> List[Dict[str, Any]]:
+        previous = (await self.cached(language) or {}).get("steps") or []
+        steps = assign_stable_ids(language, await self.generate(language), previous)
+        if not steps:
+            raise ValueError(f"Empty learning path generated for {language}")
+        entry = {"language": language, "generated_at": time.time(), "steps": steps}
+        version = await asyncio.to_thread(self._store(language).save, entry)
+        self._entries[self._key(language)] = (version, entry)
+        return steps
+
+    @staticmethod
+    def _log_failure(task: asyncio.Future):
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Background learning path refresh failed: %s", task.exception())
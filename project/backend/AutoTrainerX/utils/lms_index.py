@@ -0,0 +1,113 @@
+# utils/lms_index.py
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from utils.metrics import record_cache
+from utils.storage import Version, file_signature
+
+
+class QuizAssignmentIndex:
+    """Quizzes indexed by id and quiz assignments indexed by class_id.
+
+    The index is built from the JSON stores on first use and rebuilt only when
+    one of the files changes on disk (another worker, a manual edit). Writes
+    made through ``add_quiz``/``add_assignment`` update it in place when
+    nothing else changed the file since the last load.
+    """
+
+    def __init__(self, quiz_file: Path, assign_file: Path,
+                 load_quizzes: Callable[[], List[Dict[str, Any]]],
+                 load_assignments: Callable[[], List[Dict[str, Any]]]):
+        self.quiz_file = Path(quiz_file)
+        self.assign_file = Path(assign_file)
+        self._load_quizzes = load_quizzes
+        self._load_assignments = load_assignments
+        self._lock = threading.RLock()
+        self._quiz_sig = self._assign_sig = None
+        self._quiz_loaded = self._assign_loaded = False
+        self._quizzes: Dict[str, Dict[str, Any]] = {}
+        self._quiz_pos: Dict[str, int] = {}
+        self._by_class: Dict[str, List[str]] = {}
+        self._pairs: Set[Tuple[str, str]] = set()
+        self.reloads = 0
+
+    def _refresh(self):
+        reloads = self.reloads
+        self._reload_changed()
+        record_cache("lms_quiz_index", self.reloads == reloads)
+
+    def _reload_changed(self):
+        sig = file_signature(self.quiz_file)
+        if not self._quiz_loaded or sig != self._quiz_sig:
+            self._quizzes, self._quiz_pos = {}, {}
+            for quiz in self._load_quizzes():
+                if "id" in quiz:
+                    self._store_quiz(quiz)
+            self._quiz_sig, self._quiz_loaded = sig, True
+            self.reloads += 1
+        sig = file_signature(self.assign_file)
+        if not self._assign_loaded or sig != self._assign_sig:
+            self._by_class, self._pairs = {}, set()
+            for assignment in self._load_assignments():
+                self._index_assignment(assignment)
+            self._assign_sig, self._assign_loaded = sig, True
+            self.reloads += 1
+
+    def _store_quiz(self, quiz: Dict[str, Any]):
+        self._quiz_pos.setdefault(quiz["id"], len(self._quiz_pos))
+        self._quizzes[quiz["id"]] = quiz
+
+    def _index_assignment(self, assignment: Dict[str, Any]):
+        key = (assignment.get("quiz_id"), assignment.get("class_id"))
+        if key in self._pairs:
+            return
+        self._pairs.add(key)
+        self._by_class.setdefault(key[1], []).append(key[0])
+
+    def quizzes(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            self._refresh()
+            return list(self._quizzes.values())
+
+    def get_quiz(self, quiz_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._refresh()
+            return self._quizzes.get(quiz_id)
+
+    def is_assigned(self, quiz_id: str, class_id: str) -> bool:
+        with self._lock:
+            self._refresh()
+            return (quiz_id, class_id) in self._pairs
+
+    def quizzes_for_class(self, class_id: str) -> List[Dict[str, Any]]:
+        """Quizzes assigned to a class, in the order they were created."""
+        with self._lock:
+            self._refresh()
+            quiz_ids = [qid for qid in self._by_class.get(class_id, []) if qid in self._quizzes]
+            quiz_ids.sort(key=self._quiz_pos.__getitem__)
+            return [self._quizzes[qid] for qid in quiz_ids]
+
+    def add_quiz(self, quiz: Dict[str, Any], versions: Optional[Tuple[Version, Version]] = None):
+        """Records a quiz that was just written to the quiz store.
+
+        ``versions`` is the (before, after) pair ``JsonStore.append`` returned.
+        The quiz is added in place only if the store was still at the version
+        this index last loaded; if another worker wrote in between (or the
+        versions are unknown) the index reloads on the next lookup instead.
+        """
+        with self._lock:
+            if self._quiz_loaded and versions and versions[0] == self._quiz_sig:
+                self._store_quiz(quiz)
+                self._quiz_sig = versions[1]
+            else:
+                self._quiz_loaded = False
+
+    def add_assignment(self, assignment: Dict[str, Any], versions: Optional[Tuple[Version, Version]] = None):
+        """Records an assignment that was just written to the assignment store; see ``add_quiz``."""
+        with self._lock:
+            if self._assign_loaded and versions and versions[0] == self._assign_sig:
+                self._index_assignment(assignment)
+                self._assign_sig = versions[1]
+            else:
+                self._assign_loaded = False
@@ -1,8 +1,107 @@
 # utils/logger.py
+import atexit
+import configparser
 import logging
+import logging.config
+import os
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from pathlib import Path
+from typing import Dict, Optional
+
+DEFAULT_CONFIG = Path(__file__).resolve().parent.parent / "configs" / "logging.conf"
+
+_listener: Optional[QueueListener] = None
+_setup_lock = threading.Lock()
+
+
+class DebugRateLimitFilter(logging.Filter):
+    """Token bucket per logger for DEBUG records; INFO and above always pass."""
+
+    def __init__(self, rate: float = 20.0, burst: int = 50):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.suppressed = 0
+        self._buckets: Dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(record.name)
+            if bucket is None:
+                bucket = self._buckets[record.name] = [float(self.burst), now]
+            tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if tokens < 1:
+                bucket[0] = tokens
+                self.suppressed += 1
+                return False
+            bucket[0] = tokens - 1
+            return True
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def setup_logging(config_path: Path = DEFAULT_CONFIG, log_dir: Optional[str] = None) -> QueueListener:
+    """Configure logging from ``configs/logging.conf`` behind a background queue.
+
+    Loggers, per-module levels, handlers and rotation come from the config
+    file; its log files are written under ``log_dir`` (default ``$LOG_DIR``,
+    else ``logs``). The configured root handlers are moved onto a QueueListener thread,
+    so a log call only formats the record and enqueues it; file and console
+    I/O never happens on the request path. Safe to call more than once.
+    """
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            return _listener
+        log_dir = log_dir or os.getenv("LOG_DIR", "logs")
+        Path(log_dir).mkdir(parents=True, exist_ok=True)
+        # The config refers to the directory as %(log_dir)s.
+        logging.config.fileConfig(str(config_path), defaults={"log_dir": Path(log_dir).as_posix()},
+                                  disable_existing_loggers=False)
+
+        options = configparser.RawConfigParser()
+        options.read(config_path)
+        log_queue = queue.Queue(maxsize=options.getint("queue", "maxsize", fallback=10000))
+        queue_handler = NonBlockingQueueHandler(log_queue)
+        queue_handler.addFilter(DebugRateLimitFilter(
+            rate=options.getfloat("sampling", "debug_per_second", fallback=20.0),
+            burst=options.getint("sampling", "debug_burst", fallback=50),
+        ))
+
+        root = logging.getLogger()
+        handlers = list(root.handlers)
+        for handler in handlers:
+            root.removeHandler(handler)
+        root.addHandler(queue_handler)
+
+        _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)
+        return _listener
+
 
 def setup_logger():
-    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    setup_logging()
     return logging.getLogger(__name__)
 
 logger = setup_logger()
@@ -0,0 +1,345 @@
+# utils/metrics.py
+"""In-process Prometheus-style metrics.
+
+Counters, gauges and histograms are plain Python objects guarded by a lock;
+``render()`` serialises them in the Prometheus text exposition format for the
+``/metrics`` endpoint. ``MetricsMiddleware`` times every HTTP route, so new
+endpoints are picked up without extra code.
+"""
+import asyncio
+import functools
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children: Dict[Tuple[str, ...], object] = {}
+
+    def labels(self, **labels):
+        key = tuple(str(labels[n]) for n in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _default(self):
+        return self.labels() if not self.labelnames else None
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for key, child in sorted(self._children.items()):
+            lines.extend(self._render_child(key, child))
+        return lines
+
+    def _render_child(self, key, child) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"]
+
+
+class _Value:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float):
+        self.value = float(value)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1.0):
+        self._default().inc(amount)
+
+    def values(self) -> Dict[Tuple[str, ...], float]:
+        """Current count per label tuple, in ``labelnames`` order."""
+        return {key: child.value for key, child in list(self._children.items())}
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 function: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None):
+        super().__init__(name, documentation, labelnames)
+        self.function = function
+
+    def _new_child(self):
+        return _Value()
+
+    def set(self, value: float):
+        self._default().set(value)
+
+    def render(self) -> List[str]:
+        if self.function is None:
+            return super().render()
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for key, value in sorted(self.function().items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class _HistogramValue:
+    __slots__ = ("buckets", "counts", "sum", "count", "_lock")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float):
+        self._default().observe(value)
+
+    def _render_child(self, key, child) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), child.counts):
+            cumulative += count
+            labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+        lines.append(f"{self.name}_count{labels} {child.count}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = (), function=None) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames, function))
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route.", ["method", "route"])
+HTTP_RESPONSES = REGISTRY.counter(
+    "http_responses_total", "HTTP responses by route and status code.", ["method", "route", "status"])
+DEEPSEEK_REQUEST_SECONDS = REGISTRY.histogram(
+    "deepseek_request_duration_seconds", "DeepSeek API call latency.", ["status"])
+DEEPSEEK_TOKENS = REGISTRY.counter(
+    "deepseek_tokens_total", "Tokens reported by DeepSeek usage blocks.", ["kind"])
+PDF_EXTRACT_SECONDS = REGISTRY.histogram(
+    "pdf_extract_duration_seconds", "Time spent extracting text from a PDF.")
+PDF_PAGES = REGISTRY.histogram(
+    "pdf_pages", "Pages per extracted PDF.", buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500))
+JSON_STORE_SECONDS = REGISTRY.histogram(
+    "json_store_duration_seconds", "JSON store read/write latency.", ["store", "op"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0))
+QUEUE_DEPTH = REGISTRY.gauge(
+    "question_queue_depth", "Questions waiting in each language queue.", ["language"])
+PROMPT_TOKENS = REGISTRY.histogram(
+    "prompt_tokens", "Locally estimated prompt tokens sent to DeepSeek.", ["endpoint"],
+    buckets=(128, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768, 65536))
+CACHE_REQUESTS = REGISTRY.counter(
+    "cache_requests_total", "Cache lookups by cache and result (hit/miss).", ["cache", "result"])
+
+
+def _cache_hit_ratios() -> Dict[Tuple[str, ...], float]:
+    totals: Dict[str, List[float]] = {}
+    for (cache, result), value in CACHE_REQUESTS.values().items():
+        counts = totals.setdefault(cache, [0.0, 0.0])
+        counts[0 if result == "hit" else 1] += value
+    return {(cache,): hits / (hits + misses) for cache, (hits, misses) in totals.items() if hits + misses}
+
+
+CACHE_HIT_RATIO = REGISTRY.gauge(
+    "cache_hit_ratio", "Share of cache lookups served without a reload.", ["cache"], function=_cache_hit_ratios)
+
+
+DEPENDENCY_UP = REGISTRY.gauge(
+    "dependency_up", "1 if the last background health check of a dependency passed, else 0.", ["dependency"])
+EVENT_LOOP_LAG = REGISTRY.gauge(
+    "event_loop_lag_seconds", "How late the event loop woke the last lag probe.")
+QUESTION_BANK_QUESTIONS = REGISTRY.counter(
+    "question_bank_questions_total", "Questions handed out, by origin endpoint and source (bank/generated).",
+    ["origin", "source"])
+
+
+def _question_bank_hit_ratios() -> Dict[Tuple[str, ...], float]:
+    totals: Dict[str, List[float]] = {}
+    for (origin, source), value in QUESTION_BANK_QUESTIONS.values().items():
+        counts = totals.setdefault(origin, [0.0, 0.0])
+        counts[0 if source == "bank" else 1] += value
+    return {(origin,): bank / (bank + generated) for origin, (bank, generated) in totals.items() if bank + generated}
+
+
+QUESTION_BANK_HIT_RATIO = REGISTRY.gauge(
+    "question_bank_hit_ratio", "Share of questions served from the question bank rather than generated.",
+    ["origin"], function=_question_bank_hit_ratios)
+
+
+def record_cache(cache: str, hit: bool):
+    CACHE_REQUESTS.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+
+def observe_time(histogram: Histogram, **labels):
+    """Decorator recording a function's wall time (sync or async) in ``histogram``."""
+    def decorator(func):
+        child = histogram.labels(**labels)
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    child.observe(time.perf_counter() - start)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                child.observe(time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing every request by its route template.
+
+    The route is read from the scope after routing, so ``/lms/quiz/results/{quiz_id}``
+    is one series regardless of the id, and unmatched paths share one label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            method = scope.get("method", "")
+            HTTP_REQUEST_SECONDS.labels(method=method, route=route).observe(elapsed)
+            HTTP_RESPONSES.labels(method=method, route=route, status=status[0]).inc()
+
+
+async def _on_deepseek_request(request):
+    request.extensions["metrics_start"] = time.perf_counter()
+
+
+async def _on_deepseek_response(response):
+    start = response.request.extensions.get("metrics_start")
+    if "text/event-stream" not in response.headers.get("content-type", ""):
+        await response.aread()
+        try:
+            usage = response.json().get("usage") or {}
+        except (ValueError, AttributeError):
+            usage = {}
+        for kind in ("prompt_tokens", "completion_tokens"):
+            if isinstance(usage.get(kind), (int, float)):
+                DEEPSEEK_TOKENS.labels(kind=kind.split("_")[0]).inc(usage[kind])
+    if start is not None:
+        DEEPSEEK_REQUEST_SECONDS.labels(status=response.status_code).observe(time.perf_counter() - start)
+
+
+DEEPSEEK_EVENT_HOOKS = {"request": [_on_deepseek_request], "response": [_on_deepseek_response]}
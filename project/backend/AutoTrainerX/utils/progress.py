@@ -0,0 +1,189 @@
+# utils/progress.py
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS challenge_progress (
+    user_id TEXT NOT NULL,
+    challenge_id TEXT NOT NULL,
+    language TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL DEFAULT 'started',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    best_score INTEGER,
+    updated_at REAL NOT NULL,
+    completed_at REAL,
+    PRIMARY KEY (user_id, challenge_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_challenge_progress_completed
+    ON challenge_progress (user_id, status, language, challenge_id);
+"""
+
+# PRAGMA user_version once user_progress.progress_json has been copied into challenge_progress.
+MIGRATED_VERSION = 1
+
+# Partial update: only the columns given a value change, attempts accumulate,
+# best_score only goes up and a completed challenge stays completed.
+UPSERT = """
+INSERT INTO challenge_progress
+    (user_id, challenge_id, language, status, attempts, best_score, updated_at, completed_at)
+VALUES (:user_id, :challenge_id, COALESCE(:language, ''), COALESCE(:status, 'started'), :attempts, :score, :now,
+        CASE WHEN :status = 'completed' THEN :now END)
+ON CONFLICT (user_id, challenge_id) DO UPDATE SET
+    language = COALESCE(:language, language),
+    status = CASE WHEN status = 'completed' THEN status ELSE COALESCE(:status, status) END,
+    attempts = attempts + :attempts,
+    best_score = CASE WHEN :score IS NULL THEN best_score
+                      WHEN best_score IS NULL OR :score > best_score THEN :score ELSE best_score END,
+    updated_at = :now,
+    completed_at = COALESCE(completed_at, CASE WHEN :status = 'completed' THEN :now END)
+"""
+
+STATUSES = ("started", "completed")
+
+
+def _language(language: Optional[str]) -> Optional[str]:
+    return language.strip().lower() if language is not None else None
+
+
+def _flag(value: Any) -> bool:
+    # Old clients stored flags as booleans, 0/1 or strings; "false" and "0" are not set.
+    if isinstance(value, str):
+        return value.strip().lower() in ("true", "1", "yes", "completed")
+    return bool(value) and not isinstance(value, (list, dict))
+
+
+def blob_entries(blob: Any) -> List[Tuple[str, str]]:
+    """``(challenge_id, language)`` pairs marked completed in a ``progress_json`` blob.
+
+    Accepts the shapes the blob has been written in: a top-level ``completed``
+    (or ``completed_ids``) list, the same keyed by language, a bare list per
+    language, or per-challenge objects with a set ``completed`` flag (``true``,
+    a non-zero number, or one of the strings "true", "1", "yes", "completed") or
+    ``status: "completed"``.
+    """
+    if isinstance(blob, str):
+        try:
+            blob = json.loads(blob or "{}")
+        except ValueError:
+            return []
+    entries: List[Tuple[str, str]] = []
+
+    def add(ids, language):
+        entries.extend((str(i), language) for i in ids or [] if i not in (None, ""))
+
+    if isinstance(blob, list):
+        add(blob, "")
+        return entries
+    if not isinstance(blob, dict):
+        return entries
+    for key, value in blob.items():
+        if key in ("completed", "completed_ids"):
+            add(value, "")
+        elif isinstance(value, list):
+            add(value, key.lower())
+        elif isinstance(value, dict):
+            if "completed" in value and isinstance(value["completed"], list) or "completed_ids" in value:
+                add(value.get("completed_ids") or value.get("completed"), key.lower())
+            elif _flag(value.get("completed")) or value.get("status") == "completed":
+                add([key], (value.get("language") or "").lower())
+    return entries
+
+
+class ChallengeProgress:
+    """Per-(user, challenge) progress rows in ``rankings.db``.
+
+    Replaces the ``user_progress.progress_json`` blob: an update touches one
+    row instead of rewriting a user's whole history, and the completed ids for
+    a user and language are read straight off a covering index.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        # Autocommit mode: transactions are opened explicitly with BEGIN IMMEDIATE.
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.executescript(SCHEMA)
+        self.migrate()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def migrate(self) -> int:
+        """Copies completed challenges out of ``progress_json`` once; returns the number of rows written."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if self._conn.execute("PRAGMA user_version").fetchone()[0] >= MIGRATED_VERSION:
+                    self._conn.execute("ROLLBACK")
+                    return 0
+                rows = []
+                has_blobs = self._conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'user_progress'").fetchone()
+                if has_blobs:
+                    now = time.time()
+                    for user_id, blob in self._conn.execute(
+                            "SELECT user_id, progress_json FROM user_progress "
+                            "WHERE progress_json IS NOT NULL AND progress_json NOT IN ('', '{}')"):
+                        rows.extend({"user_id": user_id, "challenge_id": challenge_id, "language": language,
+                                     "status": "completed", "attempts": 0, "score": None, "now": now}
+                                    for challenge_id, language in blob_entries(blob))
+                self._conn.executemany(UPSERT, rows)
+                self._conn.execute(f"PRAGMA user_version = {MIGRATED_VERSION}")
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            return len(rows)
+
+    def update(self, user_id: str, challenge_id: str, language: Optional[str] = None,
+               status: Optional[str] = None, score: Optional[int] = None, attempts: int = 0):
+        self.update_many([{"user_id": user_id, "challenge_id": challenge_id, "language": language,
+                           "status": status, "score": score, "attempts": attempts}])
+
+    def update_many(self, updates: Iterable[Dict[str, Any]]) -> int:
+        """Applies partial updates (``user_id``, ``challenge_id`` and any of ``language``,
+        ``status``, ``score``, ``attempts``) in one transaction."""
+        now = time.time()
+        rows = []
+        for u in updates:
+            status = u.get("status")
+            if status is not None and status not in STATUSES:
+                raise ValueError(f"Unknown status {status!r}; expected one of {', '.join(STATUSES)}")
+            rows.append({"user_id": u["user_id"], "challenge_id": str(u["challenge_id"]),
+                         "language": _language(u.get("language")), "status": status,
+                         "score": u.get("score"), "attempts": int(u.get("attempts") or 0), "now": now})
+        if not rows:
+            return 0
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(UPSERT, rows)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(rows)
+
+    def completed_ids(self, user_id: str, language: str) -> List[str]:
+        """Completed challenge ids for ``language``, plus any recorded without a language."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT challenge_id FROM challenge_progress "
+                "WHERE user_id = ? AND language IN (?, '') AND status = 'completed'",
+                (user_id, _language(language))).fetchall()
+        return [challenge_id for (challenge_id,) in rows]
+
+    def for_user(self, user_id: str, language: Optional[str] = None) -> List[Dict[str, Any]]:
+        query = "SELECT * FROM challenge_progress WHERE user_id = ?"
+        params: Tuple[Any, ...] = (user_id,)
+        if language is not None:
+            query, params = query + " AND language = ?", (user_id, _language(language))
+        with self._lock:
+            cursor = self._conn.execute(query + " ORDER BY updated_at", params)
+            names = [d[0] for d in cursor.description]
+            return [dict(zip(names, row)) for row in cursor.fetchall()]
@@ -0,0 +1,142 @@
+# utils/prompt_builder.py
+import math
+import re
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Iterable, List, Optional
+
+from utils.metrics import PROMPT_TOKENS
+
+# Words, runs of digits and single punctuation marks; BPE vocabularies split
+# long words into pieces of roughly four characters.
+_PIECES = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+_CHARS_PER_PIECE = 4
+TRUNCATION_MARKER = "\n[Content truncated to fit the model's context budget]"
+
+
+def _piece_tokens(piece: str) -> int:
+    return max(1, math.ceil(len(piece) / _CHARS_PER_PIECE)) if piece[0].isalnum() else 1
+
+
+def estimate_tokens(text: str) -> int:
+    """Local, slightly pessimistic estimate of the tokens a BPE tokenizer would produce."""
+    return sum(_piece_tokens(m.group()) for m in _PIECES.finditer(text))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Longest prefix of ``text`` estimated at no more than ``max_tokens``."""
+    used = 0
+    end = 0
+    for match in _PIECES.finditer(text):
+        used += _piece_tokens(match.group())
+        if used > max_tokens:
+            return text[:end].rstrip()
+        end = match.end()
+    return text
+
+
+@dataclass
+class Prompt:
+    text: str
+    tokens: int
+    budget: int
+    truncated: bool = False
+    dropped_examples: int = 0
+
+
+@dataclass
+class _Section:
+    kind: str  # "instructions", "example" or "passages"
+    texts: List[str] = field(default_factory=list)
+
+
+class PromptBuilder:
+    """Assembles a prompt that fits a token budget.
+
+    Sections are emitted in the order they are added. Instructions always go
+    in; examples go in while they fit; source passages share what is left,
+    split evenly between sources with any share a short source does not need
+    handed on to the longer ones.
+
+        prompt = (PromptBuilder(budget)
+                  .instructions("Generate 5 questions from this content:")
+                  .passages(file_texts)
+                  .example("Example format: [...]")
+                  .build(endpoint="generate_questions"))
+    """
+
+    def __init__(self, budget: int, separator: str = "\n\n"):
+        self.budget = budget
+        self.separator = separator
+        self._sections: List[_Section] = []
+
+    def instructions(self, text: str) -> "PromptBuilder":
+        self._sections.append(_Section("instructions", [text]))
+        return self
+
+    def example(self, text: str) -> "PromptBuilder":
+        self._sections.append(_Section("example", [text]))
+        return self
+
+    def passages(self, texts: Iterable[str]) -> "PromptBuilder":
+        self._sections.append(_Section("passages", [t for t in texts if t]))
+        return self
+
+    def _allocate(self, sizes: List[int], available: int) -> List[int]:
+        shares = [0] * len(sizes)
+        pending = [i for i, size in enumerate(sizes) if size]
+        while pending and available > 0:
+            share = available // len(pending)
+            if share == 0:
+                break
+            still_pending = []
+            for i in pending:
+                grant = min(share, sizes[i] - shares[i])
+                shares[i] += grant
+                available -= grant
+                if shares[i] < sizes[i]:
+                    still_pending.append(i)
+            pending = still_pending
+        return shares
+
+    def build(self, endpoint: Optional[str] = None) -> Prompt:
+        """Packs the sections into the budget; ``endpoint`` labels the prompt-token metric."""
+        separator_tokens = estimate_tokens(self.separator)
+        fixed = sum(estimate_tokens(s.texts[0]) + separator_tokens
+                    for s in self._sections if s.kind == "instructions")
+        dropped = set()
+        for i, section in enumerate(self._sections):
+            if section.kind != "example":
+                continue
+            cost = estimate_tokens(section.texts[0]) + separator_tokens
+            if fixed + cost <= self.budget:
+                fixed += cost
+            else:
+                dropped.add(i)
+
+        sources = [text for s in self._sections if s.kind == "passages" for text in s.texts]
+        sizes = [estimate_tokens(text) + separator_tokens for text in sources]
+        packed = iter(zip(sources, sizes, self._allocate(sizes, max(0, self.budget - fixed))))
+        reserve = estimate_tokens(TRUNCATION_MARKER) + separator_tokens
+        parts: List[str] = []
+        truncated = False
+        for i, section in enumerate(self._sections):
+            if i in dropped:
+                continue
+            if section.kind != "passages":
+                parts.extend(section.texts)
+                continue
+            for text, size, share in islice(packed, len(section.texts)):
+                if share >= size:
+                    parts.append(text)
+                    continue
+                truncated = True
+                if share > reserve:
+                    parts.append(truncate_to_tokens(text, share - reserve) + TRUNCATION_MARKER)
+
+        text = self.separator.join(parts)
+        prompt = Prompt(text=text, tokens=estimate_tokens(text), budget=self.budget,
+                        truncated=truncated, dropped_examples=len(dropped))
+        if endpoint:
+            PROMPT_TOKENS.labels(endpoint=endpoint).observe(prompt.tokens)
+        return prompt
@@ -0,0 +1,226 @@
+# utils/question_bank.py
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from utils.metrics import QUESTION_BANK_QUESTIONS, record_cache
+
+TAGS = ("language", "difficulty", "subject", "exam", "source_file", "source_hash", "prompt")
+# Tags compared as given; the others are matched case-insensitively.
+CASE_SENSITIVE = ("source_file",)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS questions (
+    id INTEGER PRIMARY KEY,
+    fingerprint TEXT NOT NULL UNIQUE,
+    origin TEXT NOT NULL,
+    language TEXT NOT NULL DEFAULT '',
+    difficulty TEXT NOT NULL DEFAULT '',
+    subject TEXT NOT NULL DEFAULT '',
+    exam TEXT NOT NULL DEFAULT '',
+    source_file TEXT NOT NULL DEFAULT '',
+    source_hash TEXT NOT NULL DEFAULT '',
+    prompt TEXT NOT NULL DEFAULT '',
+    payload TEXT NOT NULL,
+    times_served INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_questions_language ON questions (origin, language, difficulty, times_served);
+CREATE INDEX IF NOT EXISTS idx_questions_subject ON questions (origin, subject, exam, times_served);
+CREATE INDEX IF NOT EXISTS idx_questions_source ON questions (source_hash);
+CREATE TABLE IF NOT EXISTS served (
+    user_id TEXT NOT NULL,
+    question_id INTEGER NOT NULL,
+    served_at REAL NOT NULL,
+    PRIMARY KEY (user_id, question_id)
+) WITHOUT ROWID;
+"""
+
+_WORDS = re.compile(r"\w+")
+
+
+def content_hash(*texts: str) -> str:
+    digest = hashlib.sha256()
+    for text in texts:
+        digest.update(text.encode("utf-8", errors="ignore"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:32]
+
+
+def _tag(tag: str, value: Any) -> str:
+    value = str(value or "")
+    return value if tag in CASE_SENSITIVE else value.lower()
+
+
+def fingerprint(origin: str, text: str) -> str:
+    """Same question text (ignoring case and punctuation) from the same endpoint is stored once."""
+    return content_hash(origin, " ".join(_WORDS.findall(text.lower())))
+
+
+class QuestionBank:
+    """Every generated question, tagged and indexed in ``question_bank.db``.
+
+    ``take`` hands out questions the caller hasn't seen - never served to
+    ``user_id``, or never served at all for anonymous callers - and marks
+    them served in the same transaction, so concurrent workers don't hand out
+    the same anonymous question twice. Generators call it first and go to
+    DeepSeek only for the shortfall; ``QUESTION_BANK_QUESTIONS`` counts
+    questions by where they came from, giving the bank's hit ratio.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        # Autocommit mode: transactions are opened explicitly with BEGIN IMMEDIATE.
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.executescript(SCHEMA)
+        # Banks created before a tag existed get the column, empty for existing rows.
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(questions)")}
+        for tag in TAGS:
+            if tag not in columns:
+                self._conn.execute(f"ALTER TABLE questions ADD COLUMN {tag} TEXT NOT NULL DEFAULT ''")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def add(self, questions: Iterable[Dict[str, Any]], origin: str, text=None, **tags) -> int:
+        """Stores questions under ``origin`` and ``tags``; returns how many were new.
+
+        ``text(question)`` gives the text used to recognise repeats (default: ``question["question"]``).
+        """
+        text = text or (lambda q: q.get("question") or "")
+        values = [_tag(tag, tags.get(tag)) for tag in TAGS]
+        now = time.time()
+        rows = []
+        for question in questions:
+            body = text(question)
+            if body:
+                rows.append((fingerprint(origin, body), origin, *values,
+                             json.dumps(question, ensure_ascii=False), now))
+        if not rows:
+            return 0
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    f"INSERT OR IGNORE INTO questions (fingerprint, origin, {', '.join(TAGS)}, payload, created_at) "
+                    f"VALUES (?, ?, {', '.join('?' for _ in TAGS)}, ?, ?)", rows)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            return self._conn.total_changes - before
+
+    @staticmethod
+    def _where(origin: Optional[str], tags: Dict[str, Any]):
+        clauses, params = [], []
+        if origin:
+            clauses.append("origin = ?")
+            params.append(origin)
+        for tag in TAGS:
+            value = tags.get(tag)
+            if isinstance(value, (list, tuple, set, frozenset)):
+                # A collection matches any of its values; an empty one matches nothing.
+                values = [_tag(tag, v) for v in value]
+                clauses.append(f"{tag} IN ({', '.join('?' for _ in values)})" if values else "0")
+                params.extend(values)
+            elif value:
+                clauses.append(f"{tag} = ?")
+                params.append(_tag(tag, value))
+        return clauses, params
+
+    def take(self, n: int, origin: str, user_id: Optional[str] = None, **tags) -> List[Dict[str, Any]]:
+        """Up to ``n`` unseen questions matching ``origin`` and ``tags``, marked as served.
+
+        A tag given as a list matches any of its values.
+        """
+        if n <= 0:
+            return []
+        clauses, params = self._where(origin, tags)
+        if user_id:
+            clauses.append("id NOT IN (SELECT question_id FROM served WHERE user_id = ?)")
+            params.append(user_id)
+        else:
+            clauses.append("times_served = 0")
+        query = (f"SELECT id, payload FROM questions WHERE {' AND '.join(clauses)} "
+                 f"ORDER BY times_served, id LIMIT ?")
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(query, (*params, n)).fetchall()
+                ids = [(question_id,) for question_id, _ in rows]
+                self._conn.executemany("UPDATE questions SET times_served = times_served + 1 WHERE id = ?", ids)
+                if user_id:
+                    now = time.time()
+                    self._conn.executemany("INSERT OR IGNORE INTO served VALUES (?, ?, ?)",
+                                           [(user_id, i, now) for (i,) in ids])
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        record_cache("question_bank", len(rows) >= n)
+        QUESTION_BANK_QUESTIONS.labels(origin=origin, source="bank").inc(len(rows))
+        return [json.loads(payload) for _, payload in rows]
+
+    def record_generated(self, origin: str, count: int):
+        QUESTION_BANK_QUESTIONS.labels(origin=origin, source="generated").inc(count)
+
+    def mark_served(self, questions: Iterable[Dict[str, Any]], origin: str, user_id: Optional[str] = None,
+                    text=None):
+        """Marks freshly generated questions that were just handed out as served."""
+        text = text or (lambda q: q.get("question") or "")
+        prints = [fingerprint(origin, text(q)) for q in questions if text(q)]
+        if not prints:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany("UPDATE questions SET times_served = times_served + 1 WHERE fingerprint = ?",
+                                       [(p,) for p in prints])
+                if user_id:
+                    now = time.time()
+                    self._conn.executemany(
+                        "INSERT OR IGNORE INTO served SELECT ?, id, ? FROM questions WHERE fingerprint = ?",
+                        [(user_id, now, p) for p in prints])
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def search(self, origin: Optional[str] = None, limit: int = 50, **tags) -> List[Dict[str, Any]]:
+        clauses, params = self._where(origin, tags)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            cursor = self._conn.execute(
+                f"SELECT id, origin, {', '.join(TAGS)}, times_served, created_at, payload FROM questions {where} "
+                f"ORDER BY id DESC LIMIT ?", (*params, limit))
+            names = [d[0] for d in cursor.description]
+            rows = cursor.fetchall()
+        results = []
+        for row in rows:
+            entry = dict(zip(names, row))
+            entry["question"] = json.loads(entry.pop("payload"))
+            results.append(entry)
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT origin, COUNT(*), SUM(times_served = 0) FROM questions GROUP BY origin").fetchall()
+        served = {}
+        for (origin, source), value in QUESTION_BANK_QUESTIONS.values().items():
+            served.setdefault(origin, {"bank": 0, "generated": 0})[source] = int(value)
+        origins = {origin: {"stored": total, "unserved": unserved or 0} for origin, total, unserved in rows}
+        for origin, counts in served.items():
+            entry = origins.setdefault(origin, {"stored": 0, "unserved": 0})
+            entry.update(served_from_bank=counts["bank"], generated=counts["generated"])
+            total = counts["bank"] + counts["generated"]
+            entry["hit_ratio"] = round(counts["bank"] / total, 4) if total else None
+        return {"origins": origins}
@@ -0,0 +1,199 @@
+# utils/quiz_analytics.py
+import math
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from utils.storage import JsonStore
+
+SCORE_BUCKETS = 10          # 0-9, 10-19, ..., 90-100
+# Time taken is bucketed on a log scale: TIME_STEPS buckets per doubling,
+# so percentiles stay within ~19% however long a quiz takes, in fixed space.
+TIME_STEPS = 4
+TIME_BUCKETS = 80           # covers up to 2**20 seconds (~12 days)
+TIME_PERCENTILES = (50, 90, 95, 99)
+
+# Returns every saved (result, questions) pair; used once to build the aggregates.
+Backlog = Callable[[], Iterable[Tuple[Dict[str, Any], Optional[List[Dict[str, Any]]]]]]
+
+
+def _time_bucket(seconds: float) -> int:
+    return min(TIME_BUCKETS - 1, int(math.log2(max(0.0, seconds) + 1) * TIME_STEPS))
+
+
+def _bucket_seconds(bucket: int) -> float:
+    """Midpoint of a time bucket, in seconds."""
+    low = 2 ** (bucket / TIME_STEPS) - 1
+    high = 2 ** ((bucket + 1) / TIME_STEPS) - 1
+    return (low + high) / 2
+
+
+def as_number(value: Any) -> Optional[float]:
+    """``value`` as a finite float, or None if it isn't a number (``"80%"``, ``"abc"``, NaN)."""
+    if isinstance(value, bool):
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+def _parse(result: Dict[str, Any]) -> Optional[Tuple[float, Optional[float]]]:
+    """(score, time taken) for a saved result, or None if either is not a number."""
+    score = as_number(result.get("score") or 0)
+    time_taken = result.get("timeTaken") or result.get("time_taken")
+    seconds = as_number(time_taken) if time_taken else None
+    if score is None or (time_taken and seconds is None):
+        return None
+    return score, seconds
+
+
+def correct_answer(question: Dict[str, Any]) -> Optional[str]:
+    return question.get("correct_answer") or question.get("correctAnswer") or question.get("answer")
+
+
+class Aggregate:
+    """Running statistics for a set of quiz results; every update and read is O(1) in the number of results.
+
+    Score mean and variance use Welford's method. Per-question rates need the
+    quiz's questions; results for quizzes without them only count towards
+    the score and time figures.
+    """
+
+    def __init__(self, data: Optional[Dict[str, Any]] = None):
+        data = data or {}
+        self.count = data.get("count", 0)
+        self.mean = data.get("mean", 0.0)
+        self.m2 = data.get("m2", 0.0)
+        self.minimum = data.get("min")
+        self.maximum = data.get("max")
+        self.scores = data.get("score_histogram") or [0] * SCORE_BUCKETS
+        self.times = data.get("time_histogram") or [0] * TIME_BUCKETS
+        self.timed = data.get("timed", 0)
+        # question index (as a string, for JSON) -> [answered, correct]
+        self.questions: Dict[str, List[int]] = data.get("questions", {})
+
+    def add(self, score: float, time_taken: Optional[float] = None, answers: Iterable[Any] = (),
+            questions: Optional[List[Dict[str, Any]]] = None):
+        score = float(score or 0)
+        self.count += 1
+        delta = score - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (score - self.mean)
+        self.minimum = score if self.minimum is None else min(self.minimum, score)
+        self.maximum = score if self.maximum is None else max(self.maximum, score)
+        self.scores[min(SCORE_BUCKETS - 1, max(0, int(score // (100 / SCORE_BUCKETS))))] += 1
+        if time_taken:
+            self.times[_time_bucket(float(time_taken))] += 1
+            self.timed += 1
+        if questions:
+            for i, (answer, question) in enumerate(zip(answers, questions)):
+                if answer in (None, ""):
+                    continue
+                counts = self.questions.setdefault(str(i), [0, 0])
+                counts[0] += 1
+                counts[1] += answer == correct_answer(question)
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / self.count if self.count else 0.0
+
+    def time_percentile(self, p: float) -> Optional[float]:
+        if not self.timed:
+            return None
+        rank = p / 100 * self.timed
+        seen = 0
+        for bucket, n in enumerate(self.times):
+            seen += n
+            if n and seen >= rank:
+                return round(_bucket_seconds(bucket), 1)
+        return None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"count": self.count, "mean": self.mean, "m2": self.m2, "min": self.minimum, "max": self.maximum,
+                "score_histogram": self.scores, "time_histogram": self.times, "timed": self.timed,
+                "questions": self.questions}
+
+    def summary(self) -> Dict[str, Any]:
+        width = 100 // SCORE_BUCKETS
+        return {
+            "count": self.count,
+            "mean": round(self.mean, 3),
+            "variance": round(self.variance, 3),
+            "std": round(math.sqrt(self.variance), 3),
+            "min": self.minimum,
+            "max": self.maximum,
+            "score_histogram": [{"range": f"{i * width}-{i * width + width - 1 if i < SCORE_BUCKETS - 1 else 100}",
+                                 "count": n} for i, n in enumerate(self.scores)],
+            "questions": [{"index": int(i), "answered": a, "correct": c, "correct_rate": round(c / a, 3) if a else None}
+                          for i, (a, c) in sorted(self.questions.items(), key=lambda kv: int(kv[0]))],
+            "time_taken_percentiles": {f"p{p}": self.time_percentile(p) for p in TIME_PERCENTILES},
+        }
+
+
+class QuizAnalytics:
+    """Per-quiz and per-class aggregates, persisted next to the results they summarise."""
+
+    def __init__(self, path: Path):
+        self.store = JsonStore(path, default=dict)
+        self._lock = threading.Lock()
+        self._cache: Optional[Dict[str, Any]] = None
+        self._version = None
+
+    def record(self, result: Dict[str, Any], questions: Optional[List[Dict[str, Any]]] = None,
+               backlog: Optional[Backlog] = None, save: Optional[Callable[[Dict[str, Any]], Any]] = None):
+        """Folds ``result`` into the aggregates.
+
+        ``save(result)`` is called under the analytics lock, before anything
+        is counted. Passing the results append here means a first build can't
+        miss a result that is being saved, or count it twice.
+        """
+        self.record_many([(result, questions)], backlog, save=(lambda: save(result)) if save else None)
+
+    def record_many(self, items: Iterable[Any], backlog: Optional[Backlog] = None,
+                    save: Optional[Callable[[], Any]] = None):
+        """Adds ``(result, questions)`` pairs in one locked read-modify-write.
+
+        The first time the table is built, ``backlog()`` is folded in instead
+        of ``items``: it returns every saved result, which already includes them.
+        Results whose score or time taken isn't a number are skipped.
+        """
+        def add(table):
+            if save is not None:
+                save()
+            if not table.get("built"):
+                pending = backlog() if backlog is not None else items
+                table["built"] = True
+            else:
+                pending = items
+            for result, questions in pending:
+                parsed = _parse(result)
+                if parsed is None:
+                    continue
+                args = (*parsed, result.get("answers") or [], questions)
+                for group, key in (("quizzes", result.get("quizId") or result.get("quiz_id")),
+                                   ("classes", result.get("classId") or result.get("class_id"))):
+                    if not key:
+                        continue
+                    aggregates = table.setdefault(group, {})
+                    aggregate = Aggregate(aggregates.get(key))
+                    aggregate.add(*args)
+                    aggregates[key] = aggregate.to_dict()
+        self.store.update(add)
+
+    def ensure_built(self, backlog: Backlog):
+        if not self._table().get("built"):
+            self.record_many([], backlog)
+
+    def _table(self) -> Dict[str, Any]:
+        with self._lock:
+            if self._cache is None or self.store.version != self._version:
+                self._cache, self._version = self.store.load_versioned()
+            return self._cache
+
+    def quiz_summary(self, quiz_id: str) -> Dict[str, Any]:
+        return Aggregate(self._table().get("quizzes", {}).get(quiz_id)).summary()
+
+    def class_summary(self, class_id: str) -> Dict[str, Any]:
+        return Aggregate(self._table().get("classes", {}).get(class_id)).summary()
@@ -0,0 +1,157 @@
+# utils/storage.py
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+Version = Optional[Tuple[int, int, int]]
+
+
+def file_signature(path: Path) -> Version:
+    """Cheap change detector for a JSON store: (inode, mtime_ns, size)."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+class ConflictError(Exception):
+    """The store changed on disk after the caller read the version it is writing over."""
+
+
+class JsonStore:
+    """A JSON document on disk that several worker processes can share.
+
+    Writes go to a temporary file in the same directory and are moved into
+    place with ``os.replace``, so readers never see a half-written file and do
+    not need a lock. Writers serialise on an exclusive lock on ``<path>.lock``
+    (``flock`` on POSIX, ``msvcrt.locking`` on Windows).
+
+    ``update`` and ``append`` do the whole read-modify-write under the lock.
+    Callers that must await something between reading and writing use
+    ``load_versioned`` and pass the version back to ``save``, which raises
+    ``ConflictError`` if another writer got there first.
+    """
+
+    def __init__(self, path, default: Callable[[], Any] = list, indent: Optional[int] = 2):
+        self.path = Path(path)
+        self.lock_path = self.path.with_name(self.path.name + ".lock")
+        self.default = default
+        self.indent = indent
+        # flock is per open file, so threads in one worker also exclude each other;
+        # the thread lock just keeps them from spinning on the same descriptor.
+        self._thread_lock = threading.Lock()
+
+    @contextmanager
+    def locked(self):
+        """Holds the cross-process write lock for the duration of the block."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._thread_lock, open(self.lock_path, "a+b") as handle:
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            else:
+                handle.seek(0)
+                while True:
+                    try:
+                        msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        continue
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+                else:
+                    handle.seek(0)
+                    msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+    @property
+    def version(self) -> Version:
+        return file_signature(self.path)
+
+    def load_versioned(self) -> Tuple[Any, Version]:
+        # Retry if a writer replaced the file between the stat and the read.
+        while True:
+            version = self.version
+            if version is None:
+                return self.default(), None
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except FileNotFoundError:
+                continue
+            if self.version == version:
+                return data, version
+
+    def load(self) -> Any:
+        return self.load_versioned()[0]
+
+    def _write(self, data: Any) -> Version:
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=self.indent)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+        return self.version
+
+    def save(self, data: Any, expected_version: Version = ...) -> Version:
+        """Atomically replaces the document and returns its new version.
+
+        With ``expected_version`` the write only happens if the file is still
+        at that version (``None`` meaning it must not exist yet).
+        """
+        with self.locked():
+            if expected_version is not ... and self.version != expected_version:
+                raise ConflictError(f"{self.path} changed since version {expected_version}")
+            return self._write(data)
+
+    def update(self, mutator: Callable[[Any], Any]) -> Any:
+        """Runs ``mutator`` on the current document under the lock, saves it, and returns what it returned."""
+        with self.locked():
+            data = self.load()
+            result = mutator(data)
+            self._write(data)
+            return result
+
+    def append(self, *items: Any) -> Tuple[Version, Version]:
+        """Appends to a list document; returns the versions before and after the write.
+
+        A caller caching the document can apply its own items in place only if
+        the version before matches the one it cached; otherwise it missed
+        another writer's changes and has to reload.
+        """
+        with self.locked():
+            data, before = self.load_versioned()
+            data.extend(items)
+            return before, self._write(data)
+
+    def append_new(self, item: Any, is_duplicate: Callable[[Any], bool]) -> Optional[Tuple[Version, Version]]:
+        """Appends ``item`` unless an entry already ``is_duplicate``, checked under the same lock.
+
+        Returns the versions as ``append`` does, or None if nothing was written.
+        """
+        with self.locked():
+            data, before = self.load_versioned()
+            if any(is_duplicate(entry) for entry in data):
+                return None
+            data.append(item)
+            return before, self._write(data)
@@ -0,0 +1,94 @@
+# utils/upload_catalogue.py
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Set
+
+from utils.metrics import record_cache
+
+
+class UploadCatalogue:
+    """In-memory catalogue of the files in an upload directory.
+
+    Upload paths write files inside ``adding()``, so listing never has to
+    stat every file. Files added, removed or edited in place out of band are
+    picked up by a full rescan at most once every ``check_interval`` seconds.
+    """
+
+    def __init__(self, directory: str, allowed_extensions: Iterable[str], check_interval: float = 2.0):
+        self.directory = Path(directory)
+        self.allowed_extensions = {ext.lower() for ext in allowed_extensions}
+        self.check_interval = check_interval
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        self.rescans = 0
+
+    def _allowed(self, name: str) -> bool:
+        return Path(name).suffix.lower() in self.allowed_extensions
+
+    @staticmethod
+    def _entry(name: str, st: os.stat_result) -> Dict[str, Any]:
+        return {"filename": name, "size": st.st_size, "last_modified": st.st_mtime}
+
+    def _names(self) -> Set[str]:
+        try:
+            with os.scandir(self.directory) as it:
+                return {entry.name for entry in it if self._allowed(entry.name) and entry.is_file()}
+        except FileNotFoundError:
+            return set()
+
+    def _rescan(self):
+        entries = {}
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if self._allowed(entry.name) and entry.is_file():
+                        entries[entry.name] = self._entry(entry.name, entry.stat())
+        except FileNotFoundError:
+            pass
+        self._entries = entries
+        self._last_check = time.monotonic()
+        self.rescans += 1
+
+    def _ensure_fresh(self) -> bool:
+        """Rescans once ``check_interval`` has passed since the last one. Returns True on a rescan."""
+        if self.rescans and time.monotonic() - self._last_check < self.check_interval:
+            return False
+        self._rescan()
+        return True
+
+    @contextmanager
+    def adding(self, file_path: Path):
+        """Wraps the write of a file into the directory and registers it afterwards."""
+        yield
+        self.record(file_path)
+
+    def record(self, file_path: Path):
+        """Registers a file the application has just written.
+
+        Only our file's entry is updated when the directory holds exactly the
+        files already catalogued plus this one; if anyone else added or removed
+        a file meanwhile, the catalogue rescans instead.
+        """
+        file_path = Path(file_path)
+        if not self._allowed(file_path.name):
+            return
+        st = file_path.stat()
+        with self._lock:
+            if not self.rescans or self._names() != set(self._entries) | {file_path.name}:
+                self._rescan()
+                return
+            self._entries[file_path.name] = self._entry(file_path.name, st)
+
+    def list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            record_cache("upload_catalogue", not self._ensure_fresh())
+            return [dict(entry) for entry in self._entries.values()]
+
+    def __contains__(self, filename: str) -> bool:
+        with self._lock:
+            record_cache("upload_catalogue", not self._ensure_fresh())
+            return filename in self._entries